@@ -0,0 +1,196 @@
+"""
+Debounced background autosave of a menu to a CSV file.
+
+Option S of the interactive program saves the whole menu while the operator waits, and edits are
+lost if nobody chooses it. `AutosaveScheduler` saves in the background instead:
+
+- it subscribes to the change notifications of `functions.py` (see `subscribe_menu_events()`);
+  the listener only records the menu version of the change and wakes the worker thread, so an
+  edit never waits for a save;
+- the worker saves once the menu has been quiet for `quiet_period` seconds, so a burst of edits
+  (a bulk update, a run of interactive changes) is written by a single save; `max_delay` bounds how
+  long a steady stream of edits can postpone the save;
+- a save copies the list of dishes, writes them with `save_menu_to_csv()` to a temporary file next
+  to the target and renames it over the target, so the file is never left half written; edits
+  made during a save are picked up by the next one;
+- `close()` (registered with `atexit` by main.py) stops the worker and saves the pending edits.
+
+`stats()` reports the number of saves, the save latency and the coalescing ratio (edits written
+per save).
+
+Example:
+    autosaver = AutosaveScheduler(restaurant_menu_list, "menu.csv", quiet_period=2.0)
+    ...
+    autosaver.close()
+"""
+import os
+import tempfile
+import threading
+import time
+
+from functions import get_menu_version, save_menu_to_csv, subscribe_menu_events, unsubscribe_menu_events
+
+
+class AutosaveScheduler:
+    """
+    Saves a menu to a CSV file from a background thread, after each burst of changes.
+
+    Args:
+        restaurant_menu_list (list): The menu to save. Only changes of this list are tracked.
+        filename (str): The CSV file to save to. Must end with ".csv".
+        quiet_period (float, optional): The number of seconds without changes before saving. Defaults to 2.
+        max_delay (float, optional): The maximum number of seconds between the first unsaved change and
+                                     the save, even if changes keep coming. Defaults to 30.
+
+    Raises:
+        ValueError: If `filename` does not end with ".csv".
+    """
+
+    def __init__(self, restaurant_menu_list, filename, quiet_period=2.0, max_delay=30.0):
+        if not filename.endswith('.csv'):
+            raise ValueError(f"invalid autosave file name: {filename}")
+        self.menu = restaurant_menu_list
+        self.filename = filename
+        self.quiet_period = quiet_period
+        self.max_delay = max_delay
+        self.condition = threading.Condition()
+        self.save_lock = threading.Lock()
+        self.dirty_version = self.saved_version = get_menu_version()
+        self.first_change = self.last_change = None
+        self.pending_edits = 0
+        self.edits = 0
+        self.saved_edits = 0
+        self.saves = 0
+        self.failed_saves = 0
+        self.last_error = None
+        self.save_seconds = 0.0
+        self.max_save_seconds = 0.0
+        self.last_save_seconds = 0.0
+        self.closed = False
+        subscribe_menu_events(self._on_change)
+        self.thread = threading.Thread(target=self._run, name="menu-autosave", daemon=True)
+        self.thread.start()
+
+    def _on_change(self, change):
+        if change["menu"] is not self.menu:
+            return
+        with self.condition:
+            now = time.monotonic()
+            if self.first_change is None:
+                self.first_change = now
+            self.last_change = now
+            self.dirty_version = change["version"]
+            self.pending_edits += 1
+            self.edits += 1
+            self.condition.notify()
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while not self.closed and self.dirty_version == self.saved_version:
+                    self.condition.wait()
+                if self.closed:
+                    return
+                due = min(self.last_change + self.quiet_period, self.first_change + self.max_delay)
+                wait = due - time.monotonic()
+                if wait > 0:
+                    self.condition.wait(wait)
+                    continue
+            if self.flush() is None:
+                # the save failed: try again after another quiet period
+                with self.condition:
+                    self.first_change = self.last_change = time.monotonic()
+
+    def flush(self):
+        """
+        Saves the menu now if it has unsaved changes.
+
+        Returns:
+            bool or None: True if the menu was saved, False if there was nothing to save, or None if
+                          the save failed (the exception is kept in `last_error` and counted in
+                          `failed_saves`).
+        """
+        with self.save_lock:
+            with self.condition:
+                version = self.dirty_version
+                if version == self.saved_version:
+                    return False
+                edits = self.pending_edits
+
+            start = time.perf_counter()
+            directory = os.path.dirname(os.path.abspath(self.filename))
+            temp_name = None
+            try:
+                fd, temp_name = tempfile.mkstemp(prefix=".autosave-", suffix=".csv", dir=directory)
+                os.close(fd)
+                if os.path.exists(self.filename):
+                    os.chmod(temp_name, os.stat(self.filename).st_mode & 0o777)
+                if save_menu_to_csv(list(self.menu), temp_name) == -1:
+                    raise ValueError(f"invalid file name: {temp_name}")
+                os.replace(temp_name, self.filename)
+            except Exception as error:
+                # any failure (I/O, a menu that cannot be read from this thread, ...) is recorded and
+                # retried; it must not end the worker thread
+                if temp_name is not None and os.path.exists(temp_name):
+                    try:
+                        os.remove(temp_name)
+                    except OSError:
+                        pass
+                with self.condition:
+                    self.failed_saves += 1
+                    self.last_error = error
+                return None
+            elapsed = time.perf_counter() - start
+
+            with self.condition:
+                self.saved_version = version
+                self.pending_edits -= edits
+                self.saved_edits += edits
+                self.saves += 1
+                self.save_seconds += elapsed
+                self.max_save_seconds = max(self.max_save_seconds, elapsed)
+                self.last_save_seconds = elapsed
+                if self.dirty_version == version:
+                    self.first_change = self.last_change = None
+                else:
+                    self.first_change = self.last_change
+            return True
+
+    def stats(self):
+        """
+        Returns the autosave metrics.
+
+        Returns:
+            dict: "edits" (changes seen), "saves", "failed_saves", "last_error" (the message of the last
+                  failure, or None), "pending_edits" (changes not saved yet),
+                  "coalescing_ratio" (changes written per save, 0.0 before the first save) and the save
+                  latency "last_save_ms", "mean_save_ms" and "max_save_ms" (0.0 before the first save).
+        """
+        with self.condition:
+            return {
+                "edits": self.edits,
+                "saves": self.saves,
+                "failed_saves": self.failed_saves,
+                "last_error": str(self.last_error) if self.last_error is not None else None,
+                "pending_edits": self.pending_edits,
+                "coalescing_ratio": self.saved_edits / self.saves if self.saves else 0.0,
+                "last_save_ms": self.last_save_seconds * 1000,
+                "mean_save_ms": self.save_seconds * 1000 / self.saves if self.saves else 0.0,
+                "max_save_ms": self.max_save_seconds * 1000,
+            }
+
+    def close(self):
+        """
+        Stops tracking changes, stops the worker thread and saves the pending changes.
+
+        Returns:
+            bool or None: The result of the final `flush()`.
+        """
+        with self.condition:
+            if self.closed:
+                return False
+            self.closed = True
+            self.condition.notify()
+        unsubscribe_menu_events(self._on_change)
+        self.thread.join()
+        return self.flush()
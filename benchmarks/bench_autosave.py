@@ -0,0 +1,69 @@
+"""
+Measures what the background autosave costs the interactive loop and how well it coalesces edits.
+
+Applies bursts of single-field updates to a large menu, with pauses longer than the quiet period
+between the bursts, and compares the update latency with and without an `AutosaveScheduler`
+attached. Also shows the time a synchronous save (option S) of the same menu takes.
+
+Usage:
+    python benchmarks/bench_autosave.py [--dishes 200000] [--bursts 5] [--edits 200] [--quiet 0.2]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from autosave import AutosaveScheduler  # noqa: E402
+from functions import add_dishes_bulk, save_menu_to_csv, update_menu_dish  # noqa: E402
+
+SPICY_SCALE_MAP = {1: "Not spicy", 2: "Low key spicy", 3: "Hot", 4: "Diabolical"}
+
+
+def run_bursts(menu, bursts, edits, pause):
+    """Returns the slowest single update, in seconds."""
+    slowest = 0.0
+    for burst in range(bursts):
+        for i in range(edits):
+            start = time.perf_counter()
+            update_menu_dish(menu, str((burst * edits + i) % len(menu)), SPICY_SCALE_MAP, "price", f"{5 + i % 50}.25")
+            slowest = max(slowest, time.perf_counter() - start)
+        time.sleep(pause)
+    return slowest
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dishes", type=int, default=200000)
+    parser.add_argument("--bursts", type=int, default=5)
+    parser.add_argument("--edits", type=int, default=200)
+    parser.add_argument("--quiet", type=float, default=0.2)
+    args = parser.parse_args()
+
+    menu = []
+    add_dishes_bulk([f"dish {i},{100 + i % 900},{5 + i % 2000 / 100:.2f},{'yes' if i % 3 else 'no'},{1 + i % 4}"
+                     for i in range(args.dishes)], menu, SPICY_SCALE_MAP)
+    pause = args.quiet * 5
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "menu.csv")
+        start = time.perf_counter()
+        save_menu_to_csv(menu, filename)
+        print(f"dishes: {args.dishes}  synchronous save: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+        slowest = run_bursts(menu, args.bursts, args.edits, pause)
+        print(f"no autosave:   slowest update {slowest * 1000:7.3f} ms")
+
+        autosaver = AutosaveScheduler(menu, filename, quiet_period=args.quiet)
+        slowest = run_bursts(menu, args.bursts, args.edits, pause)
+        autosaver.close()
+        stats = autosaver.stats()
+        print(f"with autosave: slowest update {slowest * 1000:7.3f} ms   {stats['edits']} edits in {stats['saves']} saves "
+              f"(coalescing ratio {stats['coalescing_ratio']:.1f}), save latency mean {stats['mean_save_ms']:.1f} ms, "
+              f"max {stats['max_save_ms']:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Compares a 5% price increase on the vegetarian dishes done with one `update_menu_dish()` call per
+dish and with a single `bulk_update_menu()` call, without listeners and with a `PriceColumn` and a
+`MenuHistory` following the menu (one change event per dish against one "bulk_update" event).
+
+Usage:
+    python benchmarks/bench_bulk_update.py [--dishes 200000]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from functions import (add_dishes_bulk, bulk_update_menu, format_price_cents, price_to_cents,  # noqa: E402
+                       update_menu_dish)
+from history import MenuHistory  # noqa: E402
+from prices import PriceColumn  # noqa: E402
+
+SPICY_SCALE_MAP = {1: "Not spicy", 2: "Low key spicy", 3: "Hot", 4: "Diabolical"}
+
+
+def new_menu(dishes):
+    menu = []
+    add_dishes_bulk([f"dish {i},{100 + i % 900},{5 + i % 2000 / 100:.2f},{'yes' if i % 3 else 'no'},{1 + i % 4}"
+                     for i in range(dishes)], menu, SPICY_SCALE_MAP)
+    return menu
+
+
+def run(dishes, listeners):
+    menu = new_menu(dishes)
+    followers = [PriceColumn(menu), MenuHistory(menu)] if listeners else []
+    start = time.perf_counter()
+    for idx, dish in enumerate(menu):
+        if dish["is_vegetarian"] == "yes":
+            new_price = format_price_cents((price_to_cents(dish["price"]) * 105 + 50) // 100)
+            update_menu_dish(menu, str(idx), SPICY_SCALE_MAP, "price", new_price)
+    per_dish = time.perf_counter() - start
+    expected = [dish["price"] for dish in menu]
+    for follower in followers:
+        follower.close()
+
+    menu = new_menu(dishes)
+    followers = [PriceColumn(menu), MenuHistory(menu)] if listeners else []
+    start = time.perf_counter()
+    changes = {"price": lambda dish: format_price_cents((price_to_cents(dish["price"]) * 105 + 50) // 100)}
+    changed = bulk_update_menu(menu, SPICY_SCALE_MAP, changes, where=lambda dish: dish["is_vegetarian"] == "yes")
+    bulk = time.perf_counter() - start
+    assert [dish["price"] for dish in menu] == expected
+    if listeners:
+        assert followers[0].total_cents() == sum(price_to_cents(price) for price in expected)
+    for follower in followers:
+        follower.close()
+    return changed, per_dish, bulk
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dishes", type=int, default=200000)
+    args = parser.parse_args()
+
+    for listeners in (False, True):
+        changed, per_dish, bulk = run(args.dishes, listeners)
+        if not listeners:
+            print(f"dishes: {args.dishes}  changed: {changed}")
+        else:
+            print("with a PriceColumn and a MenuHistory following the menu:")
+        print(f"update_menu_dish per dish: {per_dish * 1000:8.1f} ms")
+        print(f"bulk_update_menu:          {bulk * 1000:8.1f} ms  ({per_dish / bulk:.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Compares dish dictionaries with `Dish` records: memory per dish and listing speed.
+
+Usage:
+    python benchmarks/bench_dish.py [--dishes 200000]
+"""
+import argparse
+import contextlib
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dish import Dish  # noqa: E402
+from functions import get_new_menu_dish, print_restaurant_menu  # noqa: E402
+
+SPICY_SCALE_MAP = {1: "Not spicy", 2: "Low key spicy", 3: "Hot", 4: "Diabolical"}
+
+
+def build_dicts(count):
+    return [get_new_menu_dish([f"dish {i}", str(100 + i % 900), f"{5 + i % 2000 / 100:.2f}",
+                               "yes" if i % 3 else "no", str(1 + i % 4)], SPICY_SCALE_MAP) for i in range(count)]
+
+
+def measure_memory(factory):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    menu = factory()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / len(menu), menu
+
+
+def best_of(repeat, function):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dishes", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    source = build_dicts(args.dishes)
+    dict_bytes, dicts = measure_memory(lambda: [dict(dish) for dish in source])
+    dish_bytes, dishes = measure_memory(lambda: [Dish.from_dict(dish) for dish in source])
+    # The field values (names, floats) are shared or allocated in both cases; the difference is the container.
+    print(f"dishes: {args.dishes}")
+    print(f"memory per dish:   dict {dict_bytes:6.0f} B   Dish {dish_bytes:6.0f} B")
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        dict_list = best_of(args.repeat, lambda: print_restaurant_menu(dicts, SPICY_SCALE_MAP))
+        dish_list = best_of(args.repeat, lambda: print_restaurant_menu(dishes, SPICY_SCALE_MAP))
+    print(f"print_restaurant_menu: dict {dict_list * 1000:7.1f} ms   Dish {dish_list * 1000:7.1f} ms")
+
+    dict_scan = best_of(args.repeat, lambda: [d["price"] for d in dicts if d["is_vegetarian"] == "yes"])
+    dish_item_scan = best_of(args.repeat, lambda: [d["price"] for d in dishes if d["is_vegetarian"] == "yes"])
+    dish_attr_scan = best_of(args.repeat, lambda: [d.price_cents for d in dishes if d.is_vegetarian == "yes"])
+    print(f"vegetarian scan:   dict[key] {dict_scan * 1000:7.1f} ms   Dish[key] {dish_item_scan * 1000:7.1f} ms   "
+          f"Dish.attr {dish_attr_scan * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Compares the exact expense rating (load the whole file, then rate it) with the sampled estimate.
+
+Usage:
+    python benchmarks/bench_estimate.py [--dishes 2000000] [--mean-price 14] [--confidence 0.95]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from estimate import estimate_expense_rating  # noqa: E402
+from functions import get_expense_rating, load_menu_from_csv, total_price_cents  # noqa: E402
+
+SPICY_SCALE_MAP = {1: "Not spicy", 2: "Low key spicy", 3: "Hot", 4: "Diabolical"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dishes", type=int, default=2000000)
+    parser.add_argument("--mean-price", type=float, default=14.0)
+    parser.add_argument("--confidence", type=float, default=0.95)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "export.csv")
+        with open(filename, "w") as f:
+            for i in range(args.dishes):
+                price = max(0.5, rng.gauss(args.mean_price, args.mean_price / 2))
+                f.write(f"dish {i},{rng.randint(50, 1500)},{price:.2f},{rng.choice(['yes', 'no'])},"
+                        f"{rng.randint(1, 4)}\n")
+        print(f"dishes: {args.dishes}  file: {os.path.getsize(filename) / 1e6:.0f} MB")
+
+        start = time.perf_counter()
+        menu = []
+        load_menu_from_csv(filename, menu, SPICY_SCALE_MAP)
+        average = total_price_cents(menu) / (100 * len(menu))
+        exact_time = time.perf_counter() - start
+        print(f"exact:     {get_expense_rating(average):3}  average {average:7.3f}"
+              f"                       {exact_time * 1000:9.1f} ms")
+        del menu
+
+        start = time.perf_counter()
+        result = estimate_expense_rating(filename, SPICY_SCALE_MAP, confidence=args.confidence, seed=args.seed)
+        estimate_time = time.perf_counter() - start
+        print(f"estimated: {result['rating']:3}  average {result['average_price']:7.3f}  "
+              f"[{result['low']:.3f}, {result['high']:.3f}]  {estimate_time * 1000:9.1f} ms  "
+              f"({result['sampled_rows']} rows in {result['blocks']} blocks, decided: {result['decided']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Compares `load_menu_from_csv()` with the bytes-level `load_menu_from_csv_fast()`.
+
+Usage:
+    python benchmarks/bench_fast_csv.py [--dishes 500000] [--quoted 0.01]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fast_csv import load_menu_from_csv_fast  # noqa: E402
+from functions import load_menu_from_csv  # noqa: E402
+
+SPICY_SCALE_MAP = {1: "Not spicy", 2: "Low key spicy", 3: "Hot", 4: "Diabolical"}
+
+
+def best_of(repeat, function):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dishes", type=int, default=500000)
+    parser.add_argument("--quoted", type=float, default=0.01, help="share of quoted rows (general path)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "menu.csv")
+        with open(filename, "w") as f:
+            for i in range(args.dishes):
+                name = f'"dish, {i}"' if rng.random() < args.quoted else f"dish {i}"
+                f.write(f"{name},{rng.randint(50, 1500)},{rng.randint(100, 4000) / 100:.2f},"
+                        f"{rng.choice(['yes', 'no'])},{rng.randint(1, 4)}\n")
+
+        def load(loader):
+            menu = []
+            invalid_rows = loader(filename, menu, SPICY_SCALE_MAP)
+            return menu, invalid_rows
+
+        csv_time, expected = best_of(args.repeat, lambda: load(load_menu_from_csv))
+        fast_time, result = best_of(args.repeat, lambda: load(load_menu_from_csv_fast))
+
+    assert result == expected
+    print(f"dishes: {args.dishes}  quoted: {args.quoted:.0%}")
+    print(f"csv.reader path: {csv_time * 1000:8.1f} ms")
+    print(f"bytes path:      {fast_time * 1000:8.1f} ms  ({csv_time / fast_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Measures scatter-gather query throughput of `PartitionedMenu` for growing numbers of workers.
+
+Compares the expense rating and a vegetarian count-limited listing on one in-process list with
+the same queries on a menu partitioned across 1, 2, 4, ... worker processes (up to --workers).
+The speedup is bounded by the number of cores of the machine.
+
+Usage:
+    python benchmarks/bench_partition.py [--dishes 1000000] [--workers 4] [--queries 5]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from functions import add_dishes_bulk, get_expense_rating, price_to_cents, total_price_cents  # noqa: E402
+from partition import PartitionedMenu  # noqa: E402
+
+SPICY_SCALE_MAP = {1: "Not spicy", 2: "Low key spicy", 3: "Hot", 4: "Diabolical"}
+
+
+def timed(queries, function):
+    start = time.perf_counter()
+    for _ in range(queries):
+        function()
+    return (time.perf_counter() - start) / queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dishes", type=int, default=1000000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--queries", type=int, default=5)
+    args = parser.parse_args()
+
+    menu = []
+    add_dishes_bulk([f"dish {i},{100 + i % 900},{5 + i % 2000 / 100:.2f},{'yes' if i % 3 else 'no'},{1 + i % 4}"
+                     for i in range(args.dishes)], menu, SPICY_SCALE_MAP)
+
+    def list_rating():
+        return get_expense_rating(total_price_cents(menu) / (100 * len(menu)))
+
+    def list_top():
+        return sorted((dish for dish in menu if dish["is_vegetarian"] == "yes"),
+                      key=lambda dish: price_to_cents(dish["price"]))[:20]
+
+    print(f"dishes: {args.dishes}  cores: {os.cpu_count()}")
+    print(f"one list         rating {timed(args.queries, list_rating) * 1000:8.1f} ms   "
+          f"cheapest 20 vegetarian {timed(args.queries, list_top) * 1000:8.1f} ms")
+
+    workers = 1
+    while workers <= args.workers:
+        with PartitionedMenu(SPICY_SCALE_MAP, workers=workers, dishes=menu) as partitioned:
+            rating = timed(args.queries, partitioned.expense_rating)
+            top = timed(args.queries, lambda: partitioned.list_dishes(vegetarian_only=True, order_by="price",
+                                                                      limit=20))
+        print(f"{workers:2} workers       rating {rating * 1000:8.1f} ms   cheapest 20 vegetarian {top * 1000:8.1f} ms")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
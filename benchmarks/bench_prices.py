@@ -0,0 +1,56 @@
+"""
+Compares summing prices as integer cents in an array with summing boxed float prices.
+
+Usage:
+    python benchmarks/bench_prices.py [--dishes 1000000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from functions import format_price_cents  # noqa: E402
+from prices import PriceColumn  # noqa: E402
+
+
+def best_of(repeat, function):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dishes", type=int, default=1000000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    menu = [{"name": f"dish {i}", "calories": 100, "price": rng.randint(0, 9999) / 100, "is_vegetarian": "no",
+             "spicy_level": 1} for i in range(args.dishes)]
+    column = PriceColumn(menu, follow=False)
+
+    float_time, float_total = best_of(args.repeat, lambda: sum(dish["price"] for dish in menu))
+    floats = [dish["price"] for dish in menu]
+    list_time, _ = best_of(args.repeat, lambda: sum(floats))
+    cents_time, cents_total = best_of(args.repeat, lambda: sum(column.cents))
+    running_time, _ = best_of(args.repeat, column.total_cents)
+
+    print(f"dishes: {args.dishes}")
+    print(f"float sum over dicts:  {float_time * 1000:8.1f} ms  total {float_total!r}")
+    print(f"float sum over a list: {list_time * 1000:8.1f} ms")
+    print(f"cents sum over array:  {cents_time * 1000:8.1f} ms  total {format_price_cents(cents_total)}")
+    print(f"running total:         {running_time * 1000:8.4f} ms")
+    print(f"memory: {len(menu) * 24} bytes of boxed floats vs {column.cents.itemsize * len(column.cents)} "
+          f"bytes of cents")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Measures cold and warm startup times of a process that bootstraps a menu from CSV.
+
+- cold: the CSV file is parsed and validated (no precomputed image exists yet).
+- warm: the dishes are restored from the precomputed image written by the cold start.
+
+Each measurement runs a fresh interpreter, so interpreter startup and module imports are included.
+
+Usage:
+    python benchmarks/bench_startup.py [--dishes 100000] [--repeat 5]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BOOTSTRAP = (
+    "import sys\n"
+    "from menu_cache import load_menu_cached\n"
+    "menu = []\n"
+    "load_menu_cached(sys.argv[1], menu, {1: '', 2: '', 3: '', 4: ''}, check=sys.argv[2])\n"
+)
+
+
+def write_menu_csv(filename, dishes):
+    with open(filename, 'w') as f:
+        for i in range(dishes):
+            f.write(f"dish {i % 100000},{100 + i % 900},{5 + i % 2000 / 100:.2f},"
+                    f"{'yes' if i % 3 else 'no'},{1 + i % 4}\n")
+
+
+def time_process(args):
+    start = time.perf_counter()
+    subprocess.run(args, check=True, cwd=ROOT)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dishes", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--check", choices=["mtime", "hash"], default="mtime")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "menu.csv")
+        write_menu_csv(filename, args.dishes)
+        command = [sys.executable, "-c", BOOTSTRAP, filename, args.check]
+
+        baseline = min(time_process([sys.executable, "-c", "pass"]) for _ in range(args.repeat))
+        cold = []
+        warm = []
+        for _ in range(args.repeat):
+            if os.path.exists(filename + ".cache"):
+                os.remove(filename + ".cache")
+            cold.append(time_process(command))
+            warm.append(time_process(command))
+
+    print(f"dishes: {args.dishes}, check: {args.check}")
+    print(f"interpreter only: {baseline * 1000:8.1f} ms")
+    print(f"cold start:       {min(cold) * 1000:8.1f} ms (best of {args.repeat})")
+    print(f"warm start:       {min(warm) * 1000:8.1f} ms (best of {args.repeat})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Compares re-importing a large menu file with a full rebuild and with `sync_menu_from_csv()`.
+
+The file is the menu as saved, with a few dishes changed, added and removed.
+
+Usage:
+    python benchmarks/bench_sync.py [--dishes 200000] [--changes 100]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from functions import clear_menu, get_new_menu_dish, load_menu_from_csv, save_menu_to_csv  # noqa: E402
+from functions import sync_menu_from_csv  # noqa: E402
+
+SPICY_SCALE_MAP = {1: "Not spicy", 2: "Low key spicy", 3: "Hot", 4: "Diabolical"}
+
+
+def build_menu(count):
+    return [get_new_menu_dish([f"dish {i}", str(100 + i % 900), f"{5 + i % 2000 / 100:.2f}",
+                               "yes" if i % 3 else "no", str(1 + i % 4)], SPICY_SCALE_MAP) for i in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dishes", type=int, default=200000)
+    parser.add_argument("--changes", type=int, default=100)
+    args = parser.parse_args()
+
+    menu = build_menu(args.dishes)
+    edited = [dict(dish) for dish in menu]
+    step = max(1, len(edited) // args.changes)
+    for i in range(0, len(edited), step):
+        edited[i]["price"] = edited[i]["price"] + 1
+    del edited[1::step]
+    edited.extend(build_menu(args.dishes + args.changes)[args.dishes:])
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "menu.csv")
+        save_menu_to_csv(edited, filename)
+
+        rebuilt = [dict(dish) for dish in menu]
+        start = time.perf_counter()
+        clear_menu(rebuilt)
+        load_menu_from_csv(filename, rebuilt, SPICY_SCALE_MAP)
+        rebuild_time = time.perf_counter() - start
+
+        synced = [dict(dish) for dish in menu]
+        start = time.perf_counter()
+        counts = sync_menu_from_csv(filename, synced, SPICY_SCALE_MAP)
+        sync_time = time.perf_counter() - start
+
+    print(f"dishes: {args.dishes}  {counts}")
+    print(f"full rebuild: {rebuild_time * 1000:8.1f} ms")
+    print(f"sync:         {sync_time * 1000:8.1f} ms")
+    assert sorted(rebuilt, key=lambda d: d["name"]) == sorted(synced, key=lambda d: d["name"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Load test for the menu HTTP server on localhost.
+
+Starts `server.py` in this process with a synthetic menu (or targets an already running server
+with --url) and fires requests from several client threads over keep-alive connections.
+Reports throughput and latency percentiles for plain requests and for conditional requests
+(If-None-Match), which the server answers with 304 Not Modified.
+
+Usage:
+    python benchmarks/load_test_server.py [--dishes 1000] [--clients 8] [--requests 2000]
+    python benchmarks/load_test_server.py --url http://127.0.0.1:8080 --path /rating
+"""
+import argparse
+import http.client
+import os
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from functions import add_dishes_bulk  # noqa: E402
+from server import SPICY_SCALE_MAP, make_menu_server  # noqa: E402
+
+
+def run_client(host, port, path, requests, conditional, latencies, errors):
+    conn = http.client.HTTPConnection(host, port)
+    headers = {}
+    for _ in range(requests):
+        start = time.perf_counter()
+        conn.request("GET", path, headers=headers)
+        response = conn.getresponse()
+        response.read()
+        latencies.append(time.perf_counter() - start)
+        if response.status not in (200, 304):
+            errors.append(response.status)
+        if conditional and response.getheader("ETag"):
+            headers = {"If-None-Match": response.getheader("ETag")}
+    conn.close()
+
+
+def run_load(host, port, path, clients, requests, conditional):
+    latencies = []
+    errors = []
+    threads = [threading.Thread(target=run_client, args=(host, port, path, requests, conditional, latencies, errors))
+               for _ in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    total = len(latencies)
+    label = "conditional" if conditional else "plain"
+    print(f"{label:12} {total / elapsed:9.0f} req/s   p50 {latencies[total // 2] * 1000:6.2f} ms   "
+          f"p99 {latencies[int(total * 0.99)] * 1000:6.2f} ms   errors {len(errors)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=None, help="target a running server instead of starting one")
+    parser.add_argument("--path", default="/menu?vegetarian=yes")
+    parser.add_argument("--dishes", type=int, default=1000)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=2000, help="requests per client")
+    args = parser.parse_args()
+
+    server = None
+    if args.url is None:
+        menu = []
+        add_dishes_bulk([f"dish {i},{100 + i % 900},{5 + i % 2000 / 100:.2f},{'yes' if i % 3 else 'no'},{1 + i % 4}"
+                         for i in range(args.dishes)], menu, SPICY_SCALE_MAP)
+        server = make_menu_server(menu, port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        host, port = server.server_address
+    else:
+        parts = urlsplit(args.url)
+        host, port = parts.hostname, parts.port or 80
+
+    print(f"GET {args.path} on {host}:{port}, {args.clients} clients x {args.requests} requests")
+    run_load(host, port, args.path, args.clients, args.requests, conditional=False)
+    run_load(host, port, args.path, args.clients, args.requests, conditional=True)
+
+    if server is not None:
+        print(f"cache hits {server.cache.hits}, misses {server.cache.misses}")
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Replays recorded or synthetic operator sessions of the interactive main loop.
+
+Record a session with `python main.py --record session.jsonl`, then replay it (or generated
+sessions) at full speed against a menu of the chosen size, with several simulated operators
+working on the same menu concurrently. Reports throughput and latency percentiles per option.
+
+Usage:
+    python benchmarks/replay_sessions.py [--dishes 100000] [--operators 4] [--operations 200]
+    python benchmarks/replay_sessions.py --session session.jsonl --dishes 500000
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from session import load_session, replay_sessions, synthetic_session  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--session", action="append", default=None, metavar="FILE",
+                        help="a recorded session to replay (repeatable); synthetic sessions otherwise")
+    parser.add_argument("--dishes", type=int, default=100000)
+    parser.add_argument("--operators", type=int, default=1)
+    parser.add_argument("--operations", type=int, default=200, help="operations per synthetic session")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        if args.session:
+            sessions = [load_session(filename) for filename in args.session]
+        else:
+            sessions = [synthetic_session(args.operations, args.dishes, seed=args.seed + k,
+                                          save_filename=os.path.join(directory, f"replay_{k}.csv"))
+                        for k in range(args.operators)]
+        report = replay_sessions(sessions, menu_size=args.dishes, operators=args.operators)
+
+    print(f"dishes: {report['menu_size']}  operators: {report['operators']}  "
+          f"operations: {report['operations']}  {report['throughput']:.1f} ops/s")
+    for option, stats in report["by_option"].items():
+        print(f"{option}  count {stats['count']:6}  errors {stats['errors']:4}  mean {stats['mean_ms']:8.2f} ms  "
+              f"p50 {stats['p50_ms']:8.2f} ms  p95 {stats['p95_ms']:8.2f} ms  p99 {stats['p99_ms']:8.2f} ms  "
+              f"max {stats['max_ms']:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
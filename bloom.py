@@ -0,0 +1,229 @@
+"""
+Compact probabilistic membership filter over dish names.
+
+Checking whether an incoming dish is already on a large menu means scanning
+`restaurant_menu_list` or keeping a full set of names in memory. `MenuNameFilter` keeps a
+counting Bloom filter over the dish names instead: one byte counter per slot, `hashes` slots per
+name. A name whose slots are not all set is definitely not on the menu, so `has_dish()` skips the
+exact lookup for it; only the (configurable, rare) false positives and the names that really are
+on the menu fall through to the scan.
+
+The filter follows the menu's change events, so it is filled while `load_menu_from_csv()` appends
+the loaded dishes and kept up to date by adds, name updates, deletes and clears (counters make
+deletes possible; a counter that reaches 255 stays there). If the menu grows past the capacity
+the filter was sized for, it is rebuilt with twice the capacity.
+
+The slots come from Python's string hash, so a filter is only meaningful within one process.
+
+The filter is opt-in: callers that check incoming names (e.g. an import validated against the
+catalog) create one and call `has_dish()` or `existing_names()`. `load_menu_from_csv()`,
+`add_dishes_bulk()` and the interactive add allow duplicate names and make no duplicate check
+to speed up, and `sync_menu_from_csv()` needs the position of every name, so none of them
+consults the filter.
+
+Example:
+    names = MenuNameFilter(restaurant_menu_list, false_positive_rate=0.001)
+    names.has_dish("burrito")
+    names.stats()               # size, memory, expected false-positive rate, skipped lookups
+"""
+import math
+
+from functions import subscribe_menu_events, unsubscribe_menu_events
+
+_MAX_COUNT = 255
+
+
+def bloom_parameters(capacity, false_positive_rate, max_bytes=None):
+    """
+    Computes the number of slots and hash functions of a Bloom filter.
+
+    Args:
+        capacity (int): The number of names the filter should hold.
+        false_positive_rate (float): The target false-positive rate at `capacity` names (0 < rate < 1).
+        max_bytes (int, optional): An upper bound on the memory of the filter (one byte per slot).
+                                   The false-positive rate is higher than the target if it binds.
+
+    Returns:
+        tuple: `(slots, hashes)`.
+    """
+    capacity = max(1, capacity)
+    slots = math.ceil(-capacity * math.log(false_positive_rate) / math.log(2) ** 2)
+    if max_bytes is not None:
+        slots = min(slots, max_bytes)
+    slots = max(8, slots)
+    hashes = max(1, round(slots / capacity * math.log(2)))
+    return slots, hashes
+
+
+def expected_false_positive_rate(slots, hashes, count):
+    """Returns the expected false-positive rate of a Bloom filter holding `count` names."""
+    return (1 - math.exp(-hashes * count / slots)) ** hashes
+
+
+class MenuNameFilter:
+    """
+    A counting Bloom filter over the dish names of one menu, kept in sync through change events.
+
+    Args:
+        restaurant_menu_list (list): The menu to follow.
+        false_positive_rate (float, optional): The target false-positive rate. Defaults to 0.01.
+        max_bytes (int, optional): An upper bound on the memory of the filter. Defaults to None (no bound).
+        capacity (int, optional): The number of names to size the filter for. Defaults to twice the
+                                  size of the menu (at least 1024).
+    """
+
+    def __init__(self, restaurant_menu_list, false_positive_rate=0.01, max_bytes=None, capacity=None):
+        self.menu = restaurant_menu_list
+        self.false_positive_rate = false_positive_rate
+        self.max_bytes = max_bytes
+        self.lookups = 0
+        self.definite_misses = 0
+        self.false_positives = 0
+        self.rebuilds = 0
+        self._build(capacity or max(1024, 2 * len(restaurant_menu_list)))
+        subscribe_menu_events(self._on_change)
+
+    def close(self):
+        """Stops following the menu's changes."""
+        unsubscribe_menu_events(self._on_change)
+
+    def _build(self, capacity):
+        self.capacity = capacity
+        self.slots, self.hashes = bloom_parameters(capacity, self.false_positive_rate, self.max_bytes)
+        self.counters = bytearray(self.slots)
+        self.count = 0
+        for dish in self.menu:
+            self._add(dish["name"])
+
+    def _positions(self, name):
+        h = hash(name) & 0xFFFFFFFFFFFFFFFF
+        h1 = h & 0xFFFFFFFF
+        h2 = (h >> 32) | 1
+        slots = self.slots
+        return [(h1 + i * h2) % slots for i in range(self.hashes)]
+
+    def _add(self, name):
+        counters = self.counters
+        for pos in self._positions(name):
+            if counters[pos] < _MAX_COUNT:
+                counters[pos] += 1
+        self.count += 1
+
+    def _remove(self, name):
+        counters = self.counters
+        for pos in self._positions(name):
+            if 0 < counters[pos] < _MAX_COUNT:
+                counters[pos] -= 1
+        self.count -= 1
+
+    def might_contain(self, name):
+        """
+        Checks the filter for a dish name.
+
+        Args:
+            name (str): The dish name.
+
+        Returns:
+            bool: False if the name is definitely not on the menu; True if it probably is.
+        """
+        counters = self.counters
+        for pos in self._positions(name):
+            if not counters[pos]:
+                return False
+        return True
+
+    def has_dish(self, name):
+        """
+        Checks whether a dish with the given name is on the menu, skipping the scan on definite misses.
+
+        Args:
+            name (str): The dish name (compared exactly).
+
+        Returns:
+            bool: True if a dish of the menu has this name.
+        """
+        self.lookups += 1
+        if not self.might_contain(name):
+            self.definite_misses += 1
+            return False
+        for dish in self.menu:
+            if dish["name"] == name:
+                return True
+        self.false_positives += 1
+        return False
+
+    def existing_names(self, names):
+        """
+        Returns which of many incoming dish names are already on the menu.
+
+        Names the filter rules out are skipped; the remaining candidates are checked exactly in a
+        single scan of the menu (no scan at all if every name is a definite miss).
+
+        Args:
+            names (iterable): The dish names to check, e.g. the first field of each imported row.
+
+        Returns:
+            set: The names that are on the menu.
+        """
+        candidates = set()
+        for name in names:
+            self.lookups += 1
+            if self.might_contain(name):
+                candidates.add(name)
+            else:
+                self.definite_misses += 1
+        if not candidates:
+            return set()
+        found = {dish["name"] for dish in self.menu if dish["name"] in candidates}
+        self.false_positives += len(candidates - found)
+        return found
+
+    def stats(self):
+        """
+        Returns the size and effectiveness of the filter.
+
+        Returns:
+            dict: The "names" held, "capacity", "slots", "hashes", "memory_bytes", the
+                  "target_false_positive_rate", the "expected_false_positive_rate" at the current
+                  number of names, and the "lookups", "definite_misses" and "false_positives" seen
+                  by `has_dish()`.
+        """
+        return {
+            "names": self.count,
+            "capacity": self.capacity,
+            "slots": self.slots,
+            "hashes": self.hashes,
+            "memory_bytes": len(self.counters),
+            "target_false_positive_rate": self.false_positive_rate,
+            "expected_false_positive_rate": expected_false_positive_rate(self.slots, self.hashes, self.count),
+            "lookups": self.lookups,
+            "definite_misses": self.definite_misses,
+            "false_positives": self.false_positives,
+        }
+
+    def _on_change(self, change):
+        if change["menu"] is not self.menu:
+            return
+        kind = change["kind"]
+        if kind == "add":
+            self._add(change["dish"]["name"])
+        elif kind == "bulk_load":
+            for dish in change["dishes"]:
+                self._add(dish["name"])
+        elif kind == "update":
+            if change["field"] == "name":
+                self._remove(change["old"])
+                self._add(change["new"])
+        elif kind == "bulk_update":
+            for _, _, field, old, new in change["changes"]:
+                if field == "name":
+                    self._remove(old)
+                    self._add(new)
+        elif kind == "delete":
+            self._remove(change["dish"]["name"])
+        elif kind == "clear":
+            self.counters = bytearray(self.slots)
+            self.count = 0
+        if self.count > self.capacity and (self.max_bytes is None or self.slots < self.max_bytes):
+            self.rebuilds += 1
+            self._build(2 * self.capacity)
@@ -0,0 +1,450 @@
+"""
+Scriptable command-line driver for the restaurant menu.
+
+Every subcommand runs a single operation against a menu CSV file without prompting and prints
+one JSON object to stdout. The `run` subcommand executes a pipeline file with one operation per
+line, loading the menu once and saving it once at the end. The `estimate` subcommand rates a
+large file by sampling it, without loading the menu.
+
+Examples:
+    python cli.py --menu menu.csv list --vegetarian
+    python cli.py --menu menu.csv add "taco,300,5.5,yes,1" "soup,100,4,no,1"
+    python cli.py --menu menu.csv update 2 price 13.5
+    python cli.py --menu menu.csv bulk-update --where is_vegetarian=yes --increase-price 5
+    python cli.py --menu menu.csv run nightly.ops
+    python cli.py --menu menu.csv combo 1200 25 --vegetarian --max-spicy 2
+    python cli.py --menu export.csv estimate --confidence 0.99
+
+Only `argparse`, `json` and `functions` are imported at startup; everything else is imported
+by the subcommand that needs it.
+"""
+import argparse
+import json
+import sys
+
+from functions import (DISH_FIELDS, add_dishes_bulk, bulk_update_menu, clear_menu, delete_dish, get_expense_rating,
+                       is_dish, load_menu_from_csv, parse_price_cents, price_to_cents, save_menu_to_csv,
+                       total_price_cents, update_menu_dish)
+
+SPICY_SCALE_MAP = {
+    1: "Not spicy",
+    2: "Low key spicy",
+    3: "Hot",
+    4: "Diabolical",
+}
+
+MUTATING_COMMANDS = {"add", "update", "bulk-update", "delete", "import"}
+
+
+def build_parser():
+    """
+    Builds the argument parser with one subparser per menu operation.
+
+    Returns:
+        argparse.ArgumentParser: The parser for the command line (and for each pipeline line).
+    """
+    parser = argparse.ArgumentParser(prog="cli.py", description="Run menu operations without prompts.")
+    parser.add_argument("--menu", required=True, metavar="CSV", help="the menu file to operate on")
+    parser.add_argument("--dry-run", action="store_true", help="do not write changes back to the menu file")
+    parser.add_argument("--output", metavar="CSV", default=None,
+                        help="write the changed menu to this file instead of over the menu file")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    add_operation_parsers(subparsers)
+
+    run_parser = subparsers.add_parser("run", help="run a pipeline file, one operation per line")
+    run_parser.add_argument("pipeline", help="the pipeline file ('-' for stdin)")
+
+    estimate_parser = subparsers.add_parser("estimate",
+                                            help="estimate the expense rating by sampling, without loading the menu")
+    estimate_parser.add_argument("--confidence", type=float, default=0.95, help="the confidence level (0-1)")
+    estimate_parser.add_argument("--seed", type=int, default=None, help="the seed of the sampling")
+    return parser
+
+
+def add_operation_parsers(subparsers):
+    """
+    Adds the subparsers of the single menu operations (everything except `run`).
+
+    Args:
+        subparsers (argparse._SubParsersAction): The object returned by `add_subparsers()`.
+
+    Returns:
+        None
+    """
+    list_parser = subparsers.add_parser("list", help="list the dishes")
+    list_parser.add_argument("--vegetarian", action="store_true", help="only list vegetarian dishes")
+
+    add_parser = subparsers.add_parser("add", help="add dishes given as comma-separated lines")
+    add_parser.add_argument("dishes", nargs="+", metavar="DISH",
+                            help="name,calories,price,is_vegetarian,spicy_level")
+
+    update_parser = subparsers.add_parser("update", help="update one field of a dish")
+    update_parser.add_argument("index", help="the 1-based dish number")
+    update_parser.add_argument("field", help="the field to update")
+    update_parser.add_argument("value", help="the new value")
+
+    bulk_parser = subparsers.add_parser("bulk-update", help="update fields of every dish that matches conditions")
+    bulk_parser.add_argument("--where", action="append", default=[], metavar="FIELD=VALUE",
+                             help="only update dishes with this value (repeatable; all conditions must hold)")
+    bulk_parser.add_argument("--set", action="append", default=[], metavar="FIELD=VALUE",
+                             help="the new value of a field (repeatable)")
+    bulk_parser.add_argument("--increase-price", type=float, default=None, metavar="PERCENT",
+                             help="raise the price by this percentage (negative to lower it)")
+
+    delete_parser = subparsers.add_parser("delete", help="delete a dish or the entire menu")
+    delete_group = delete_parser.add_mutually_exclusive_group(required=True)
+    delete_group.add_argument("index", nargs="?", help="the 1-based dish number")
+    delete_group.add_argument("--all", action="store_true", help="delete the entire menu")
+
+    subparsers.add_parser("rating", help="show the average price and the expense rating")
+
+    combo_parser = subparsers.add_parser("combo", help="find the best set of dishes within calorie and price limits")
+    combo_parser.add_argument("calories", type=int, help="the highest total calories")
+    combo_parser.add_argument("budget", type=float, help="the highest total price")
+    combo_parser.add_argument("--vegetarian", action="store_true", help="only use vegetarian dishes")
+    combo_parser.add_argument("--max-spicy", type=int, default=None, help="the highest spicy level")
+    combo_parser.add_argument("--objective", default="price", choices=("price", "calories", "dishes"),
+                              help="what to maximize (default: price)")
+    combo_parser.add_argument("--max-dishes", type=int, default=None, help="the highest number of dishes")
+
+    import_parser = subparsers.add_parser("import", help="append the dishes of another CSV file")
+    import_parser.add_argument("source", help="the CSV file to import")
+
+    export_parser = subparsers.add_parser("export", help="save the menu to another CSV file")
+    export_parser.add_argument("target", help="the CSV file to write")
+
+
+def build_operation_parser():
+    """
+    Builds a parser for a single pipeline line (no global flags, no nested `run`).
+
+    Returns:
+        argparse.ArgumentParser: The parser for one operation.
+    """
+    parser = argparse.ArgumentParser(prog="pipeline", add_help=False)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    add_operation_parsers(subparsers)
+    return parser
+
+
+def run_operation(args, restaurant_menu_list, spicy_scale_map):
+    """
+    Runs one menu operation and returns its JSON-serializable result.
+
+    Args:
+        args (argparse.Namespace): The parsed operation (with a `command` attribute).
+        restaurant_menu_list (list): The menu the operation runs against. It is modified in place.
+        spicy_scale_map (dict): A dictionary mapping integer spiciness levels to string descriptions.
+
+    Returns:
+        dict: The result, always containing "command" and "ok". Failed operations also contain "error".
+    """
+    command = args.command
+    result = {"command": command, "ok": True}
+
+    if command == "list":
+        if args.vegetarian:
+            dishes = [dish for dish in restaurant_menu_list if dish["is_vegetarian"].lower() == "yes"]
+        else:
+            dishes = restaurant_menu_list
+        result["count"] = len(dishes)
+        result["dishes"] = dishes
+    elif command == "add":
+        added, invalid_lines = add_dishes_bulk(args.dishes, restaurant_menu_list, spicy_scale_map)
+        result["added"] = added
+        result["invalid"] = invalid_lines
+        result["ok"] = not invalid_lines
+        if invalid_lines:
+            result["error"] = "invalid dish"
+    elif command == "update":
+        if not is_index_string(args.index):
+            return failed(result, "invalid dish number")
+        outcome = update_menu_dish(restaurant_menu_list, args.index, spicy_scale_map, args.field, args.value,
+                                   start_idx=1)
+        if is_dish(outcome):
+            result["dish"] = outcome
+        elif outcome == 0:
+            return failed(result, "empty menu")
+        elif outcome == -1:
+            return failed(result, "invalid dish number")
+        elif outcome == -2:
+            return failed(result, "invalid field")
+        else:
+            return failed(result, f"invalid value for {outcome}")
+    elif command == "bulk-update":
+        where = where_predicate(args.where)
+        if where is None:
+            return failed(result, "invalid condition")
+        changes = {}
+        for assignment in args.set:
+            field_key, equals, value = assignment.partition("=")
+            if not equals:
+                return failed(result, "invalid assignment")
+            changes[field_key] = value
+        if args.increase_price is not None:
+            if "price" in changes:
+                return failed(result, "price is both set and increased")
+            from decimal import Decimal
+
+            # exact decimal arithmetic; bulk_update_menu() then rounds half away from zero to the cent
+            factor = (100 + Decimal(repr(args.increase_price))) / 10000
+            changes["price"] = lambda dish: str(price_to_cents(dish["price"]) * factor)
+        if not changes:
+            return failed(result, "nothing to update")
+        outcome = bulk_update_menu(restaurant_menu_list, spicy_scale_map, changes, where=where)
+        if outcome == -2:
+            return failed(result, "invalid field")
+        elif type(outcome) == str:
+            return failed(result, f"invalid value for {outcome}")
+        result["changed"] = outcome
+    elif command == "delete":
+        if args.all:
+            result["deleted"] = len(restaurant_menu_list)
+            clear_menu(restaurant_menu_list)
+        else:
+            outcome = delete_dish(restaurant_menu_list, args.index, 1)
+            if is_dish(outcome):
+                result["dish"] = outcome
+            elif outcome == 0:
+                return failed(result, "empty menu")
+            else:
+                return failed(result, "invalid dish number")
+    elif command == "rating":
+        if restaurant_menu_list:
+            avg_price = total_price_cents(restaurant_menu_list) / (100 * len(restaurant_menu_list))
+            result["average_price"] = avg_price
+            result["rating"] = get_expense_rating(avg_price)
+        else:
+            result["average_price"] = 0.0
+            result["rating"] = None
+    elif command == "combo":
+        from combos import get_combo_optimizer
+
+        combo = get_combo_optimizer(restaurant_menu_list).best_combo(
+            args.calories, args.budget, vegetarian_only=args.vegetarian, max_spicy_level=args.max_spicy,
+            objective=args.objective, max_dishes=args.max_dishes)
+        result["dish_numbers"] = [i + 1 for i in combo["indices"]]
+        result["dishes"] = combo["dishes"]
+        result["total_price"] = combo["total_price"]
+        result["total_calories"] = combo["total_calories"]
+        result["optimal"] = combo["optimal"]
+    elif command == "import":
+        before = len(restaurant_menu_list)
+        invalid_rows = load_menu_from_csv(args.source, restaurant_menu_list, spicy_scale_map)
+        if invalid_rows == -1:
+            return failed(result, "invalid file name")
+        elif invalid_rows is None:
+            return failed(result, "file not found")
+        result["added"] = len(restaurant_menu_list) - before
+        result["invalid_rows"] = invalid_rows
+    elif command == "export":
+        if save_menu_to_csv(restaurant_menu_list, args.target) == -1:
+            return failed(result, "invalid file name")
+        result["count"] = len(restaurant_menu_list)
+
+    return result
+
+
+def where_predicate(conditions):
+    """
+    Builds the predicate of `bulk-update` from its `--where FIELD=VALUE` conditions.
+
+    Values are compared like they are stored: prices in cents, calories and spicy levels as integers,
+    "yes"/"no" without regard to case, and names exactly.
+
+    Args:
+        conditions (list): The conditions as typed.
+
+    Returns:
+        callable or None: A function that takes a dish and returns True if every condition holds,
+                          or None if a condition is malformed.
+    """
+    tests = []
+    for condition in conditions:
+        field_key, equals, value = condition.partition("=")
+        if not equals or field_key not in DISH_FIELDS:
+            return None
+        if field_key == "price":
+            cents = parse_price_cents(value)
+            if cents is None:
+                return None
+            tests.append(lambda dish, cents=cents: price_to_cents(dish["price"]) == cents)
+        elif field_key in ("calories", "spicy_level"):
+            if not value.lstrip("-").isdigit():
+                return None
+            tests.append(lambda dish, field_key=field_key, number=int(value): dish[field_key] == number)
+        elif field_key == "is_vegetarian":
+            tests.append(lambda dish, answer=value.lower(): dish["is_vegetarian"].lower() == answer)
+        else:
+            tests.append(lambda dish, name=value: dish["name"] == name)
+    return lambda dish: all(test(dish) for test in tests)
+
+
+def is_index_string(idx):
+    """
+    Checks whether a command-line dish number is a string of digits.
+
+    Args:
+        idx (str): The dish number as typed.
+
+    Returns:
+        bool: True if `idx` only contains digits.
+    """
+    return type(idx) == str and idx.isdigit()
+
+
+def failed(result, message):
+    """
+    Marks an operation result as failed.
+
+    Args:
+        result (dict): The result being built by `run_operation()`.
+        message (str): A short description of the error.
+
+    Returns:
+        dict: The same `result`, with "ok" set to False and "error" set to `message`.
+    """
+    result["ok"] = False
+    result["error"] = message
+    return result
+
+
+def read_pipeline(pipeline):
+    """
+    Splits a pipeline file into operations. Blank lines and lines starting with '#' are ignored.
+
+    Args:
+        pipeline (str): The pipeline file name, or '-' to read from stdin.
+
+    Returns:
+        list: A list of `(line_number, argv)` tuples. `argv` is the error message (a str) for a line
+              that cannot be split, e.g. because of an unclosed quote.
+
+    Raises:
+        OSError: If the pipeline file cannot be read.
+    """
+    import shlex
+
+    if pipeline == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(pipeline, "r") as f:
+            lines = f.read().splitlines()
+
+    operations = []
+    for i, line in enumerate(lines, start=1):
+        stripped = line.strip()
+        if stripped and not stripped.startswith("#"):
+            try:
+                operations.append((i, shlex.split(stripped)))
+            except ValueError as error:
+                operations.append((i, f"cannot split the line: {error}"))
+    return operations
+
+
+def run_pipeline(operations, restaurant_menu_list, spicy_scale_map):
+    """
+    Runs the operations of a pipeline in order, stopping at the first failure.
+
+    Args:
+        operations (list): The `(line_number, argv)` tuples returned by `read_pipeline()`.
+        restaurant_menu_list (list): The menu the operations run against.
+        spicy_scale_map (dict): A dictionary mapping integer spiciness levels to string descriptions.
+
+    Returns:
+        dict: The pipeline result with "ok", "changed" and the list of per-operation "results".
+    """
+    parser = build_operation_parser()
+    results = []
+    changed = False
+    for line_number, argv in operations:
+        if type(argv) == str:
+            results.append({"command": None, "ok": False, "line": line_number, "error": argv})
+            break
+        try:
+            args = parser.parse_args(argv)
+        except SystemExit:
+            results.append({"command": argv[0] if argv else None, "ok": False, "line": line_number,
+                            "error": "invalid operation"})
+            break
+        result = run_operation(args, restaurant_menu_list, spicy_scale_map)
+        result["line"] = line_number
+        results.append(result)
+        if result["ok"] and args.command in MUTATING_COMMANDS:
+            changed = True
+        if not result["ok"]:
+            break
+
+    return {"command": "run", "ok": all(result["ok"] for result in results), "changed": changed,
+            "results": results}
+
+
+def main(argv=None):
+    """
+    Entry point: loads the menu file, runs the requested operation and prints the JSON result.
+
+    Changes are written back to the menu file (or to the `--output` file) unless `--dry-run` is given
+    or the operation failed. A pipeline is saved only if every operation succeeded. If the menu file
+    has rows that could not be loaded, saving over it would delete them: the change is then not
+    saved and the operation fails, unless `--output` names another file. The result has "saved_to"
+    set to the file that was written.
+
+    Args:
+        argv (list, optional): The command-line arguments. Defaults to `sys.argv[1:]`.
+
+    Returns:
+        int: The exit code (0 if the operation succeeded, 1 otherwise).
+    """
+    args = build_parser().parse_args(argv)
+
+    if args.command == "estimate":
+        from estimate import estimate_expense_rating
+
+        estimate = estimate_expense_rating(args.menu, SPICY_SCALE_MAP, confidence=args.confidence, seed=args.seed)
+        if estimate == -1 or estimate is None:
+            error = "invalid menu file name" if estimate == -1 else "file not found"
+            print(json.dumps({"command": "estimate", "ok": False, "error": error}))
+            return 1
+        print(json.dumps({"command": "estimate", "ok": True, **estimate}))
+        return 0
+
+    restaurant_menu_list = []
+    invalid_rows = load_menu_from_csv(args.menu, restaurant_menu_list, SPICY_SCALE_MAP)
+    if invalid_rows == -1:
+        print(json.dumps({"command": args.command, "ok": False, "error": "invalid menu file name"}))
+        return 1
+
+    if args.command == "run":
+        try:
+            operations = read_pipeline(args.pipeline)
+        except (OSError, UnicodeDecodeError) as error:
+            print(json.dumps({"command": "run", "ok": False, "changed": False, "results": [],
+                              "error": f"cannot read the pipeline: {error}"}))
+            return 1
+        result = run_pipeline(operations, restaurant_menu_list, SPICY_SCALE_MAP)
+        changed = result["changed"]
+    else:
+        result = run_operation(args, restaurant_menu_list, SPICY_SCALE_MAP)
+        changed = result["ok"] and args.command in MUTATING_COMMANDS
+
+    if invalid_rows:
+        result["menu_invalid_rows"] = invalid_rows
+
+    if changed and result["ok"] and not args.dry_run:
+        import os
+
+        output = args.output or args.menu
+        if invalid_rows and os.path.abspath(output) == os.path.abspath(args.menu):
+            failed(result, f"not saved: the {len(invalid_rows)} invalid rows of the menu file would be lost "
+                           f"(use --output to save to another file)")
+        elif save_menu_to_csv(restaurant_menu_list, output) == -1:
+            failed(result, "invalid output file name")
+        else:
+            result["saved_to"] = output
+
+    print(json.dumps(result, default=dict))
+    return 0 if result["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,228 @@
+"""
+Combo optimizer: the best set of dishes under calorie, budget, vegetarian and spiciness limits.
+
+`ComboOptimizer.best_combo()` answers questions like "the best set of dishes under 1200 calories
+and $25, vegetarian only, spicy level at most 2", where the best set is the one with the highest
+total price (the default; it spends as much of the budget as the calories allow), the most
+calories, or the most dishes. Each dish is used at most once.
+
+This is a knapsack problem with two capacities (calories and price), solved exactly with
+branch-and-bound:
+
+- the candidate table of a filter (vegetarian only or not, highest spicy level) is built once per
+  menu version (`get_menu_version()`) and objective, with prices in integer cents and the dishes
+  sorted by decreasing objective value; it is rebuilt only after the menu changed;
+- the search picks dishes in table order, and stops exploring a branch as soon as an upper bound
+  of what it can still reach is not better than the best combo found: the remaining budget and
+  calories limit how many more dishes fit (counting the cheapest and lightest candidates), and
+  at most that many of the next, most valuable candidates can be added;
+- dishes with identical price, calories and value are tried only once per position, so duplicated
+  dishes do not multiply the search.
+
+The search stops after `max_nodes` combos; the result then says it is not proven optimal.
+
+Example:
+    optimizer = get_combo_optimizer(restaurant_menu_list)
+    optimizer.best_combo(1200, 25, vegetarian_only=True, max_spicy_level=2)
+"""
+from bisect import bisect_right
+from collections import OrderedDict
+from itertools import accumulate
+
+from functions import get_menu_version, price_to_cents
+
+COMBO_OBJECTIVES = ("price", "calories", "dishes")
+
+# the shared optimizers of the most recently used menus (see `sorting.MAX_SHARED_SORTERS`)
+MAX_SHARED_OPTIMIZERS = 8
+
+_optimizers = OrderedDict()
+
+
+class ComboOptimizer:
+    """
+    Finds the best combos of dishes of one menu, with candidate tables cached per menu version.
+
+    Args:
+        restaurant_menu_list (list): The menu to pick dishes from.
+    """
+
+    def __init__(self, restaurant_menu_list):
+        self.menu = restaurant_menu_list
+        self.version = None
+        self.tables = {}
+        self.builds = 0
+
+    def _table(self, objective, vegetarian_only, max_spicy_level):
+        """
+        Returns the candidates of a filter, best value first, as `((value, price_cents, calories, index),
+        dominated_by)` pairs (`dominated_by` is only computed for the "dishes" objective, else 0).
+        """
+        if self.version != get_menu_version():
+            self.tables.clear()
+            self.version = get_menu_version()
+        key = (objective, vegetarian_only, max_spicy_level)
+        table = self.tables.get(key)
+        if table is None:
+            table = []
+            for idx, dish in enumerate(self.menu):
+                if vegetarian_only and dish["is_vegetarian"].lower() != "yes":
+                    continue
+                if max_spicy_level is not None and dish["spicy_level"] > max_spicy_level:
+                    continue
+                price_cents = price_to_cents(dish["price"])
+                calories = int(dish["calories"])
+                value = price_cents if objective == "price" else calories if objective == "calories" else 1
+                table.append((value, price_cents, calories, idx))
+            table.sort(key=lambda item: (-item[0], item[1], item[2], item[3]))
+            if objective == "dishes":
+                table = list(zip(table, _dominance_counts(table)))
+            else:
+                table = [(item, 0) for item in table]
+            self.tables[key] = table
+            self.builds += 1
+        return table
+
+    def best_combo(self, max_calories, max_price, vegetarian_only=False, max_spicy_level=None, objective="price",
+                   max_dishes=None, max_nodes=20000):
+        """
+        Finds the set of dishes with the highest total objective within the limits.
+
+        Args:
+            max_calories (int): The highest total calories.
+            max_price (float): The highest total price, in dollars.
+            vegetarian_only (bool, optional): Only use vegetarian dishes. Defaults to False.
+            max_spicy_level (int, optional): Only use dishes up to this spicy level. Defaults to None (any).
+            objective (str, optional): What to maximize: "price" (default), "calories" or "dishes".
+            max_dishes (int, optional): The highest number of dishes in the combo. Defaults to None (any).
+            max_nodes (int, optional): The number of combos the search may try. Defaults to 20000.
+
+        Returns:
+            dict or int:
+                - Returns -1 if `objective` is not one of `COMBO_OBJECTIVES`.
+                - Otherwise the combo: "indices" (0-based menu indices, in menu order), "dishes",
+                  "total_price", "total_calories", "optimal" (False if the search stopped at
+                  `max_nodes`) and "nodes" (the combos tried). The combo is empty if no dish fits.
+        """
+        if objective not in COMBO_OBJECTIVES:
+            return -1
+
+        budget = price_to_cents(max_price)
+        table = self._table(objective, vegetarian_only, max_spicy_level)
+        items = [item for item, _ in table if item[1] <= budget and item[2] <= max_calories]
+        price_sums = [0, *accumulate(sorted(item[1] for item in items))]
+        calorie_sums = [0, *accumulate(sorted(item[2] for item in items))]
+        most = min(bisect_right(price_sums, budget), bisect_right(calorie_sums, max_calories)) - 1
+        if max_dishes is not None:
+            most = min(most, max_dishes)
+        if objective == "dishes":
+            # a dish that `most` cheaper and lighter dishes dominate can always be swapped for one of them;
+            # the others are tried by their share of both limits, so good combos are found first
+            items = [item for item, dominated_by in table
+                     if dominated_by < most and item[1] <= budget and item[2] <= max_calories]
+            items.sort(key=lambda item: item[1] * max_calories + item[2] * budget)
+        n = len(items)
+        value_sums = [0, *accumulate(item[0] for item in items)]
+        # every combo also fits the sum of both limits, each scaled by the other limit
+        combined_sums = [0, *accumulate(sorted(item[1] * max_calories + item[2] * budget for item in items))]
+        best = [0, []]
+        picks = []
+        nodes = 0
+        stopped = False
+
+        def search(start, value, price_left, calories_left, slots):
+            nonlocal nodes, stopped
+            fit = min(slots, min(bisect_right(price_sums, price_left), bisect_right(calorie_sums, calories_left),
+                                 bisect_right(combined_sums, price_left * max_calories + calories_left * budget)) - 1)
+            cap = price_left if objective == "price" else calories_left if objective == "calories" else fit
+            previous = None
+            for j in range(start, n):
+                if value + min(cap, value_sums[min(n, j + fit)] - value_sums[j]) <= best[0]:
+                    return
+                if nodes >= max_nodes:
+                    stopped = True
+                    return
+                item = items[j]
+                if item[:3] == previous or item[1] > price_left or item[2] > calories_left:
+                    continue
+                previous = item[:3]
+                nodes += 1
+                picks.append(item[3])
+                if value + item[0] > best[0]:
+                    best[0] = value + item[0]
+                    best[1] = picks[:]
+                if slots > 1:
+                    search(j + 1, value + item[0], price_left - item[1], calories_left - item[2], slots - 1)
+                picks.pop()
+
+        search(0, 0, budget, max_calories, most)
+        indices = sorted(best[1])
+        dishes = [self.menu[i] for i in indices]
+        return {
+            "indices": indices,
+            "dishes": dishes,
+            "total_price": sum(price_to_cents(dish["price"]) for dish in dishes) / 100,
+            "total_calories": sum(int(dish["calories"]) for dish in dishes),
+            "optimal": not stopped,
+            "nodes": nodes,
+        }
+
+
+def _dominance_counts(items):
+    """
+    Counts, for every item, the items that are at most as expensive and at most as heavy in calories
+    (ties broken by price, calories and menu index), with a Fenwick tree over the calorie ranks.
+    """
+    ranks = {calories: rank for rank, calories in enumerate(sorted({item[2] for item in items}), start=1)}
+    tree = [0] * (len(ranks) + 1)
+    counts = [0] * len(items)
+    for position in sorted(range(len(items)), key=lambda k: (items[k][1], items[k][2], items[k][3])):
+        rank = ranks[items[position][2]]
+        count = 0
+        i = rank
+        while i:
+            count += tree[i]
+            i -= i & -i
+        counts[position] = count
+        while rank < len(tree):
+            tree[rank] += 1
+            rank += rank & -rank
+    return counts
+
+
+def get_combo_optimizer(restaurant_menu_list):
+    """
+    Returns the shared `ComboOptimizer` of a menu list, creating it on first use.
+
+    Only the optimizers of the `MAX_SHARED_OPTIMIZERS` most recently used menus are kept, so the
+    registry does not keep dropped menus (and their candidate tables) alive.
+
+    Args:
+        restaurant_menu_list (list): The menu.
+
+    Returns:
+        ComboOptimizer: The optimizer whose candidate tables are cached for this menu.
+    """
+    key = id(restaurant_menu_list)
+    optimizer = _optimizers.get(key)
+    if optimizer is None or optimizer.menu is not restaurant_menu_list:
+        optimizer = ComboOptimizer(restaurant_menu_list)
+        _optimizers[key] = optimizer
+    _optimizers.move_to_end(key)
+    while len(_optimizers) > MAX_SHARED_OPTIMIZERS:
+        _optimizers.popitem(last=False)
+    return optimizer
+
+
+def release_combo_optimizer(restaurant_menu_list):
+    """
+    Forgets the shared `ComboOptimizer` of a menu list.
+
+    Returns:
+        bool: True if the menu had an optimizer.
+    """
+    optimizer = _optimizers.get(id(restaurant_menu_list))
+    if optimizer is None or optimizer.menu is not restaurant_menu_list:
+        return False
+    del _optimizers[id(restaurant_menu_list)]
+    return True
@@ -0,0 +1,138 @@
+"""
+Typed, slotted dish record.
+
+`Dish` stores the five dish fields in `__slots__` with normalized types (name and is_vegetarian
+as str, calories and spicy_level as int, the price as integer cents), which takes about a third
+of the memory of the equivalent dict and gives fast attribute access (`dish.price`).
+
+For backward compatibility a `Dish` also behaves like the dish dictionaries used everywhere else:
+`dish["price"]`, `dish["calories"] = "350"`, `"name" in dish`, `dict(dish)`, `dish.keys()` and
+comparison with an equal dict all work, so the existing helpers in `functions.py` accept it.
+
+Example:
+    to_dish_menu(restaurant_menu_list)          # convert a loaded menu in place
+    dish = new_dish_record(["taco", "300", "5.5", "yes", "1"], spicy_scale_map)
+"""
+from collections.abc import Mapping
+
+from functions import format_price_cents, get_new_menu_dish, price_to_cents
+
+FIELDS = ("name", "calories", "price", "is_vegetarian", "spicy_level")
+
+
+class Dish(Mapping):
+    """
+    A dish of the menu with typed fields.
+
+    Args:
+        name (str): The name of the dish.
+        calories (int or str): The calorie count; converted to int.
+        price (float, int or str): The price in dollars; stored as integer cents.
+        is_vegetarian (str): "yes" or "no".
+        spicy_level (int or str): The spiciness level; converted to int.
+    """
+
+    __slots__ = ("name", "calories", "price_cents", "is_vegetarian", "spicy_level")
+
+    def __init__(self, name, calories, price, is_vegetarian, spicy_level):
+        self.name = str(name)
+        self.calories = int(calories)
+        self.price_cents = price_to_cents(price)
+        self.is_vegetarian = str(is_vegetarian)
+        self.spicy_level = int(spicy_level)
+
+    @classmethod
+    def from_dict(cls, dish):
+        """Builds a `Dish` from a dish dictionary (or any mapping with the five fields)."""
+        return cls(dish["name"], dish["calories"], dish["price"], dish["is_vegetarian"], dish["spicy_level"])
+
+    @property
+    def price(self):
+        """The price in dollars, as a float."""
+        return self.price_cents / 100
+
+    @price.setter
+    def price(self, value):
+        self.price_cents = price_to_cents(value)
+
+    def __getitem__(self, key):
+        if key == "price":
+            return self.price_cents / 100
+        if key in FIELDS:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key == "name":
+            self.name = str(value)
+        elif key == "calories":
+            self.calories = int(value)
+        elif key == "price":
+            self.price_cents = price_to_cents(value)
+        elif key == "is_vegetarian":
+            self.is_vegetarian = str(value)
+        elif key == "spicy_level":
+            self.spicy_level = int(value)
+        else:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in FIELDS
+
+    def __iter__(self):
+        return iter(FIELDS)
+
+    def __len__(self):
+        return len(FIELDS)
+
+    def __eq__(self, other):
+        if type(other) == Dish:
+            return (self.name, self.calories, self.price_cents, self.is_vegetarian, self.spicy_level) == \
+                   (other.name, other.calories, other.price_cents, other.is_vegetarian, other.spicy_level)
+        return Mapping.__eq__(self, other)
+
+    __hash__ = None
+
+    def to_dict(self):
+        """Returns the dish as a plain dictionary, like the ones built by `get_new_menu_dish()`."""
+        return {"name": self.name, "calories": self.calories, "price": self.price_cents / 100,
+                "is_vegetarian": self.is_vegetarian, "spicy_level": self.spicy_level}
+
+    def __repr__(self):
+        return (f"Dish(name={self.name!r}, calories={self.calories}, price={format_price_cents(self.price_cents)}, "
+                f"is_vegetarian={self.is_vegetarian!r}, spicy_level={self.spicy_level})")
+
+
+def new_dish_record(dish_list, spicy_scale_map):
+    """
+    Validates the fields of a dish like `get_new_menu_dish()` and returns a `Dish`.
+
+    Args:
+        dish_list (list): The five field strings [name, calories, price, is_vegetarian, spicy_level].
+        spicy_scale_map (dict): A dictionary mapping integer spiciness levels to string descriptions.
+
+    Returns:
+        Dish, tuple or int: The `Dish` if every field is valid; otherwise the same error value as
+                            `get_new_menu_dish()` (a `(field_name, value)` tuple or the field count).
+    """
+    dish = get_new_menu_dish(dish_list, spicy_scale_map)
+    if type(dish) == dict:
+        return Dish.from_dict(dish)
+    return dish
+
+
+def to_dish_menu(restaurant_menu_list):
+    """
+    Replaces the dish dictionaries of a menu with `Dish` records, in place.
+
+    The list object is kept (and no change event is sent), so code holding a reference to the
+    menu keeps working.
+
+    Args:
+        restaurant_menu_list (list): The menu to convert.
+
+    Returns:
+        list: The same `restaurant_menu_list`.
+    """
+    restaurant_menu_list[:] = [dish if type(dish) == Dish else Dish.from_dict(dish) for dish in restaurant_menu_list]
+    return restaurant_menu_list
@@ -0,0 +1,178 @@
+"""
+Approximate expense rating of a CSV menu file, with error bounds and early stopping.
+
+`get_restaurant_expense_rating()` needs every dish on `restaurant_menu_list`, so rating a
+multi-gigabyte supplier export means loading all of it. `estimate_expense_rating()` reads the
+file directly and only samples it:
+
+- a sample is a block of consecutive rows starting at a random byte offset (the rest of the line
+  at the offset is skipped, and a block that reaches the end of the file wraps around to its
+  start), so the cost of a sample does not depend on the size of the file;
+- rows are validated like `load_menu_from_csv()` validates them, and invalid rows are left out;
+- the average price is the ratio of the sampled price total to the sampled number of valid dishes,
+  and its confidence interval comes from the variance between blocks (blocks are the sampling
+  units, so rows that are alike because they are close in the file do not narrow the interval);
+- sampling stops as soon as the whole interval lies in one rating bucket ($ below 10, $$ below 20,
+  $$$ otherwise), after at least `min_blocks` blocks.
+
+Files up to `exact_bytes` are scanned completely instead, which gives the exact answer. Both paths
+decode the file with the same `encoding` (undecodable bytes are replaced), so a row is valid or
+invalid in the same way whichever path reads it.
+
+A block starts after the line that contains the random offset, so each row is picked with a
+probability proportional to the length of the row before it. The estimate is therefore only
+unbiased if the row lengths do not depend on the prices, which holds for ordinary menus. The
+interval is checked after every block, so its confidence level is approximate.
+
+Example:
+    estimate_expense_rating("supplier_export.csv", spicy_scale_map, confidence=0.99)
+    # {"rating": "$$", "average_price": 14.2, "low": 13.9, "high": 14.5, "decided": True, ...}
+"""
+import csv
+import os
+import random
+from statistics import NormalDist
+
+from functions import get_expense_rating, get_new_menu_dish, price_to_cents
+
+
+def _block_rows(f, offset, rows_per_block, encoding):
+    """Reads up to `rows_per_block` lines after the line containing `offset`, wrapping at the end."""
+    f.seek(offset)
+    f.readline()
+    lines = []
+    wrapped = False
+    while len(lines) < rows_per_block:
+        line = f.readline()
+        if not line:
+            if wrapped:
+                break
+            wrapped = True
+            f.seek(0)
+            continue
+        lines.append(line.decode(encoding, errors="replace").replace("\r\n", "\n"))
+    return csv.reader(lines, delimiter=',')
+
+
+def _price_totals(rows, spicy_scale_map):
+    """Returns the total price in cents and the number of the valid dishes among `rows`."""
+    total_cents = 0
+    count = 0
+    for row in rows:
+        dish = get_new_menu_dish(row, spicy_scale_map)
+        if isinstance(dish, dict):
+            total_cents += price_to_cents(dish['price'])
+            count += 1
+    return total_cents, count
+
+
+def _exact_result(total_cents, count, confidence, rows):
+    average = total_cents / (100 * count) if count else 0.0
+    return {
+        "rating": get_expense_rating(average) if count else None,
+        "average_price": average,
+        "low": average,
+        "high": average,
+        "confidence": confidence,
+        "decided": True,
+        "exact": True,
+        "sampled_rows": rows,
+        "valid_rows": count,
+        "blocks": 0,
+    }
+
+
+def estimate_expense_rating(filename, spicy_scale_map, confidence=0.95, rows_per_block=64, min_blocks=30,
+                            max_blocks=10000, exact_bytes=4 * 1024 * 1024, seed=None, encoding="utf-8"):
+    """
+    Estimates the average dish price and the expense rating of a CSV menu file by sampling it.
+
+    Args:
+        filename (str): The name of the CSV file. The file must have a '.csv' extension.
+        spicy_scale_map (dict): A dictionary mapping integer spiciness levels to string descriptions,
+                                used to validate the sampled rows.
+        confidence (float, optional): The confidence level of the interval (0 < confidence < 1).
+                                      Defaults to 0.95.
+        rows_per_block (int, optional): The number of consecutive rows per sample. Defaults to 64.
+        min_blocks (int, optional): The number of blocks sampled before stopping early. Defaults to 30.
+        max_blocks (int, optional): The number of blocks after which sampling stops even if the
+                                    rating is not decided. Defaults to 10000.
+        exact_bytes (int, optional): Files up to this size are scanned completely. Defaults to 4 MiB.
+        seed (int, optional): The seed of the random offsets, for reproducible estimates.
+        encoding (str, optional): The encoding of the file. Defaults to "utf-8".
+
+    Returns:
+        int:
+            - Returns -1 if the filename does not end with '.csv'.
+        None:
+            - Returns None if the file does not exist.
+        dict:
+            - "rating" ("$", "$$", "$$$", or None if no valid dish was found), "average_price",
+              the interval "low" and "high", "confidence", "decided" (True if the whole interval
+              has the same rating), "exact" (True if the file was scanned completely),
+              "sampled_rows", "valid_rows" and "blocks".
+
+    Helper Functions:
+        - get_new_menu_dish(): Validates each sampled row.
+        - get_expense_rating(): Maps the average price to the rating.
+    """
+    if not filename.endswith('.csv'):
+        return -1
+
+    if not os.path.exists(filename):
+        return None
+
+    size = os.path.getsize(filename)
+    if size <= exact_bytes:
+        with open(filename, 'r', encoding=encoding, errors="replace", newline='') as f:
+            rows = list(csv.reader(f, delimiter=','))
+        total_cents, count = _price_totals(rows, spicy_scale_map)
+        return _exact_result(total_cents, count, confidence, len(rows))
+
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    rng = random.Random(seed)
+    blocks = 0
+    sampled_rows = 0
+    total_cents = 0
+    count = 0
+    sum_tt = sum_tc = sum_cc = 0
+    low = high = average = 0.0
+    decided = False
+    with open(filename, 'rb') as f:
+        while blocks < max_blocks:
+            rows = list(_block_rows(f, rng.randrange(size), rows_per_block, encoding))
+            block_cents, block_count = _price_totals(rows, spicy_scale_map)
+            blocks += 1
+            sampled_rows += len(rows)
+            total_cents += block_cents
+            count += block_count
+            sum_tt += block_cents * block_cents
+            sum_tc += block_cents * block_count
+            sum_cc += block_count * block_count
+            if blocks < 2 or not count:
+                continue
+
+            # variance of the ratio estimator: sum((t - ratio * c) ** 2) / ((n - 1) * n * mean_count ** 2)
+            ratio = total_cents / count
+            residuals = max(0.0, sum_tt - 2 * ratio * sum_tc + ratio * ratio * sum_cc)
+            variance = residuals / ((blocks - 1) * blocks * (count / blocks) ** 2)
+            half_width = z * variance ** 0.5
+            average = ratio / 100
+            low = (ratio - half_width) / 100
+            high = (ratio + half_width) / 100
+            decided = get_expense_rating(low) == get_expense_rating(high)
+            if decided and blocks >= min_blocks:
+                break
+
+    return {
+        "rating": get_expense_rating(average) if count else None,
+        "average_price": average,
+        "low": low,
+        "high": high,
+        "confidence": confidence,
+        "decided": decided,
+        "exact": False,
+        "sampled_rows": sampled_rows,
+        "valid_rows": count,
+        "blocks": blocks,
+    }
@@ -0,0 +1,313 @@
+"""
+Change-data-capture stream for menu mutations.
+
+`MenuEventBus` subscribes to the change notifications of `functions.py` (see
+`subscribe_menu_events()`) and turns every add, update, delete, bulk load and clear into a typed
+`MenuEvent`. Each attached sink gets its own bounded queue and worker thread, which delivers the
+events in batches, so a slow consumer never runs inside the operation that changed the menu.
+
+When a sink's queue is full the bus either blocks the mutating operation until there is room
+(`backpressure="block"`) or drops the event and counts it (`backpressure="drop"`).
+
+Example:
+    bus = MenuEventBus(menu=restaurant_menu_list)
+    bus.add_sink(FileSink("menu_changes.jsonl"))
+    ...
+    bus.close()
+"""
+import json
+import queue
+import threading
+import time
+from collections import namedtuple
+
+from functions import is_dish, subscribe_menu_events, unsubscribe_menu_events
+
+EVENT_KINDS = ("add", "update", "bulk_update", "delete", "bulk_load", "clear")
+
+MenuEvent = namedtuple("MenuEvent", ["kind", "version", "timestamp", "index", "dish", "field", "old", "new",
+                                     "dishes", "count", "changes"])
+MenuEvent.__doc__ = """
+A single menu change.
+
+Fields:
+    kind (str): "add", "update", "bulk_update", "delete", "bulk_load" or "clear".
+    version (int): The menu version after the change (see `get_menu_version()`).
+    timestamp (float): The time of the change, in seconds since the epoch.
+    index (int or None): The 0-based position of the changed dish (the first new dish for "bulk_load").
+    dish (dict or None): A copy of the added, updated or deleted dish.
+    field, old, new: The updated field with its previous and new value ("update" only).
+    dishes (list or None): Copies of the appended dishes ("bulk_load" only).
+    count (int or None): The number of removed dishes ("clear") or of changed dishes ("bulk_update").
+    changes (list or None): `(index, dish, field, old, new)` tuples, one per changed field, with a copy
+                            of the dish after the update ("bulk_update" only).
+"""
+
+
+def event_from_change(change):
+    """
+    Converts a change notification from `functions.py` into a `MenuEvent`.
+
+    Dishes are copied, so later changes to the menu do not alter events that are still queued.
+
+    Args:
+        change (dict): The dictionary passed to the listeners of `subscribe_menu_events()`.
+
+    Returns:
+        MenuEvent: The typed event.
+    """
+    dish = change["dish"]
+    dishes = change["dishes"]
+    changes = change["changes"]
+    return MenuEvent(change["kind"], change["version"], time.time(), change["index"],
+                     dict(dish) if is_dish(dish) else dish, change["field"], change["old"], change["new"],
+                     [dict(d) if is_dish(d) else d for d in dishes] if dishes is not None else None,
+                     change["count"],
+                     [(i, dict(d) if is_dish(d) else d, f, o, n) for i, d, f, o, n in changes]
+                     if changes is not None else None)
+
+
+def event_to_dict(event):
+    """
+    Converts a `MenuEvent` into a JSON-serializable dictionary, leaving out the empty fields.
+
+    Args:
+        event (MenuEvent): The event to convert.
+
+    Returns:
+        dict: The event fields that are not None.
+    """
+    return {key: value for key, value in event._asdict().items() if value is not None}
+
+
+class QueueSink:
+    """
+    Keeps the delivered events in an in-memory queue, for consumers in the same process.
+
+    Args:
+        maxsize (int, optional): The maximum number of events kept; 0 (default) means unbounded.
+    """
+
+    def __init__(self, maxsize=0):
+        self.events = queue.Queue(maxsize)
+
+    def write_batch(self, events):
+        for event in events:
+            self.events.put(event)
+
+    def close(self):
+        pass
+
+
+class FileSink:
+    """
+    Appends the delivered events to a file, one JSON object per line, flushing after each batch.
+
+    Args:
+        filename (str): The file to append to.
+    """
+
+    def __init__(self, filename):
+        self.file = open(filename, 'a')
+
+    def write_batch(self, events):
+        self.file.write("".join(json.dumps(event_to_dict(event), default=dict) + "\n" for event in events))
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class UnixSocketSink:
+    """
+    Sends the delivered events to a Unix domain stream socket, one JSON object per line.
+
+    The connection is opened on the first batch and reopened after a failure. A batch that cannot be
+    sent is counted in `failed_batches` and discarded.
+
+    Args:
+        path (str): The path of the listening socket.
+        timeout (float, optional): The connect and send timeout, in seconds. Defaults to 5.
+    """
+
+    def __init__(self, path, timeout=5.0):
+        self.path = path
+        self.timeout = timeout
+        self.sock = None
+        self.failed_batches = 0
+
+    def write_batch(self, events):
+        import socket
+
+        payload = "".join(json.dumps(event_to_dict(event), default=dict) + "\n" for event in events).encode()
+        try:
+            if self.sock is None:
+                self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                self.sock.settimeout(self.timeout)
+                self.sock.connect(self.path)
+            self.sock.sendall(payload)
+        except OSError:
+            self.failed_batches += 1
+            self.close()
+
+    def close(self):
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+
+class SinkWorker:
+    """
+    Delivers the events queued for one sink from a background thread, in batches.
+
+    A batch is written as soon as it holds `batch_size` events, or `max_delay` seconds after its
+    first event arrived, whichever comes first. A batch whose `write_batch()` raises is counted in
+    `failed_batches` (the exception is kept in `last_error`) and discarded; the worker keeps
+    draining the queue, so a failing sink never blocks the mutations.
+    """
+
+    _STOP = object()
+
+    def __init__(self, sink, batch_size, max_delay, queue_size, backpressure):
+        self.sink = sink
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.backpressure = backpressure
+        self.queue = queue.Queue(queue_size)
+        self.delivered = 0
+        self.dropped = 0
+        self.batches = 0
+        self.failed_batches = 0
+        self.last_error = None
+        self.thread = threading.Thread(target=self._run, name=f"menu-events-{type(sink).__name__}", daemon=True)
+        self.thread.start()
+
+    def put(self, event):
+        if self.backpressure == "block":
+            self.queue.put(event)
+        else:
+            try:
+                self.queue.put_nowait(event)
+            except queue.Full:
+                self.dropped += 1
+
+    def stop(self):
+        self.queue.put(self._STOP)
+        self.thread.join()
+        try:
+            self.sink.close()
+        except Exception as error:
+            self.last_error = error
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            event = self.queue.get()
+            if event is self._STOP:
+                break
+            batch = [event]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    event = self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if event is self._STOP:
+                    stopping = True
+                    break
+                batch.append(event)
+            try:
+                self.sink.write_batch(batch)
+            except Exception as error:
+                self.failed_batches += 1
+                self.last_error = error
+                continue
+            self.delivered += len(batch)
+            self.batches += 1
+
+
+class MenuEventBus:
+    """
+    Publishes the changes made through `functions.py` to any number of sinks.
+
+    Args:
+        menu (list, optional): Only publish changes of this menu list. Defaults to None (every menu).
+        batch_size (int, optional): The maximum number of events per batch. Defaults to 100.
+        max_delay (float, optional): The maximum time, in seconds, an event waits for its batch to
+                                     fill up. Defaults to 0.05.
+        queue_size (int, optional): The number of events each sink can have pending. Defaults to 10000.
+        backpressure (str, optional): "block" (default) to make mutations wait when a sink falls behind,
+                                      or "drop" to discard the events that do not fit.
+    """
+
+    def __init__(self, menu=None, batch_size=100, max_delay=0.05, queue_size=10000, backpressure="block"):
+        if backpressure not in ("block", "drop"):
+            raise ValueError(f"invalid backpressure policy: {backpressure}")
+        self.menu = menu
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.queue_size = queue_size
+        self.backpressure = backpressure
+        self.workers = []
+        self.local_listeners = []
+        self.published = 0
+        self.closed = False
+        subscribe_menu_events(self._on_change)
+
+    def add_sink(self, sink):
+        """
+        Starts delivering events to a sink (any object with `write_batch(events)` and `close()`).
+
+        Returns:
+            The sink, for chaining.
+        """
+        self.workers.append(SinkWorker(sink, self.batch_size, self.max_delay, self.queue_size, self.backpressure))
+        return sink
+
+    def add_listener(self, listener):
+        """
+        Calls `listener(event)` synchronously for every event, before it is queued for the sinks.
+        """
+        self.local_listeners.append(listener)
+
+    def publish(self, event):
+        """
+        Passes an event to the local listeners and queues it for every sink.
+        """
+        self.published += 1
+        for listener in self.local_listeners:
+            listener(event)
+        for worker in self.workers:
+            worker.put(event)
+
+    def stats(self):
+        """
+        Returns the delivery counters of the bus and of each sink.
+
+        Returns:
+            dict: "published" and a "sinks" list with "sink", "delivered", "batches", "dropped", "pending",
+                  "failed_batches" and "last_error" (the message of the last failure, or None).
+        """
+        return {"published": self.published,
+                "sinks": [{"sink": type(worker.sink).__name__, "delivered": worker.delivered,
+                           "batches": worker.batches, "dropped": worker.dropped,
+                           "pending": worker.queue.qsize(), "failed_batches": worker.failed_batches,
+                           "last_error": str(worker.last_error) if worker.last_error is not None else None}
+                          for worker in self.workers]}
+
+    def close(self):
+        """
+        Stops listening to menu changes, delivers the pending events and closes the sinks.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        unsubscribe_menu_events(self._on_change)
+        for worker in self.workers:
+            worker.stop()
+
+    def _on_change(self, change):
+        if self.menu is not None and change["menu"] is not self.menu:
+            return
+        self.publish(event_from_change(change))
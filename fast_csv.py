@@ -0,0 +1,273 @@
+"""
+Bytes-level loader for the five-field menu row format.
+
+`load_menu_from_csv()` decodes the whole file, lets `csv.reader` allocate a str per field and a
+list per row, and `get_new_menu_dish()` then re-parses the numbers from those strings.
+`load_menu_from_csv_fast()` reads the file in large binary blocks and, for a block made only of
+plain rows, tokenizes the whole block at once with C-level bytes operations:
+
+- the block is split into fields with a single `split()`, with a marker field between rows that
+  also proves every row has exactly five fields;
+- each column is validated in bulk (a regular expression over the joined prices, set inclusion
+  for the vegetarian and spiciness columns, `min()`/`max()` of the name lengths);
+- calories are parsed with `int()` straight from the bytes, prices with `float()` (exact for the
+  two-decimal prices the column check admits), and "yes"/"no" and the spiciness levels map to
+  shared objects, so the names are the only new strings, decoded with one `decode()` per block.
+
+A block with anything unusual is split around the unusual lines (quotes, carriage returns other
+than a CRLF line end, non-ASCII bytes, NULs, blank lines): the runs of plain lines between them are
+still tokenized as blocks, and the unusual lines go through the general path, which decodes them
+like text mode, splits them with one `csv.reader` (pulling the next lines for a quoted field that
+spans several lines) and validates them with `get_new_menu_dish()`. A run that fails the column
+checks is halved until the rows that need the full validation rules are isolated, and those are
+validated with `get_new_menu_dish()` one by one. The result is the same dishes and
+invalid rows as `load_menu_from_csv()`; the differential test harness checks this against the
+reference.
+
+Example:
+    invalid_rows = load_menu_from_csv_fast("huge_menu.csv", restaurant_menu_list, spicy_scale_map)
+"""
+import codecs
+import csv
+import locale
+import os
+import re
+
+import functions
+from functions import extend_menu, get_new_menu_dish
+
+BLOCK_SIZE = 1 << 20
+_ASCII_COMPATIBLE = {"ascii", "utf-8", "latin-1", "iso8859-15", "cp1252"}
+_MAX_PLAIN_LINE = 4096
+# at most 13 whole digits, so every plain price is below `functions.MAX_PRICE_CENTS`
+_PLAIN_PRICES = re.compile(rb"(?:(?:\d{1,13}(?:\.\d{0,2})?|\.\d{1,2}) )*")
+_VEGETARIAN = {b"yes": "yes", b"no": "no"}
+
+
+class _BlockReader:
+    """
+    Reads a binary file in blocks of complete lines (without their b"\\n").
+
+    `lines` holds the lines of the current block and `pos` the next line to process. The last line
+    of the file is in a block of its own if it does not end with b"\\n" (`unterminated` is then True).
+    """
+
+    def __init__(self, f):
+        self.f = f
+        self.carry = b""
+        self.lines = []
+        self.pos = 0
+        self.unterminated = False
+
+    def next_block(self):
+        """Loads the next block; returns False at the end of the file."""
+        while True:
+            block = self.f.read(BLOCK_SIZE)
+            if not block:
+                if not self.carry:
+                    return False
+                self.lines = [self.carry]
+                self.carry = b""
+                self.unterminated = True
+                self.pos = 0
+                return True
+            lines = (self.carry + block).split(b"\n")
+            self.carry = lines.pop()
+            if lines:
+                self.lines = lines
+                self.pos = 0
+                return True
+
+    def next_raw(self):
+        """Returns the next line with its b"\\n", loading blocks as needed (StopIteration at the end)."""
+        while self.pos >= len(self.lines):
+            if not self.next_block():
+                raise StopIteration
+        line = self.lines[self.pos]
+        self.pos += 1
+        if self.unterminated and self.pos == len(self.lines):
+            return line
+        return line + b"\n"
+
+
+class _TextLines:
+    """
+    Feeds `csv.reader` with text lines translated like text mode does, pulling raw lines on demand.
+
+    `pending` holds the translated lines not yet given to the reader; when it is empty after a
+    record, the reader is back at a raw line boundary.
+    """
+
+    def __init__(self, blocks, encoding):
+        self.blocks = blocks
+        self.encoding = encoding
+        self.pending = []
+
+    def push(self, raw):
+        text = raw.decode(self.encoding).replace("\r\n", "\n").replace("\r", "\n")
+        parts = text.split("\n")
+        lines = [part + "\n" for part in parts[:-1]]
+        if parts[-1]:
+            lines.append(parts[-1])
+        self.pending.extend(reversed(lines))
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        while not self.pending:
+            self.push(self.blocks.next_raw())
+        return self.pending.pop()
+
+
+def _parse_plain_block(lines, spicy_levels):
+    """
+    Tokenizes and validates a block of lines column by column.
+
+    Args:
+        lines (list): The lines of the block, without b"\\n".
+        spicy_levels (dict): The valid spiciness levels as bytes (e.g., b"3") mapped to their int.
+
+    Returns:
+        list or None: The dishes, or None if any line is not a plain, valid row.
+    """
+    fields = b",\n,".join(lines).split(b",")
+    count = len(lines)
+    if len(fields) != 6 * count - 1 or fields[5::6].count(b"\n") != count - 1:
+        return None
+    name_column = fields[0::6]
+    if min(map(len, name_column)) < 3 or max(map(len, name_column)) > 25:
+        return None
+    price_column = fields[2::6]
+    if _PLAIN_PRICES.fullmatch(b" ".join(price_column) + b" ") is None:
+        return None
+    vegetarian_column = fields[3::6]
+    spicy_column = fields[4::6]
+    if not set(vegetarian_column) <= _VEGETARIAN.keys() or not set(spicy_column) <= spicy_levels.keys():
+        return None
+    try:
+        calories = list(map(int, fields[1::6]))
+    except ValueError:
+        return None
+    names = b"\n".join(name_column).decode("ascii").split("\n")
+    prices = map(float, price_column)
+    vegetarian = map(_VEGETARIAN.__getitem__, vegetarian_column)
+    spicy = map(spicy_levels.__getitem__, spicy_column)
+    return [{"name": name, "calories": cal, "price": price, "is_vegetarian": veg, "spicy_level": level}
+            for name, cal, price, veg, level in zip(names, calories, prices, vegetarian, spicy)]
+
+
+def _strip_crlf(lines):
+    """Removes the b"\\r" of b"\\r\\n" line ends, keeping one line per line."""
+    block_text = b"\n".join(lines)
+    if b"\r" not in block_text:
+        return lines
+    return (block_text + b"\n").replace(b"\r\n", b"\n")[:-1].split(b"\n")
+
+
+def _is_plain_line(line):
+    """Checks whether a line can be split on commas without the general csv rules."""
+    return 0 < len(line) <= _MAX_PLAIN_LINE and line.isascii() and b'"' not in line and b"\r" not in line \
+        and b"\x00" not in line
+
+
+def load_menu_from_csv_fast(filename, restaurant_menu_list, spicy_scale_map):
+    """
+    Loads the restaurant menu from a CSV file like `load_menu_from_csv()`, tokenizing plain rows as bytes.
+
+    Args:
+        filename (str): The name of the CSV file from which to read the menu data.
+                        The file must have a '.csv' extension.
+        restaurant_menu_list (list): The menu the valid dishes are appended to.
+        spicy_scale_map (dict): A dictionary mapping integer spiciness levels to string descriptions.
+
+    Returns:
+        int:
+            - Returns -1 if the filename does not end with '.csv'.
+            - Returns None if the file does not exist.
+        list:
+            - Returns a list of 1-based indices of the rows that contain invalid data.
+
+    Notes:
+        - Files in an encoding that is not ASCII-compatible (the text mode default is used, as in
+          `load_menu_from_csv()`) are loaded with `load_menu_from_csv()` itself.
+    """
+    if not filename.endswith('.csv'):
+        return -1
+
+    if not os.path.exists(filename):
+        return None
+
+    encoding = locale.getpreferredencoding(False)
+    if codecs.lookup(encoding).name not in _ASCII_COMPATIBLE:
+        return functions.load_menu_from_csv(filename, restaurant_menu_list, spicy_scale_map)
+
+    spicy_levels = {str(level).encode(): level for level in spicy_scale_map if type(level) == int and level >= 0}
+    invalid_rows = []
+    new_dishes = []
+    row_number = 0
+
+    def add_plain_rows(lines):
+        nonlocal row_number
+        dishes = _parse_plain_block(lines, spicy_levels)
+        if dishes is not None:
+            new_dishes.extend(dishes)
+            row_number += len(dishes)
+        elif len(lines) > 1:
+            middle = len(lines) // 2
+            add_plain_rows(lines[:middle])
+            add_plain_rows(lines[middle:])
+        else:
+            row_number += 1
+            invalid_rows.append(row_number)
+            dish = get_new_menu_dish(lines[0].decode(encoding).split(","), spicy_scale_map)
+            if isinstance(dish, dict):
+                invalid_rows.pop()
+                new_dishes.append(dish)
+
+    with open(filename, 'rb') as f:
+        blocks = _BlockReader(f)
+        text_lines = _TextLines(blocks, encoding)
+        reader = csv.reader(text_lines, delimiter=',')
+        while blocks.next_block():
+            raw_lines = blocks.lines
+            lines = _strip_crlf(raw_lines)
+            block_text = b"\n".join(lines)
+            if lines[0] and lines[-1] and block_text.isascii() and b'"' not in block_text \
+                    and b"\r" not in block_text and b"\x00" not in block_text and b"\n\n" not in block_text \
+                    and max(map(len, lines)) <= _MAX_PLAIN_LINE:
+                add_plain_rows(lines)
+                blocks.pos = len(lines)
+
+            while blocks.pos < len(lines):
+                end = blocks.pos
+                while end < len(lines) and _is_plain_line(lines[end]):
+                    end += 1
+                if end > blocks.pos:
+                    add_plain_rows(lines[blocks.pos:end])
+                    blocks.pos = end
+                    continue
+
+                text_lines.push(blocks.next_raw())
+                while True:
+                    row = next(reader, None)
+                    if row is None:
+                        break
+                    row_number += 1
+                    dish = get_new_menu_dish(row, spicy_scale_map)
+                    if isinstance(dish, dict):
+                        new_dishes.append(dish)
+                    else:
+                        invalid_rows.append(row_number)
+                    if not text_lines.pending:
+                        break
+                if blocks.lines is not raw_lines:
+                    raw_lines = blocks.lines
+                    lines = _strip_crlf(raw_lines)
+
+            if len(new_dishes) >= functions.LOAD_CHUNK_SIZE:
+                extend_menu(restaurant_menu_list, new_dishes)
+                new_dishes = []
+
+    extend_menu(restaurant_menu_list, new_dishes)
+    return invalid_rows
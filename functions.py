@@ -22,6 +22,15 @@ def print_main_menu(the_menu):
     print("==========================")
 
 
+LIST_SORT_OPTIONS = {
+    "P": ("price", False),
+    "C": ("calories", False),
+    "S": ("spicy_level", False),
+    "N": ("name", False),
+}
+LIST_TOP_N = 10
+
+
 def list_helper(list_menu, restaurant_menu_list, spicy_scale_map):
     """
     Displays all menu items or only vegetarian items based on the user's selection.
@@ -44,6 +53,10 @@ def list_helper(list_menu, restaurant_menu_list, spicy_scale_map):
         - If the restaurant menu is empty, a warning message is displayed.
         - If the user selects option 'A', all items from the menu are displayed.
         - If the user selects option 'V', only vegetarian items are displayed.
+        - If the user selects one of `LIST_SORT_OPTIONS` ('P', 'C', 'S' or 'N'), all items are displayed
+          sorted by price, calories, spiciness or name, from the cached permutations of `sorting.py`.
+        - If the user selects option 'T', the `LIST_TOP_N` most expensive items are displayed.
+        - Sorted listings keep each dish's menu number, so it can be used to update or delete the dish.
     """
     if len(restaurant_menu_list) == 0:
         print("WARNING: There is nothing to display!")
@@ -56,6 +69,20 @@ def list_helper(list_menu, restaurant_menu_list, spicy_scale_map):
         elif subopt == 'V':
             print_restaurant_menu(restaurant_menu_list, spicy_scale_map, show_idx=True, start_idx=1,
                                   vegetarian_only=True)
+        elif subopt in LIST_SORT_OPTIONS:
+            from sorting import get_menu_sorter
+
+            key, descending = LIST_SORT_OPTIONS[subopt]
+            sorter = get_menu_sorter(restaurant_menu_list)
+            indices = sorter.sorted_indices(key, descending)
+            print_restaurant_menu([restaurant_menu_list[i] for i in indices], spicy_scale_map, show_idx=True,
+                                  dish_numbers=[i + 1 for i in indices])
+        elif subopt == 'T':
+            from sorting import get_menu_sorter
+
+            top = get_menu_sorter(restaurant_menu_list).top_n("price", LIST_TOP_N)
+            print_restaurant_menu([dish for _, dish in top], spicy_scale_map, show_idx=True,
+                                  dish_numbers=[i + 1 for i, _ in top])
 
 
 def get_selection(action, suboptions, to_upper=True, go_back=False):
@@ -110,7 +137,7 @@ def get_selection(action, suboptions, to_upper=True, go_back=False):
 
 
 def print_restaurant_menu(restaurant_menu, spicy_scale_map, name_only=False,
-                          show_idx=True, start_idx=0, vegetarian_only=False):
+                          show_idx=True, start_idx=0, vegetarian_only=False, dish_numbers=None):
     """
     Prints the restaurant menu with optional filters and formatting.
 
@@ -133,6 +160,9 @@ def print_restaurant_menu(restaurant_menu, spicy_scale_map, name_only=False,
                                    Defaults to 0.
         vegetarian_only (bool, optional): If True, only dishes with "is_vegetarian" set to "yes" 
                                           are printed. If False (default), all dishes are printed.
+        dish_numbers (list, optional): The number to show for each dish, e.g. its position in the full
+                                       menu when `restaurant_menu` is a sorted selection. If None
+                                       (default), dishes are numbered from `start_idx`.
 
     Returns:
         None: This function prints the restaurant menu to the console and does not return a value.
@@ -140,12 +170,12 @@ def print_restaurant_menu(restaurant_menu, spicy_scale_map, name_only=False,
     """
     idx = start_idx
     print("------------------------------------------")
-    for dish in restaurant_menu:
+    for position, dish in enumerate(restaurant_menu):
         if vegetarian_only and dish["is_vegetarian"].lower() != "yes":
             continue
 
         if show_idx:
-            print(f"{idx}. ", end="")
+            print(f"{idx if dish_numbers is None else dish_numbers[position]}. ", end="")
 
         print(dish["name"].upper())
         if not name_only:
@@ -283,7 +313,9 @@ def is_valid_price(price_str):
 
     This function checks if the provided `price_str` is a string that contains a valid 
     decimal number, which represents a price. The function relies on `is_num()` to 
-    verify if the string can be converted to a valid number (either integer or float).
+    verify if the string can be converted to a valid number (either integer or float), 
+    and on `parse_price_cents()` to reject values that are not a finite amount of cents 
+    ("nan", "inf").
 
     Args:
         price_str (str): A string that is expected to contain a valid decimal number 
@@ -295,7 +327,7 @@ def is_valid_price(price_str):
             - False if `price_str` is not a valid number or cannot be converted to a number.
     """
 
-    if is_num(price_str):
+    if is_num(price_str) and parse_price_cents(price_str) is not None:
         return True
     else:
         return False
@@ -371,9 +403,9 @@ def get_new_menu_dish(dish_list, spicy_scale_map):
         if is_valid_name(dish_list[0]):
             name = dish_list[0]
             if is_valid_calories(dish_list[1]):
-                calories = float(dish_list[1])
+                calories = int(dish_list[1])
                 if is_valid_price(dish_list[2]):
-                    price = round(float(dish_list[2]), 2)
+                    price = parse_price_cents(dish_list[2]) / 100
                     if is_valid_is_vegetarian(dish_list[3]):
                         is_vegetarian = dish_list[3]
                         if is_valid_spicy_level(dish_list[4], spicy_scale_map):
@@ -383,7 +415,7 @@ def get_new_menu_dish(dish_list, spicy_scale_map):
                     else:
                         return "is_vegetarian", dish_list[3]
                 else:
-                    return "price", float(dish_list[2])
+                    return "price", dish_list[2]
             else:
                 return "calories", dish_list[1]
         else:
@@ -474,6 +506,7 @@ def add_helper(restaurant_menu_list, spicy_scale_map):
         result_dict = get_new_menu_dish(dish_values, spicy_scale_map)
         if type(result_dict) == dict:
             restaurant_menu_list.append(result_dict)
+            notify_menu_change("add", restaurant_menu_list, index=len(restaurant_menu_list) - 1, dish=result_dict)
             print(f"Successfully added a new dish!")
             print_dish(result_dict, spicy_scale_map)
         elif type(result_dict) == int:
@@ -487,6 +520,79 @@ def add_helper(restaurant_menu_list, spicy_scale_map):
         continue_action = continue_action.lower()
 
 
+def add_dishes_bulk(dish_lines, restaurant_menu_list, spicy_scale_map):
+    """
+    Validates many comma-separated dish lines and appends the valid dishes in one operation.
+
+    This is the non-interactive counterpart of `add_helper()`. Each line uses the same format the
+    user types at the add prompt (name, calories, price, is_vegetarian, spicy_level) and is validated
+    with `get_new_menu_dish()`. All valid dishes are collected first and then appended to
+    `restaurant_menu_list` with a single `extend()`. Blank lines are skipped but still counted, so
+    the returned line numbers match the input.
+
+    Args:
+        dish_lines (iterable): An iterable of strings (e.g., a list or an open file), one dish per line.
+        restaurant_menu_list (list): A list of dictionaries representing the current restaurant menu.
+                                     Valid dishes are appended to this list.
+        spicy_scale_map (dict): A dictionary mapping integer spiciness levels to string descriptions,
+                                used to validate the "spicy_level" field.
+
+    Returns:
+        tuple:
+            - int: The number of dishes that were added.
+            - list: The 1-based line numbers of the lines that contain invalid data.
+
+    Helper Functions:
+        - get_new_menu_dish(): Validates each line and constructs the dish dictionary.
+    """
+    new_dishes = []
+    invalid_lines = []
+    append_dish = new_dishes.append
+    append_invalid = invalid_lines.append
+
+    for i, line in enumerate(dish_lines, start=1):
+        line = line.rstrip("\r\n")
+        if not line.strip():
+            continue
+        dish = get_new_menu_dish(line.split(","), spicy_scale_map)
+        if type(dish) == dict:
+            append_dish(dish)
+        else:
+            append_invalid(i)
+
+    extend_menu(restaurant_menu_list, new_dishes)
+    return len(new_dishes), invalid_lines
+
+
+def batch_add_helper(dish_lines, restaurant_menu_list, spicy_scale_map, max_reported=20):
+    """
+    Adds many dishes without prompting and prints a compact summary.
+
+    This function calls `add_dishes_bulk()` on `dish_lines` and prints a single summary line with the
+    number of added dishes and invalid lines. At most `max_reported` invalid line numbers are listed.
+
+    Args:
+        dish_lines (iterable): An iterable of comma-separated dish lines.
+        restaurant_menu_list (list): A list of dictionaries representing the current restaurant menu.
+        spicy_scale_map (dict): A dictionary mapping integer spiciness levels to string descriptions.
+        max_reported (int, optional): The maximum number of invalid line numbers to print. Defaults to 20.
+
+    Returns:
+        tuple: The `(added, invalid_lines)` result of `add_dishes_bulk()`.
+
+    Helper Functions:
+        - add_dishes_bulk(): Validates and appends the dishes.
+    """
+    added, invalid_lines = add_dishes_bulk(dish_lines, restaurant_menu_list, spicy_scale_map)
+    print(f"Added {added} dishes, {len(invalid_lines)} invalid lines.")
+    if invalid_lines:
+        shown = ", ".join(str(i) for i in invalid_lines[:max_reported])
+        if len(invalid_lines) > max_reported:
+            shown += ", ..."
+        print(f"WARNING: invalid lines: {shown}")
+    return added, invalid_lines
+
+
 def is_valid_index(in_list, idx, start_idx=0):
     """
     Validates whether a string index is a valid index for the given list.
@@ -556,7 +662,10 @@ def delete_dish(in_list, idx, start_idx=0):
     elif not is_valid_index(in_list, idx, start_idx):
         return -1
 
-    return in_list.pop(int(idx) - int(start_idx))
+    list_idx = int(idx) - int(start_idx)
+    dish = in_list.pop(list_idx)
+    notify_menu_change("delete", in_list, index=list_idx, dish=dish)
+    return dish
 
 
 def delete_helper(restaurant_menu_list, spicy_scale_map):
@@ -567,7 +676,7 @@ def delete_helper(restaurant_menu_list, spicy_scale_map):
     It prompts the user to either delete a specific dish or delete the entire menu. If the input 
     list is empty, a warning is displayed and no deletion occurs. If a dish index is provided 
     and is valid, the dish is removed from the list. If the entire menu is deleted, the list is 
-    cleared. The user can continue deleting dishes until they choose to stop.
+    cleared in place with `clear_menu()`. The user can continue deleting dishes until they choose to stop.
 
     Args:
         restaurant_menu_list (list): A list of dictionaries where each dictionary represents 
@@ -602,7 +711,7 @@ def delete_helper(restaurant_menu_list, spicy_scale_map):
             print("::: Type Yes to continue the deletion.")
             user_option = input("> ")
             if user_option == "Yes":
-                restaurant_menu_list = []
+                clear_menu(restaurant_menu_list)
                 print(f"Deleted the entire menu.")
             else:
                 print(f"You entered '{...}' instead of Yes.")
@@ -611,7 +720,7 @@ def delete_helper(restaurant_menu_list, spicy_scale_map):
         elif user_option == 'M' or user_option == 'm':
             break
         result = delete_dish(restaurant_menu_list, user_option, 1)
-        if type(result) == dict:
+        if is_dish(result):
             print("Success!")
             print(f"Deleted the dish |{result['name']}|")
         elif result == 0:  # delete_item() returned an error
@@ -654,6 +763,7 @@ def save_menu_to_csv(restaurant_menu_list, filename):
         - The function requires `csv` and `os` modules.
         - The file is opened with the 'w' (write) mode, so any existing content in the file will be overwritten.
         - The data is written as strings, with each dictionary entry's values converted to strings before writing.
+        - Prices are written with exactly two decimals from their integer cents (e.g., 12.9 is written as "12.90").
     """
     import csv
 
@@ -663,7 +773,8 @@ def save_menu_to_csv(restaurant_menu_list, filename):
     with open(filename, 'w', newline='') as csvfile:
         csv_writer = csv.writer(csvfile)
         for dish in restaurant_menu_list:
-            string_list = [dish['name'], dish['calories'], dish['price'], dish['is_vegetarian'], dish['spicy_level']]
+            string_list = [dish['name'], dish['calories'], format_price_cents(price_to_cents(dish['price'])),
+                           dish['is_vegetarian'], dish['spicy_level']]
             csv_writer.writerow(string_list)
 
 
@@ -706,6 +817,9 @@ def save_helper(restaurant_menu_list):
             break
 
 
+LOAD_CHUNK_SIZE = 50000
+
+
 def load_menu_from_csv(filename, restaurant_menu_list, spicy_scale_map):
     """
     Loads the restaurant menu from a CSV file and appends valid dishes to the menu list.
@@ -739,6 +853,8 @@ def load_menu_from_csv(filename, restaurant_menu_list, spicy_scale_map):
         - If the filename does not end with '.csv', the function will return -1.
         - If the file does not exist, the function will return None.
         - The `get_new_menu_dish()` function is used to validate and construct dish objects from the CSV rows.
+        - Valid dishes are appended in chunks of `LOAD_CHUNK_SIZE`, so a memory-bounded menu such as
+          `spill.SpilledMenu` never has to hold a whole large file in a temporary list.
 
     Helper Functions:
         - get_new_menu_dish(): Validates each dish and constructs a dictionary representing the dish if valid.
@@ -753,27 +869,151 @@ def load_menu_from_csv(filename, restaurant_menu_list, spicy_scale_map):
         return None
 
     invalid_rows = []
+    new_dishes = []
 
     with open(filename, 'r') as f:
         menu_reader = csv.reader(f, delimiter=',')
         for i, row in enumerate(menu_reader, start=1):
             dish = get_new_menu_dish(row, spicy_scale_map)
             if isinstance(dish, dict):
-                restaurant_menu_list.append(dish)
+                new_dishes.append(dish)
+                if len(new_dishes) == LOAD_CHUNK_SIZE:
+                    extend_menu(restaurant_menu_list, new_dishes)
+                    new_dishes = []
             else:
                 invalid_rows.append(i)
 
+    extend_menu(restaurant_menu_list, new_dishes)
     return invalid_rows
 
 
+def sync_menu_from_csv(filename, restaurant_menu_list, spicy_scale_map):
+    """
+    Synchronizes the restaurant menu with a CSV file, applying only the differences.
+
+    Unlike `load_menu_from_csv()`, which appends every row, this function diffs the file against
+    the current menu by dish name and applies only the changes: dishes missing from the menu are
+    inserted, dishes whose fields differ are updated, and dishes missing from the file are deleted.
+    Each row is first compared field by field with the dish of the same name, so unchanged rows
+    (e.g. from a file written by `save_menu_to_csv()`) are skipped without being validated.
+
+    Dishes that are kept stay at their position in the menu and inserted dishes are appended in file
+    order. If several dishes share a name, they are matched with the rows of that name in order.
+
+    Args:
+        filename (str): The name of the CSV file to synchronize with. The file must have a '.csv' extension.
+        restaurant_menu_list (list): The current restaurant menu, changed in place.
+        spicy_scale_map (dict): A dictionary mapping integer spiciness levels to string
+                                descriptions, used when validating the spiciness level of each row.
+
+    Returns:
+        int:
+            - Returns -1 if the filename does not end with '.csv'.
+            - Returns None if the file does not exist.
+        dict:
+            - The change counts "inserted", "updated", "deleted" and "unchanged", and
+              "invalid_rows", the 1-based indices of the rows that contain invalid data.
+
+    Notes:
+        - The dish of an invalid row whose name matches a dish on the menu is left unchanged rather
+          than deleted.
+        - Every change is made through `set_dish_field()`, `extend_menu()` or a "delete" event, so
+          caches following the menu stay in sync.
+
+    Helper Functions:
+        - get_new_menu_dish(): Validates the rows that differ from the current menu.
+    """
+    import csv
+    import os
+
+    if not filename.endswith('.csv'):
+        return -1
+
+    if not os.path.exists(filename):
+        return None
+
+    positions = {}
+    duplicates = {}
+    for i, dish in enumerate(restaurant_menu_list):
+        name = dish['name']
+        if name in positions:
+            duplicates.setdefault(name, []).append(i)
+        else:
+            positions[name] = i
+
+    kept = bytearray(len(restaurant_menu_list))
+    updates = []
+    new_dishes = []
+    invalid_rows = []
+    unchanged = 0
+
+    with open(filename, 'r') as f:
+        menu_reader = csv.reader(f, delimiter=',')
+        for row_number, row in enumerate(menu_reader, start=1):
+            name = row[0] if row else None
+            idx = positions.pop(name, None)
+            if idx is None and duplicates.get(name):
+                idx = duplicates[name].pop(0)
+            if idx is not None:
+                dish = restaurant_menu_list[idx]
+                if _row_matches_dish(row, dish):
+                    kept[idx] = 1
+                    unchanged += 1
+                    continue
+
+            new_dish = get_new_menu_dish(row, spicy_scale_map)
+            if not isinstance(new_dish, dict):
+                invalid_rows.append(row_number)
+                if idx is not None:
+                    kept[idx] = 1
+                continue
+
+            if idx is None:
+                new_dishes.append(new_dish)
+                continue
+
+            kept[idx] = 1
+            changed_fields = [(key, value) for key, value in new_dish.items() if dish[key] != value]
+            if changed_fields:
+                updates.append((idx, changed_fields))
+            else:
+                unchanged += 1
+
+    for idx, changed_fields in updates:
+        for key, value in changed_fields:
+            set_dish_field(restaurant_menu_list, idx, key, value)
+
+    deleted = 0
+    for idx in range(len(restaurant_menu_list) - 1, -1, -1):
+        if not kept[idx]:
+            dish = restaurant_menu_list.pop(idx)
+            notify_menu_change("delete", restaurant_menu_list, index=idx, dish=dish)
+            deleted += 1
+
+    extend_menu(restaurant_menu_list, new_dishes)
+    return {"inserted": len(new_dishes), "updated": len(updates), "deleted": deleted, "unchanged": unchanged,
+            "invalid_rows": invalid_rows}
+
+
+def _row_matches_dish(row, dish):
+    """Checks whether a CSV row holds exactly the values of a dish, without validating the row."""
+    if len(row) != 5 or row[3] != dish['is_vegetarian'] or row[1] != str(dish['calories']) \
+            or row[4] != str(dish['spicy_level']):
+        return False
+    try:
+        return float(row[2]) == dish['price']
+    except ValueError:
+        return False
+
+
 def load_helper(restaurant_menu_list, spicy_scale_map):
     """
     Prompts the user to load a restaurant menu from a CSV file.
 
-    This function asks the user to input the name of a CSV file. It attempts to load the menu from the file 
-    using the `load_menu_from_csv()` function, which validates the filename and appends the contents 
-    to the existing `restaurant_menu_list`. If the filename is invalid or the file does not exist, 
-    the user is prompted to try again.
+    This function asks the user to input the name of a CSV file. It synchronizes the menu with the file 
+    using the `sync_menu_from_csv()` function, which validates the filename and applies only the 
+    differences (new, changed and removed dishes) to the existing `restaurant_menu_list`, then prints the 
+    change counts. If the filename is invalid or the file does not exist, the user is prompted to try again.
 
     Args:
         restaurant_menu_list (list): A list of dictionaries where each dictionary represents a dish 
@@ -784,17 +1024,17 @@ def load_helper(restaurant_menu_list, spicy_scale_map):
                                 spiciness level of dishes in the file.
 
     Returns:
-        None: This function does not return any value. It updates the `restaurant_menu_list` with 
-              the loaded dishes from the CSV file if valid.
+        None: This function does not return any value. It updates the `restaurant_menu_list` to match 
+              the valid dishes of the CSV file.
 
     Helper Functions:
-        - load_menu_from_csv(): Loads the menu from a CSV file and appends valid entries to the menu list.
+        - sync_menu_from_csv(): Applies the differences between a CSV file and the menu list.
     """
     continue_action = 'y'
     while continue_action == 'y':
         print("::: Enter the filename ending with '.csv'.")
         filename = input("> ")
-        result = load_menu_from_csv(restaurant_menu_list, filename, spicy_scale_map)
+        result = sync_menu_from_csv(filename, restaurant_menu_list, spicy_scale_map)
         if result == -1:
             print(f"WARNING: |{filename}| is an invalid file name!")
             print("::: Would you like to try again?", end=" ")
@@ -805,6 +1045,10 @@ def load_helper(restaurant_menu_list, spicy_scale_map):
             continue_action = input("Enter 'y' to try again.\n> ")
         else:
             print(f"Successfully restored restaurant menu from | {filename} |")
+            print(f"{result['inserted']} added, {result['updated']} updated, {result['deleted']} deleted, "
+                  f"{result['unchanged']} unchanged.")
+            if result['invalid_rows']:
+                print(f"WARNING: invalid rows skipped: {result['invalid_rows']}")
             break
 
 
@@ -859,15 +1103,16 @@ def update_helper(restaurant_menu_list, spicy_scale_map):
         print_restaurant_menu(restaurant_menu_list, spicy_scale_map, name_only=True, show_idx=True, start_idx=1)
         print("::: Enter the number corresponding to the dish.")
         user_option = input("> ")
-        if is_valid_index(restaurant_menu_list, user_option):
+        if is_valid_index(restaurant_menu_list, user_option, 1):
             dish_idx = int(user_option) - 1
             subopt = get_selection("update", restaurant_menu_list[dish_idx], to_upper=False, go_back=True)
             if subopt == 'M' or subopt == 'm':
                 break
             print(f"::: Enter a new value for the field |{subopt}|")
             field_info = input("> ")
-            result = update_menu_dish(restaurant_menu_list, dish_idx, spicy_scale_map, subopt, field_info)
-            if type(result) == dict:
+            result = update_menu_dish(restaurant_menu_list, user_option, spicy_scale_map, subopt, field_info,
+                                      start_idx=1)
+            if is_dish(result):
                 print(f"Successfully updated the field |{subopt}|:")
                 print_dish(result, spicy_scale_map)
             else:  # update_menu_dish() returned an error
@@ -909,6 +1154,8 @@ def update_menu_dish(restaurant_menu_list, idx, spicy_scale_map, field_key, fiel
     Returns:
         dict:
             - If the update is successful, returns the updated dish (dictionary) from `restaurant_menu_list`.
+              Values are stored with the same types as `get_new_menu_dish()` uses (int calories and 
+              spicy level, float price).
         int:
             - Returns 0 if `restaurant_menu_list` is empty.
             - Returns -1 if `idx` is invalid (i.e., cannot index the list).
@@ -933,42 +1180,130 @@ def update_menu_dish(restaurant_menu_list, idx, spicy_scale_map, field_key, fiel
 
     if field_key == 'name':
         if is_valid_name(field_info):
-            restaurant_menu_list[int_idx][field_key] = field_info
+            set_dish_field(restaurant_menu_list, int_idx, field_key, field_info)
             return restaurant_menu_list[int_idx]
         else:
             return field_key
     elif field_key == 'calories':
         if is_valid_calories(field_info):
-            restaurant_menu_list[int_idx][field_key] = field_info
+            set_dish_field(restaurant_menu_list, int_idx, field_key, int(field_info))
             return restaurant_menu_list[int_idx]
         else:
             return field_key
     elif field_key == 'price':
         if is_valid_price(field_info):
-            restaurant_menu_list[int_idx][field_key] = field_info
+            set_dish_field(restaurant_menu_list, int_idx, field_key, parse_price_cents(field_info) / 100)
             return restaurant_menu_list[int_idx]
         else:
             return field_key
     elif field_key == 'is_vegetarian':
         if is_valid_is_vegetarian(field_info):
-            restaurant_menu_list[int_idx][field_key] = field_info
+            set_dish_field(restaurant_menu_list, int_idx, field_key, field_info)
             return restaurant_menu_list[int_idx]
         else:
             return field_key
     elif field_key == 'spicy_level':
         if is_valid_spicy_level(field_info, spicy_scale_map):
-            restaurant_menu_list[int_idx][field_key] = int(field_info)
+            set_dish_field(restaurant_menu_list, int_idx, field_key, int(field_info))
             return restaurant_menu_list[int_idx]
         else:
             return field_key
 
 
+DISH_FIELDS = ("name", "calories", "price", "is_vegetarian", "spicy_level")
+
+
+def bulk_update_menu(restaurant_menu_list, spicy_scale_map, changes, where=None):
+    """
+    Updates fields of every dish that matches a predicate, validating all new values before changing anything.
+
+    This is the bulk version of `update_menu_dish()` (an "UPDATE ... SET ... WHERE" for the menu).
+    It runs in two passes over the matching dishes. The first pass computes every new value, converts
+    it to a string and validates it with the same `is_valid_*()` function as `update_menu_dish()`;
+    a string is only validated once per field however many dishes share it (which helps fixed
+    values and transforms with few distinct results, such as a flag or a spicy level). If any
+    value is invalid, nothing is changed. The second pass stores the values that differ from the
+    current ones and reports all of them as a single "bulk_update" event, so listeners update
+    their state once per call instead of once per field.
+
+    Args:
+        restaurant_menu_list (list): A list of dictionaries where each dictionary represents a dish 
+                                     in the restaurant menu.
+        spicy_scale_map (dict): A dictionary mapping integer spiciness levels to their string 
+                                descriptions, used to validate spiciness levels.
+        changes (dict): Maps each field to update to its new value: either the value as typed
+                        (e.g., "9.5" or "no"), or a function that takes the dish and returns the new
+                        value (e.g., `lambda dish: dish["price"] * 1.05`). Prices with more than two
+                        decimals are rounded to the nearest cent.
+        where (callable, optional): A function that takes a dish and returns True if the dish must be
+                                    updated. Defaults to None, which updates every dish.
+
+    Returns:
+        int:
+            - The number of dishes that changed (0 if no dish matches or no value differs).
+            - Returns -2 if a key of `changes` is not a dish field.
+        str:
+            - If a new value is invalid, returns the name of its field; no dish is changed.
+
+    Helper Functions:
+        - is_valid_name(), is_valid_calories(), is_valid_price(), is_valid_is_vegetarian(), 
+          is_valid_spicy_level(): Validate the new values.
+        - notify_menu_change(): Reports the changed values as one "bulk_update" event.
+
+    Example:
+        bulk_update_menu(menu, spicy_scale_map, {"price": lambda dish: dish["price"] * 1.05},
+                         where=lambda dish: dish["is_vegetarian"].lower() == "yes")
+    """
+    for field_key in changes:
+        if field_key not in DISH_FIELDS:
+            return -2
+
+    converters = {
+        "name": lambda text: text if is_valid_name(text) else None,
+        "calories": lambda text: int(text) if is_valid_calories(text) else None,
+        "price": lambda text: parse_price_cents(text) / 100 if is_valid_price(text) else None,
+        "is_vegetarian": lambda text: text if is_valid_is_vegetarian(text) else None,
+        "spicy_level": lambda text: int(text) if is_valid_spicy_level(text, spicy_scale_map) else None,
+    }
+    validated = {field_key: {} for field_key in changes}
+    planned = []
+    for idx, dish in enumerate(restaurant_menu_list):
+        if where is not None and not where(dish):
+            continue
+        for field_key, new in changes.items():
+            if callable(new):
+                new = new(dish)
+            text = new if type(new) == str else str(new)
+            seen = validated[field_key]
+            value = seen.get(text)
+            if value is None:
+                value = converters[field_key](text)
+                if value is None:
+                    return field_key
+                seen[text] = value
+            if dish[field_key] != value:
+                planned.append((idx, field_key, value))
+
+    changes = []
+    count = 0
+    for idx, field_key, value in planned:
+        if not changes or changes[-1][0] != idx:
+            dish = restaurant_menu_list[idx]
+            count += 1
+        changes.append((idx, dish, field_key, dish[field_key], value))
+        dish[field_key] = value
+    if changes:
+        notify_menu_change("bulk_update", restaurant_menu_list, count=count, changes=changes)
+    return count
+
+
 def get_restaurant_expense_rating(restaurant_menu_list):
     """
     Calculates the average price of all menu items and determines the restaurant's expense rating.
 
-    This function computes the average price of all dishes in the `restaurant_menu_list`. Based on 
-    the computed average price, the restaurant's expense rating is determined and displayed:
+    This function computes the average price of all dishes in the `restaurant_menu_list`. The prices 
+    are totaled in integer cents (see `total_price_cents()`), so the total is exact however many dishes 
+    the menu has. Based on the computed average price, the restaurant's expense rating is determined and displayed:
     - If the average price is less than 10, the expense rating is "$".
     - If the average price is between 10 and 20 (inclusive of 10), the expense rating is "$$".
     - If the average price is 20 or more, the expense rating is "$$$".
@@ -976,7 +1311,7 @@ def get_restaurant_expense_rating(restaurant_menu_list):
     Args:
         restaurant_menu_list (list): A list of dictionaries where each dictionary represents a dish 
                                      in the restaurant menu. Each dish should have a "price" field 
-                                     (float) representing the price of the dish.
+                                     (float, int or numeric string) representing the price of the dish.
 
     Returns:
         float: The average price of the menu items.
@@ -985,22 +1320,321 @@ def get_restaurant_expense_rating(restaurant_menu_list):
         print("No items on the menu to rate.")
         return 0.0  # Handle empty menu list
 
-    total_price = 0
-    items = 0
+    avg_price = total_price_cents(restaurant_menu_list) / (100 * len(restaurant_menu_list))
+    expense_rating = get_expense_rating(avg_price)
 
-    for item in restaurant_menu_list:
-        total_price += item['price']
-        items += 1
+    print(f"Expense rating is : {expense_rating}")
+    print()
+    return avg_price
 
-    avg_price = total_price / items
 
+def get_expense_rating(avg_price):
+    """
+    Maps an average dish price to the restaurant's expense rating.
+
+    Args:
+        avg_price (float): The average price of the menu items.
+
+    Returns:
+        str: "$" if the average price is less than 10, "$$" if it is less than 20, "$$$" otherwise.
+    """
     if avg_price < 10:
-        expense_rating = "$"
+        return "$"
     elif avg_price < 20:
-        expense_rating = "$$"
+        return "$$"
     else:
-        expense_rating = "$$$"
+        return "$$$"
 
-    print(f"Expense rating is : {expense_rating}")
-    print()
-    return avg_price
+
+_menu_listeners = []
+_menu_version = 0
+
+
+def subscribe_menu_events(listener):
+    """
+    Registers a function that is called after every change made to a menu by this module.
+
+    The listener receives one dictionary per change with the following keys:
+        - "kind" (str): "add", "update", "bulk_update", "delete", "bulk_load" or "clear".
+        - "version" (int): The value of `get_menu_version()` after the change.
+        - "menu" (list): The menu list that was changed.
+        - "index" (int or None): The 0-based position of the changed dish (the first new dish for "bulk_load").
+        - "dish" (dict or None): The added, updated or deleted dish.
+        - "field", "old", "new": The updated field with its previous and new value ("update" only).
+        - "dishes" (list or None): The appended dishes ("bulk_load" only).
+        - "changes" (list or None): The `(index, dish, field, old, new)` field changes made together,
+          in the order they were made ("bulk_update" only).
+        - "count" (int or None): The number of removed dishes ("clear") or of changed dishes
+          ("bulk_update"); the removed dishes themselves are not copied, so clearing a large or
+          spilled menu stays cheap.
+
+    Listeners are called synchronously, in the thread that changed the menu.
+
+    Args:
+        listener (callable): A function taking the event dictionary as its only argument.
+
+    Returns:
+        None
+    """
+    if listener not in _menu_listeners:
+        _menu_listeners.append(listener)
+
+
+def unsubscribe_menu_events(listener):
+    """
+    Removes a listener registered with `subscribe_menu_events()`.
+
+    Args:
+        listener (callable): The listener to remove.
+
+    Returns:
+        bool: True if the listener was registered, False otherwise.
+    """
+    if listener in _menu_listeners:
+        _menu_listeners.remove(listener)
+        return True
+    return False
+
+
+def get_menu_version():
+    """
+    Returns the number of menu changes made through this module since the program started.
+
+    The version increases by one on every add, update, bulk update, delete, bulk load and clear, so caches can
+    compare it with the version they were built at to know whether a menu may have changed.
+
+    Returns:
+        int: The current menu version.
+    """
+    return _menu_version
+
+
+def notify_menu_change(kind, restaurant_menu_list, index=None, dish=None, field=None, old=None, new=None,
+                       dishes=None, count=None, changes=None):
+    """
+    Bumps the menu version and passes a change event to the registered listeners.
+
+    Args:
+        kind (str): The kind of change: "add", "update", "bulk_update", "delete", "bulk_load" or "clear".
+        restaurant_menu_list (list): The menu that was changed.
+        index (int, optional): The 0-based position of the changed dish.
+        dish (dict, optional): The added, updated or deleted dish.
+        field (str, optional): The updated field.
+        old (optional): The previous value of the updated field.
+        new (optional): The new value of the updated field.
+        dishes (list, optional): The dishes that were appended together.
+        count (int, optional): The number of dishes that were removed or updated together.
+        changes (list, optional): The `(index, dish, field, old, new)` field changes made together.
+
+    Returns:
+        int: The new menu version.
+    """
+    global _menu_version
+    _menu_version += 1
+    if _menu_listeners:
+        event = {"kind": kind, "version": _menu_version, "menu": restaurant_menu_list, "index": index,
+                 "dish": dish, "field": field, "old": old, "new": new, "dishes": dishes, "count": count,
+                 "changes": changes}
+        for listener in list(_menu_listeners):
+            listener(event)
+    return _menu_version
+
+
+def set_dish_field(restaurant_menu_list, idx, field_key, value):
+    """
+    Sets one field of a dish and reports the change as an "update" event.
+
+    Args:
+        restaurant_menu_list (list): The menu that contains the dish.
+        idx (int): The 0-based index of the dish.
+        field_key (str): The field to set.
+        value: The new, already validated value.
+
+    Returns:
+        dict: The updated dish.
+    """
+    dish = restaurant_menu_list[idx]
+    old = dish[field_key]
+    dish[field_key] = value
+    notify_menu_change("update", restaurant_menu_list, index=idx, dish=dish, field=field_key, old=old, new=value)
+    return dish
+
+
+def extend_menu(restaurant_menu_list, dishes):
+    """
+    Appends validated dishes to the menu in one operation and reports them as a "bulk_load" event.
+
+    Args:
+        restaurant_menu_list (list): The menu to extend.
+        dishes (list): The validated dishes to append.
+
+    Returns:
+        None
+    """
+    if not dishes:
+        return
+    start = len(restaurant_menu_list)
+    restaurant_menu_list.extend(dishes)
+    notify_menu_change("bulk_load", restaurant_menu_list, index=start, dishes=dishes)
+
+
+def clear_menu(restaurant_menu_list):
+    """
+    Removes every dish from the menu in place and reports their number as a "clear" event.
+
+    Args:
+        restaurant_menu_list (list): The menu to clear.
+
+    Returns:
+        int: The number of removed dishes.
+    """
+    count = len(restaurant_menu_list)
+    restaurant_menu_list.clear()
+    notify_menu_change("clear", restaurant_menu_list, count=count)
+    return count
+
+
+MAX_PRICE_CENTS = 10 ** 15
+
+
+def parse_price_cents(price_str):
+    """
+    Converts a decimal price string into an integer number of cents, without going through float.
+
+    Plain decimal strings (e.g., "12", "12.9", "-0.5", ".99") are parsed with integer arithmetic only.
+    Other numeric forms accepted by `float()` (e.g., "1e2", " 7.25", "1_000") are parsed with
+    `decimal.Decimal`. Digits beyond the cents are rounded half away from zero. Prices of
+    `MAX_PRICE_CENTS` cents or more (in absolute value) are rejected, so every price fits the
+    64-bit integers of `prices.PriceColumn`.
+
+    Args:
+        price_str (str): The price as typed or read from a CSV file.
+
+    Returns:
+        int or None: The price in cents, or None if `price_str` is not a finite decimal number or is
+                     out of range (e.g., "1e30").
+    """
+    if type(price_str) != str:
+        return None
+
+    text = price_str
+    sign = 1
+    if text[:1] == "-":
+        sign = -1
+        text = text[1:]
+    elif text[:1] == "+":
+        text = text[1:]
+
+    whole, _, frac = text.partition(".")
+    if (whole or frac) and (not whole or whole.isdecimal()) and (not frac or frac.isdecimal()):
+        # too many digits for a valid price: rejected before int(), which refuses strings of more
+        # than 4300 digits
+        whole = whole.lstrip("0")
+        if len(whole) >= len(str(MAX_PRICE_CENTS // 100)):
+            return None
+        cents = int(whole or "0") * 100 + int((frac + "00")[:2])
+        if len(frac) > 2 and int(frac[2]) >= 5:
+            cents += 1
+        return sign * cents if cents < MAX_PRICE_CENTS else None
+
+    from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+    try:
+        value = Decimal(price_str.strip())
+    except InvalidOperation:
+        return None
+    # checked before quantize(), which raises InvalidOperation when the result needs more digits than
+    # the context precision
+    if not value.is_finite() or value.copy_abs() >= MAX_PRICE_CENTS // 100:
+        return None
+    cents = int(value.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP) * 100)
+    return cents if abs(cents) < MAX_PRICE_CENTS else None
+
+
+def price_to_cents(price):
+    """
+    Converts a stored price (float, int or numeric string) into an integer number of cents.
+
+    Args:
+        price (float, int or str): The price of a dish.
+
+    Returns:
+        int: The price in cents. Floats are rounded to the nearest cent.
+
+    Raises:
+        ValueError: If `price` is a string that is not a valid price.
+    """
+    if type(price) == int:
+        return price * 100
+    if type(price) == str:
+        cents = parse_price_cents(price)
+        if cents is None:
+            raise ValueError(f"invalid price: {price!r}")
+        return cents
+    return round(price * 100)
+
+
+def total_price_cents(restaurant_menu_list):
+    """
+    Computes the exact sum of the prices of a menu, in cents.
+
+    Dishes store prices as floats of whole cents, each within half a unit in the last place of its
+    exact value. For non-negative prices the total is therefore summed as floats in C and converted
+    to cents once: with the plain `sum()` while its worst-case error is below a tenth of a cent, else
+    with `math.fsum()`, which rounds only once. Menus with negative prices, string prices or a
+    total too large for either bound are summed with `price_to_cents()` dish by dish.
+
+    Args:
+        restaurant_menu_list (list): The dishes of the menu.
+
+    Returns:
+        int: The sum of the prices in cents (0 for an empty menu).
+    """
+    from operator import itemgetter
+
+    prices = list(map(itemgetter('price'), restaurant_menu_list))
+    try:
+        if prices and min(prices) >= 0:
+            # relative error of a float sum of n terms, including the rounding of the prices themselves
+            error = (len(prices) + 1) * 2.0 ** -53
+            total = sum(prices)
+            if total * error >= 0.001:
+                from math import fsum
+
+                total = fsum(prices)
+                error = 2.0 ** -52
+            if total * error < 0.001:
+                return round(total * 100)
+    except TypeError:
+        pass
+    return sum(map(price_to_cents, prices))
+
+
+def format_price_cents(cents):
+    """
+    Formats an integer number of cents as a decimal price string with two decimals.
+
+    Args:
+        cents (int): The price in cents.
+
+    Returns:
+        str: The price, e.g. "12.90" for 1290 or "-0.05" for -5.
+    """
+    sign = "-" if cents < 0 else ""
+    whole, frac = divmod(abs(cents), 100)
+    return f"{sign}{whole}.{frac:02d}"
+
+
+def is_dish(value):
+    """
+    Checks whether a value is a dish: a dish dictionary or a dict-like record such as `dish.Dish`.
+
+    Args:
+        value: The value to check (e.g., the result of `delete_dish()` or `update_menu_dish()`).
+
+    Returns:
+        bool: True if `value` is a mapping, False otherwise (e.g., for the integer error codes).
+    """
+    from collections.abc import Mapping
+
+    return isinstance(value, Mapping)
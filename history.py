@@ -0,0 +1,314 @@
+"""
+Versioned menu history with time-travel queries.
+
+`MenuHistory` follows the change events of one menu list (see `subscribe_menu_events()` in
+`functions.py`) and records a new version after every change. Versions are persistent trees
+(implicit treaps ordered by dish position) that share every untouched subtree with the previous
+version, so recording an add, update or delete copies only O(log n) nodes and one dish instead of
+the whole menu.
+
+Example:
+    history = MenuHistory(restaurant_menu_list)
+    ...
+    history.as_of(version=3)              # the dishes of version 3
+    history.as_of(timestamp=1700000000)   # the dishes at a point in time
+    history.diff(3, history.head)         # what changed since version 3
+    history.rollback_menu(3)              # restore version 3 into the live menu
+    history.close()
+"""
+import random
+import time
+from bisect import bisect_right
+from collections import namedtuple
+
+from functions import clear_menu, extend_menu, subscribe_menu_events, unsubscribe_menu_events
+
+_Node = namedtuple("_Node", ["dish", "priority", "size", "left", "right"])
+
+MenuVersion = namedtuple("MenuVersion", ["version", "timestamp", "menu_version", "kind", "root"])
+MenuVersion.__doc__ = """
+One recorded version of the menu.
+
+Fields:
+    version (int): The history version number (0 is the menu when the history started).
+    timestamp (float): When the version was recorded, in seconds since the epoch.
+    menu_version (int or None): The value of `get_menu_version()` for the change, if any.
+    kind (str): The change that produced the version ("start", "add", "update", "bulk_update",
+                "delete", "bulk_load", "clear" or "rollback").
+    root: The persistent tree holding the dishes of this version.
+"""
+
+
+def _size(node):
+    return node.size if node is not None else 0
+
+
+def _make(dish, priority, left, right):
+    return _Node(dish, priority, _size(left) + _size(right) + 1, left, right)
+
+
+def _merge(left, right):
+    """Concatenates two trees; every node on the merge path is copied."""
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        return _make(left.dish, left.priority, left.left, _merge(left.right, right))
+    return _make(right.dish, right.priority, _merge(left, right.left), right.right)
+
+
+def _split(node, count):
+    """Splits a tree into its first `count` dishes and the rest; only the split path is copied."""
+    if node is None:
+        return None, None
+    left_size = _size(node.left)
+    if count <= left_size:
+        first, second = _split(node.left, count)
+        return first, _make(node.dish, node.priority, second, node.right)
+    first, second = _split(node.right, count - left_size - 1)
+    return _make(node.dish, node.priority, node.left, first), second
+
+
+def _build(dishes, start, stop):
+    """Builds a balanced tree from dishes[start:stop] in O(n), keeping the heap order of priorities."""
+    if start >= stop:
+        return None
+    middle = (start + stop) // 2
+    left = _build(dishes, start, middle)
+    right = _build(dishes, middle + 1, stop)
+    priority = max(random.random(), left.priority if left else 0.0, right.priority if right else 0.0)
+    return _make(dict(dishes[middle]), priority, left, right)
+
+
+def _get(node, idx):
+    while node is not None:
+        left_size = _size(node.left)
+        if idx < left_size:
+            node = node.left
+        elif idx == left_size:
+            return node.dish
+        else:
+            idx -= left_size + 1
+            node = node.right
+    raise IndexError(idx)
+
+
+def _set(node, idx, dish):
+    left_size = _size(node.left)
+    if idx < left_size:
+        return node._replace(left=_set(node.left, idx, dish))
+    if idx == left_size:
+        return node._replace(dish=dish)
+    return node._replace(right=_set(node.right, idx - left_size - 1, dish))
+
+
+def _insert(node, idx, dishes):
+    first, second = _split(node, idx)
+    return _merge(_merge(first, _build(dishes, 0, len(dishes))), second)
+
+
+def _delete(node, idx):
+    first, rest = _split(node, idx)
+    _, second = _split(rest, 1)
+    return _merge(first, second)
+
+
+def _iter_dishes(node):
+    stack = []
+    while stack or node is not None:
+        while node is not None:
+            stack.append(node)
+            node = node.left
+        node = stack.pop()
+        yield node.dish
+        node = node.right
+
+
+class MenuHistory:
+    """
+    Records every version of one menu list and answers time-travel queries over them.
+
+    Args:
+        restaurant_menu_list (list): The menu to follow. Its current dishes become version 0.
+        max_versions (int, optional): If given, only the most recent `max_versions` versions are kept.
+    """
+
+    def __init__(self, restaurant_menu_list, max_versions=None):
+        self.menu = restaurant_menu_list
+        self.max_versions = max_versions
+        self.versions = []
+        self.timestamps = []
+        self._paused = False
+        self._record("start", None, _build(restaurant_menu_list, 0, len(restaurant_menu_list)))
+        subscribe_menu_events(self._on_change)
+
+    @property
+    def head(self):
+        """The number of the latest version."""
+        return self.versions[-1].version
+
+    def close(self):
+        """Stops recording changes of the menu."""
+        unsubscribe_menu_events(self._on_change)
+
+    def get_version(self, version=None, timestamp=None):
+        """
+        Finds a recorded version by number or by time.
+
+        Args:
+            version (int, optional): The version number. Defaults to the latest version.
+            timestamp (float, optional): A time in seconds since the epoch; the last version recorded
+                                         at or before it is returned.
+
+        Returns:
+            MenuVersion or None: The version, or None if it was never recorded or was discarded.
+        """
+        if timestamp is not None:
+            pos = bisect_right(self.timestamps, timestamp)
+            return self.versions[pos - 1] if pos else None
+        if version is None:
+            return self.versions[-1]
+        pos = version - self.versions[0].version
+        if 0 <= pos < len(self.versions):
+            return self.versions[pos]
+        return None
+
+    def as_of(self, version=None, timestamp=None):
+        """
+        Returns the dishes of the menu as of a version or a point in time.
+
+        Args:
+            version (int, optional): The version number. Defaults to the latest version.
+            timestamp (float, optional): A time in seconds since the epoch.
+
+        Returns:
+            list or None: The dishes (read-only copies shared between versions), or None if the
+                          version is unknown.
+        """
+        entry = self.get_version(version, timestamp)
+        if entry is None:
+            return None
+        return list(_iter_dishes(entry.root))
+
+    def size(self, version=None):
+        """Returns the number of dishes in a version (None if the version is unknown), in O(1)."""
+        entry = self.get_version(version)
+        return _size(entry.root) if entry is not None else None
+
+    def dish_at(self, version, idx):
+        """Returns the dish at 0-based position `idx` of a version in O(log n), or None if there is none."""
+        entry = self.get_version(version)
+        if entry is None or not 0 <= idx < _size(entry.root):
+            return None
+        return _get(entry.root, idx)
+
+    def diff(self, old_version, new_version=None):
+        """
+        Compares two versions by dish name.
+
+        Dishes that share a name are matched in menu order. Identical versions (including versions
+        restored by a rollback) are detected in O(1); otherwise both versions are walked once.
+
+        Args:
+            old_version (int): The older version number.
+            new_version (int, optional): The newer version number. Defaults to the latest version.
+
+        Returns:
+            dict or None: {"added": [dish, ...], "removed": [dish, ...], "changed": [(old_dish, new_dish), ...]},
+                          or None if either version is unknown.
+        """
+        old_entry = self.get_version(old_version)
+        new_entry = self.get_version(new_version)
+        if old_entry is None or new_entry is None:
+            return None
+        result = {"added": [], "removed": [], "changed": []}
+        if old_entry.root is new_entry.root:
+            return result
+
+        old_by_name = {}
+        for dish in _iter_dishes(old_entry.root):
+            old_by_name.setdefault(dish["name"], []).append(dish)
+        for dish in _iter_dishes(new_entry.root):
+            matches = old_by_name.get(dish["name"])
+            if matches:
+                old_dish = matches.pop(0)
+                if old_dish is not dish and old_dish != dish:
+                    result["changed"].append((old_dish, dish))
+            else:
+                result["added"].append(dish)
+        for dishes in old_by_name.values():
+            result["removed"].extend(dishes)
+        return result
+
+    def rollback(self, version):
+        """
+        Records a new version whose dishes are those of an older version.
+
+        This is O(1): the new version shares the old version's tree. The live menu list is not
+        changed; use `rollback_menu()` for that.
+
+        Args:
+            version (int): The version to return to.
+
+        Returns:
+            int or None: The new version number, or None if `version` is unknown.
+        """
+        entry = self.get_version(version)
+        if entry is None:
+            return None
+        return self._record("rollback", None, entry.root)
+
+    def rollback_menu(self, version):
+        """
+        Rolls the history back to `version` and replaces the dishes of the live menu with it.
+
+        The menu is changed through `clear_menu()` and `extend_menu()`, so other listeners see a
+        "clear" and a "bulk_load" event; the history itself records a single "rollback" version.
+
+        Args:
+            version (int): The version to return to.
+
+        Returns:
+            int or None: The new version number, or None if `version` is unknown.
+        """
+        entry = self.get_version(version)
+        if entry is None:
+            return None
+        self._paused = True
+        try:
+            clear_menu(self.menu)
+            extend_menu(self.menu, [dict(dish) for dish in _iter_dishes(entry.root)])
+        finally:
+            self._paused = False
+        return self._record("rollback", None, entry.root)
+
+    def _record(self, kind, menu_version, root):
+        version = self.versions[-1].version + 1 if self.versions else 0
+        timestamp = time.time()
+        self.versions.append(MenuVersion(version, timestamp, menu_version, kind, root))
+        self.timestamps.append(timestamp)
+        if self.max_versions is not None and len(self.versions) > self.max_versions:
+            del self.versions[:len(self.versions) - self.max_versions]
+            del self.timestamps[:len(self.timestamps) - self.max_versions]
+        return version
+
+    def _on_change(self, change):
+        if self._paused or change["menu"] is not self.menu:
+            return
+        kind = change["kind"]
+        root = self.versions[-1].root
+        if kind == "add":
+            root = _insert(root, change["index"], [change["dish"]])
+        elif kind == "update":
+            root = _set(root, change["index"], dict(change["dish"]))
+        elif kind == "bulk_update":
+            for idx, dish in {idx: dish for idx, dish, _, _, _ in change["changes"]}.items():
+                root = _set(root, idx, dict(dish))
+        elif kind == "delete":
+            root = _delete(root, change["index"])
+        elif kind == "bulk_load":
+            root = _insert(root, change["index"], change["dishes"])
+        elif kind == "clear":
+            root = None
+        self._record(kind, change["version"], root)
@@ -0,0 +1,229 @@
+"""
+Resumable, checkpointed loading of very large menu files.
+
+`load_menu_from_csv()` keeps all of its progress in memory, so a failure or a killed process
+partway through a multi-gigabyte file loses everything. `CheckpointedLoader` reads the file in
+binary, tracks the byte offset at the end of every parsed row, and every `checkpoint_every` rows
+appends a checkpoint record to a log next to the CSV file ("menu.csv.ckpt"): the byte offset,
+the row number, and the dishes and invalid rows parsed since the previous checkpoint.
+
+A new loader for the same file reads the log back, seeks to the last checkpointed offset and
+continues from there. Each record is length-prefixed and the log starts with the source file's
+signature (size and modification time, see `menu_cache.get_source_signature()`), so a record
+torn by a crash is ignored and a log for a file that has since changed is discarded. The final
+dishes and invalid rows are the same as those of an uninterrupted `load_menu_from_csv()`.
+
+Example:
+    invalid_rows = load_menu_checkpointed("huge_menu.csv", restaurant_menu_list, spicy_scale_map)
+"""
+import csv
+import locale
+import marshal
+import os
+import struct
+
+from functions import extend_menu, get_new_menu_dish
+from menu_cache import get_source_signature
+
+CHECKPOINT_FORMAT_VERSION = 1
+CHECKPOINT_SUFFIX = ".ckpt"
+_RECORD_LENGTH = struct.Struct('<I')
+
+
+def get_checkpoint_filename(filename):
+    """
+    Returns the default checkpoint log name for a menu CSV file.
+
+    Args:
+        filename (str): The name of the CSV file.
+
+    Returns:
+        str: `filename` followed by ".ckpt" (e.g., "menu.csv.ckpt").
+    """
+    return filename + CHECKPOINT_SUFFIX
+
+
+class CheckpointedLoader:
+    """
+    Parses a menu CSV file in resumable steps, persisting its progress to a checkpoint log.
+
+    Args:
+        filename (str): The name of the CSV file.
+        spicy_scale_map (dict): A dictionary mapping integer spiciness levels to string descriptions.
+        checkpoint_filename (str, optional): The checkpoint log. Defaults to `get_checkpoint_filename(filename)`.
+        checkpoint_every (int, optional): The number of rows between checkpoints. Defaults to 10000.
+        sync (bool, optional): If True (default), every checkpoint is flushed to disk with `os.fsync()`.
+
+    Attributes:
+        offset (int): The byte offset just after the last parsed row.
+        row_number (int): The number of rows parsed so far (the 1-based index of the last row).
+        dishes (list): The valid dishes parsed so far.
+        invalid_rows (list): The 1-based indices of the invalid rows parsed so far.
+        resumed_rows (int): The number of rows restored from the checkpoint log.
+        finished (bool): True once the end of the file has been reached.
+    """
+
+    def __init__(self, filename, spicy_scale_map, checkpoint_filename=None, checkpoint_every=10000, sync=True):
+        self.filename = filename
+        self.spicy_scale_map = spicy_scale_map
+        self.checkpoint_filename = checkpoint_filename or get_checkpoint_filename(filename)
+        self.checkpoint_every = max(1, checkpoint_every)
+        self.sync = sync
+        self.signature = (CHECKPOINT_FORMAT_VERSION, get_source_signature(filename, spicy_scale_map))
+        self.offset = 0
+        self.row_number = 0
+        self.dishes = []
+        self.invalid_rows = []
+        self.checkpoints = 0
+        self.finished = False
+        self._log_length = 0
+        self._read_checkpoint()
+        self.resumed_rows = self.row_number
+
+    def _read_checkpoint(self):
+        try:
+            with open(self.checkpoint_filename, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return
+
+        records = []
+        pos = 0
+        while pos + _RECORD_LENGTH.size <= len(data):
+            (length,) = _RECORD_LENGTH.unpack_from(data, pos)
+            end = pos + _RECORD_LENGTH.size + length
+            if end > len(data):
+                break
+            try:
+                records.append(marshal.loads(data[pos + _RECORD_LENGTH.size:end]))
+            except (EOFError, ValueError, TypeError):
+                break
+            pos = end
+
+        if not records or records[0] != self.signature:
+            return
+        for offset, row_number, dishes, invalid_rows, finished in records[1:]:
+            self.offset = offset
+            self.row_number = row_number
+            self.dishes.extend(dishes)
+            self.invalid_rows.extend(invalid_rows)
+            self.finished = finished
+        self._log_length = pos
+
+    def _open_log(self):
+        if self._log_length:
+            log = open(self.checkpoint_filename, 'r+b')
+            log.truncate(self._log_length)
+            log.seek(self._log_length)
+        else:
+            log = open(self.checkpoint_filename, 'wb')
+            self._write_record(log, self.signature)
+        return log
+
+    def _write_record(self, log, record):
+        payload = marshal.dumps(record)
+        log.write(_RECORD_LENGTH.pack(len(payload)) + payload)
+        log.flush()
+        if self.sync:
+            os.fsync(log.fileno())
+        self._log_length += _RECORD_LENGTH.size + len(payload)
+
+    def _checkpoint(self, log, dishes, invalid_rows):
+        self._write_record(log, (self.offset, self.row_number, dishes, invalid_rows, self.finished))
+        self.dishes.extend(dishes)
+        self.invalid_rows.extend(invalid_rows)
+        self.checkpoints += 1
+
+    def run(self, max_rows=None):
+        """
+        Parses the file from the last checkpoint, checkpointing every `checkpoint_every` rows.
+
+        Args:
+            max_rows (int, optional): Stop (after a checkpoint) once this many rows have been parsed
+                                      in this call. Defaults to None, which parses to the end of the file.
+
+        Returns:
+            bool: True if the end of the file was reached, False if the call stopped at `max_rows`.
+        """
+        if self.finished:
+            return True
+
+        encoding = locale.getpreferredencoding(False)
+        consumed = [self.offset]
+
+        with open(self.filename, 'rb') as f, self._open_log() as log:
+            f.seek(self.offset)
+
+            def lines():
+                for line in f:
+                    consumed[0] += len(line)
+                    yield line.replace(b'\r\n', b'\n').decode(encoding)
+
+            dishes = []
+            invalid_rows = []
+            parsed = 0
+            for row in csv.reader(lines(), delimiter=','):
+                self.row_number += 1
+                dish = get_new_menu_dish(row, self.spicy_scale_map)
+                if isinstance(dish, dict):
+                    dishes.append(dish)
+                else:
+                    invalid_rows.append(self.row_number)
+                self.offset = consumed[0]
+                parsed += 1
+                if max_rows is not None and parsed >= max_rows:
+                    self._checkpoint(log, dishes, invalid_rows)
+                    return False
+                if parsed % self.checkpoint_every == 0:
+                    self._checkpoint(log, dishes, invalid_rows)
+                    dishes = []
+                    invalid_rows = []
+
+            self.finished = True
+            self._checkpoint(log, dishes, invalid_rows)
+        return True
+
+    def discard(self):
+        """Deletes the checkpoint log (e.g., once the loaded dishes are on the menu)."""
+        if os.path.exists(self.checkpoint_filename):
+            os.remove(self.checkpoint_filename)
+        self._log_length = 0
+
+
+def load_menu_checkpointed(filename, restaurant_menu_list, spicy_scale_map, checkpoint_filename=None,
+                           checkpoint_every=10000):
+    """
+    Loads a menu CSV file like `load_menu_from_csv()`, resuming from a checkpoint log if there is one.
+
+    The file is parsed with a `CheckpointedLoader`. When the whole file has been parsed, the dishes
+    are appended to the menu in one `extend_menu()` call and the checkpoint log is deleted. If the
+    process is interrupted, calling the function again continues from the last checkpoint.
+
+    Args:
+        filename (str): The name of the CSV file. Must end with '.csv'.
+        restaurant_menu_list (list): The menu the dishes are appended to.
+        spicy_scale_map (dict): A dictionary mapping integer spiciness levels to string descriptions.
+        checkpoint_filename (str, optional): The checkpoint log. Defaults to `get_checkpoint_filename(filename)`.
+        checkpoint_every (int, optional): The number of rows between checkpoints. Defaults to 10000.
+
+    Returns:
+        int:
+            - Returns -1 if the filename does not end with '.csv'.
+            - Returns None if the file does not exist.
+        list:
+            - Returns a list of 1-based indices of the rows that contain invalid data.
+
+    Notes:
+        - Lines must end with "\\n" or "\\r\\n"; the file is decoded with the same default encoding
+          that `load_menu_from_csv()` uses.
+    """
+    if not filename.endswith('.csv'):
+        return -1
+    if not os.path.exists(filename):
+        return None
+
+    loader = CheckpointedLoader(filename, spicy_scale_map, checkpoint_filename, checkpoint_every)
+    loader.run()
+    extend_menu(restaurant_menu_list, loader.dishes)
+    loader.discard()
+    return loader.invalid_rows
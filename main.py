@@ -1,16 +1,156 @@
 from functions import *
 
+MAIN_MENU = {
+    "L": "List",
+    "A": "Add",
+    "U": "Update",
+    "D": "Delete",
+    "M": "Show average price",
+    "S": "Save the data to file",
+    "R": "Restore data from file",
+    "Q": "Quit this program"
+}
+
+LIST_MENU = {
+    "A": "complete menu",
+    "V": "vegetarian dishes only",
+    "P": "sorted by price",
+    "C": "sorted by calories",
+    "S": "sorted by spiciness",
+    "N": "sorted by name",
+    "T": "top 10 most expensive",
+}
+
+
+def parse_batch_args(argv):
+    """
+    Parses the command-line flags of the non-interactive batch mode.
+
+    Args:
+        argv (list): The command-line arguments, without the program name.
+
+    Returns:
+        argparse.Namespace: The parsed flags (`batch`, `menu`, `output`, `store`, `memory_budget`, `record`,
+                            `autosave`, `autosave_delay`).
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Restaurant menu management")
+    parser.add_argument("--batch", nargs="?", const="-", default=None, metavar="FILE",
+                        help="add dishes from FILE (or stdin) without prompting, one dish per line")
+    parser.add_argument("--menu", default=None, metavar="CSV",
+                        help="start from the menu stored in CSV instead of the built-in dishes")
+    parser.add_argument("--output", default=None, metavar="CSV",
+                        help="save the resulting menu to CSV")
+    parser.add_argument("--store", default=None, metavar="DB",
+                        help="keep the menu in the SQLite database DB and write every change to it")
+    parser.add_argument("--memory-budget", type=float, default=None, metavar="MB",
+                        help="keep at most MB megabytes of dishes in memory and spill the rest to disk")
+    parser.add_argument("--record", default=None, metavar="FILE",
+                        help="record the options and answers of the interactive session to FILE for replay")
+    parser.add_argument("--autosave", default=None, metavar="CSV",
+                        help="save the menu to CSV in the background after each burst of changes, and at exit")
+    parser.add_argument("--autosave-delay", type=float, default=2.0, metavar="SECONDS",
+                        help="the number of seconds without changes before an autosave (default: 2)")
+    return parser.parse_args(argv)
+
+
+def bootstrap_menu(filename, restaurant_menu_list, spicy_scale_map):
+    """
+    Replaces the dishes of `restaurant_menu_list` with the menu stored in a CSV file.
+
+    The file is restored from its precomputed image when it has not changed since the last start,
+    so only the first start after an edit pays for parsing the CSV.
+
+    Args:
+        filename (str): The name of the CSV file.
+        restaurant_menu_list (list): The menu to fill. Its current dishes are removed.
+        spicy_scale_map (dict): A dictionary mapping integer spiciness levels to string descriptions.
+
+    Returns:
+        bool: True if the menu was loaded, False if the file name is invalid or the file is missing.
+
+    Helper Functions:
+        - load_menu_cached(): Loads the CSV file or its precomputed image.
+    """
+    from menu_cache import load_menu_cached
+
+    clear_menu(restaurant_menu_list)
+    result = load_menu_cached(filename, restaurant_menu_list, spicy_scale_map)
+    if result == -1 or result is None:
+        print(f"WARNING: |{filename}| is an invalid or missing menu file!")
+        return False
+    if result:
+        print(f"WARNING: skipped {len(result)} invalid rows in |{filename}|")
+    return True
+
+
+def run_batch(args, restaurant_menu_list, spicy_scale_map):
+    """
+    Runs the batch mode: bulk-adds the dish lines and optionally saves the menu.
+
+    Args:
+        args (argparse.Namespace): The flags returned by `parse_batch_args()`.
+        restaurant_menu_list (list): The menu the dishes are added to.
+        spicy_scale_map (dict): A dictionary mapping integer spiciness levels to string descriptions.
+
+    Returns:
+        int: The process exit code (0 on success, 1 if the input or output file is invalid).
+    """
+    import sys
+
+    if args.menu is not None and not bootstrap_menu(args.menu, restaurant_menu_list, spicy_scale_map):
+        return 1
+
+    if args.batch == "-":
+        batch_add_helper(sys.stdin, restaurant_menu_list, spicy_scale_map)
+    else:
+        try:
+            with open(args.batch, "r") as f:
+                batch_add_helper(f, restaurant_menu_list, spicy_scale_map)
+        except OSError:
+            print(f"WARNING: |{args.batch}| could not be read!")
+            return 1
+
+    if args.output is not None:
+        if save_menu_to_csv(restaurant_menu_list, args.output) == -1:
+            print(f"WARNING: |{args.output}| is an invalid file name!")
+            return 1
+        print(f"Saved {len(restaurant_menu_list)} dishes to |{args.output}|")
+    return 0
+
+
+def run_menu_option(opt, restaurant_menu_list, spicy_scale_map):
+    """
+    Runs one option of the main menu (any option of `MAIN_MENU` except "Q").
+
+    Args:
+        opt (str): The option, e.g. "L" or "U".
+        restaurant_menu_list (list): The menu the option works on.
+        spicy_scale_map (dict): A dictionary mapping integer spiciness levels to string descriptions.
+
+    Returns:
+        list: The menu to use from now on (the delete option may return a new list).
+    """
+    if opt == 'L':
+        list_helper(LIST_MENU, restaurant_menu_list, spicy_scale_map)
+    elif opt == 'A':
+        add_helper(restaurant_menu_list, spicy_scale_map)
+    elif opt == 'D':
+        restaurant_menu_list = delete_helper(restaurant_menu_list, spicy_scale_map)
+    elif opt == 'S':
+        save_helper(restaurant_menu_list)
+    elif opt == 'R':
+        load_helper(restaurant_menu_list, spicy_scale_map)
+    elif opt == 'U':
+        update_helper(restaurant_menu_list, spicy_scale_map)
+    elif opt == 'M':
+        get_restaurant_expense_rating(restaurant_menu_list)
+    return restaurant_menu_list
+
+
 if __name__ == "__main__":
-    the_menu = {
-        "L": "List",
-        "A": "Add",
-        "U": "Update",
-        "D": "Delete",
-        "M": "Show average price",
-        "S": "Save the data to file",
-        "R": "Restore data from file",
-        "Q": "Quit this program"
-    }
+    import sys
 
     restaurant_menu_list = [
         {
@@ -36,11 +176,6 @@ if __name__ == "__main__":
         }
     ]
 
-    list_menu = {
-        "A": "complete menu",
-        "V": "vegetarian dishes only",
-    }
-
     spicy_scale_map = {
         1: "Not spicy",
         2: "Low key spicy",
@@ -48,38 +183,69 @@ if __name__ == "__main__":
         4: "Diabolical",
     }
 
+    recorder = None
+    if len(sys.argv) > 1:
+        batch_args = parse_batch_args(sys.argv[1:])
+        if batch_args.record is not None:
+            from session import SessionRecorder
+
+            recorder = SessionRecorder(batch_args.record)
+            recorder.install()
+        if batch_args.memory_budget is not None:
+            import atexit
+            from spill import SpilledMenu
+
+            restaurant_menu_list = SpilledMenu(restaurant_menu_list,
+                                               memory_budget=int(batch_args.memory_budget * 1024 * 1024))
+            atexit.register(restaurant_menu_list.close)
+        if batch_args.store is not None:
+            import atexit
+            from storage import SQLiteMenuStore
+
+            menu_store = SQLiteMenuStore(batch_args.store)
+            menu_store.attach(restaurant_menu_list)
+            atexit.register(menu_store.close)
+        if batch_args.batch is not None:
+            sys.exit(run_batch(batch_args, restaurant_menu_list, spicy_scale_map))
+        if batch_args.menu is not None and not bootstrap_menu(batch_args.menu, restaurant_menu_list,
+                                                              spicy_scale_map):
+            sys.exit(1)
+        if batch_args.autosave is not None:
+            import atexit
+            from autosave import AutosaveScheduler
+
+            if not batch_args.autosave.endswith('.csv'):
+                print(f"WARNING: |{batch_args.autosave}| is an invalid file name!")
+                sys.exit(1)
+            autosaver = AutosaveScheduler(restaurant_menu_list, batch_args.autosave,
+                                          quiet_period=batch_args.autosave_delay)
+            atexit.register(autosaver.close)
+
     opt = None
 
     while True:
-        print_main_menu(the_menu)
+        print_main_menu(MAIN_MENU)
         print("::: Enter an option")
         opt = input("> ").upper()
 
-        if opt not in the_menu:
+        if opt not in MAIN_MENU:
             print(f"WARNING: {opt} is an invalid option.\n")
             continue
 
-        print(f"You selected option {opt} to > {the_menu[opt]}.")
+        print(f"You selected option {opt} to > {MAIN_MENU[opt]}.")
 
         if opt == "Q":
             print("Goodbye!\n")
             break
-        elif opt == 'L':
-            list_helper(list_menu, restaurant_menu_list, spicy_scale_map)
-        elif opt == 'A':
-            add_helper(restaurant_menu_list, spicy_scale_map)
-        elif opt == 'D':
-            restaurant_menu_list = delete_helper(restaurant_menu_list, spicy_scale_map)
-        elif opt == 'S':
-            save_helper(restaurant_menu_list)
-        elif opt == 'D':
-            load_helper(restaurant_menu_list, spicy_scale_map)
-        elif opt == 'U':
-            update_helper(restaurant_menu_list, spicy_scale_map)
-        elif opt == 'M':
-            get_restaurant_expense_rating(restaurant_menu_list)
+        if recorder is not None:
+            recorder.begin_operation(opt, len(restaurant_menu_list))
+        restaurant_menu_list = run_menu_option(opt, restaurant_menu_list, spicy_scale_map)
+        if recorder is not None:
+            recorder.end_operation()
 
         input("::: Press Enter to continue")
 
+    if recorder is not None:
+        recorder.uninstall()
     print("Have a delicious day!")
 
@@ -0,0 +1,175 @@
+"""
+Precomputed menu images for fast startup.
+
+Parsing and validating a large CSV on every start is the slowest part of bootstrapping a
+short-lived process. `load_menu_cached()` stores the validated dishes in a `marshal` image next
+to the CSV file and restores them directly as long as the CSV is unchanged. Only builtin modules
+are imported at module level; `hashlib` is imported when the hash check is requested.
+"""
+import marshal
+import os
+
+CACHE_FORMAT_VERSION = 1
+CACHE_SUFFIX = ".cache"
+
+
+def get_cache_filename(filename):
+    """
+    Returns the default image file name for a menu CSV file.
+
+    Args:
+        filename (str): The name of the CSV file.
+
+    Returns:
+        str: `filename` followed by ".cache" (e.g., "menu.csv.cache").
+    """
+    return filename + CACHE_SUFFIX
+
+
+def get_file_digest(filename):
+    """
+    Computes the SHA-256 digest of a file, reading it in large blocks.
+
+    Args:
+        filename (str): The name of the file to hash.
+
+    Returns:
+        str: The hexadecimal digest.
+    """
+    import hashlib
+
+    digest = hashlib.sha256()
+    with open(filename, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def get_source_signature(filename, spicy_scale_map, check="mtime"):
+    """
+    Builds the signature that identifies a CSV file's content for the cache.
+
+    The signature always contains the file size and the valid spiciness levels (because they
+    decide which rows are valid). With `check="mtime"` it also contains the modification time,
+    with `check="hash"` the SHA-256 digest of the file.
+
+    Args:
+        filename (str): The name of the CSV file.
+        spicy_scale_map (dict): A dictionary mapping integer spiciness levels to string descriptions.
+        check (str, optional): Either "mtime" (default) or "hash".
+
+    Returns:
+        tuple or None: The signature, or None if `check` is not a supported mode.
+    """
+    stat = os.stat(filename)
+    levels = tuple(sorted(spicy_scale_map))
+    if check == "mtime":
+        return CACHE_FORMAT_VERSION, check, stat.st_size, stat.st_mtime_ns, levels
+    elif check == "hash":
+        return CACHE_FORMAT_VERSION, check, stat.st_size, get_file_digest(filename), levels
+    return None
+
+
+def read_menu_image(cache_filename, signature):
+    """
+    Reads a menu image if it exists and matches the given signature.
+
+    Args:
+        cache_filename (str): The name of the image file.
+        signature (tuple): The signature returned by `get_source_signature()`.
+
+    Returns:
+        tuple or None: `(dishes, invalid_rows)` if the image is valid, otherwise None.
+    """
+    try:
+        with open(cache_filename, 'rb') as f:
+            image = marshal.loads(f.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+
+    if type(image) != tuple or len(image) != 3 or image[0] != signature:
+        return None
+    return image[1], image[2]
+
+
+def write_menu_image(cache_filename, signature, dishes, invalid_rows):
+    """
+    Writes a menu image atomically (to a temporary file that then replaces the image).
+
+    Args:
+        cache_filename (str): The name of the image file.
+        signature (tuple): The signature returned by `get_source_signature()`.
+        dishes (list): The validated dishes loaded from the CSV file.
+        invalid_rows (list): The 1-based indices of the invalid rows.
+
+    Returns:
+        bool: True if the image was written, False if it could not be written.
+    """
+    tmp_filename = f"{cache_filename}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_filename, 'wb') as f:
+            f.write(marshal.dumps((signature, dishes, invalid_rows)))
+        os.replace(tmp_filename, cache_filename)
+    except OSError:
+        if os.path.exists(tmp_filename):
+            os.remove(tmp_filename)
+        return False
+    return True
+
+
+def load_menu_cached(filename, restaurant_menu_list, spicy_scale_map, cache_filename=None, check="mtime"):
+    """
+    Loads a menu CSV file like `load_menu_from_csv()`, reusing a precomputed image when possible.
+
+    If the image next to the CSV file matches the file's current signature, the dishes are restored
+    from it without parsing the CSV. Otherwise the file is loaded with `load_menu_from_csv()` and a
+    new image is written. The return values are the same as `load_menu_from_csv()`.
+
+    An image holds every dish in memory at once, so a menu that is not a plain list (e.g. a
+    `spill.SpilledMenu` with a memory budget) is always loaded with `load_menu_from_csv()`, without
+    reading or writing an image.
+
+    Args:
+        filename (str): The name of the CSV file. Must end with '.csv'.
+        restaurant_menu_list (list): The menu the dishes are appended to.
+        spicy_scale_map (dict): A dictionary mapping integer spiciness levels to string descriptions.
+        cache_filename (str, optional): The image file name. Defaults to `get_cache_filename(filename)`.
+        check (str, optional): How to detect that the CSV changed: "mtime" (default, size and
+                               modification time) or "hash" (size and SHA-256 of the content).
+
+    Returns:
+        int:
+            - Returns -1 if the filename does not end with '.csv'.
+            - Returns -2 if `check` is not "mtime" or "hash".
+            - Returns None if the file does not exist.
+        list:
+            - Returns a list of 1-based indices of the rows that contain invalid data.
+
+    Helper Functions:
+        - load_menu_from_csv(): Parses and validates the CSV file when there is no valid image.
+    """
+    from functions import extend_menu, load_menu_from_csv
+
+    if not filename.endswith('.csv'):
+        return -1
+    if not os.path.exists(filename):
+        return None
+
+    signature = get_source_signature(filename, spicy_scale_map, check)
+    if signature is None:
+        return -2
+    if type(restaurant_menu_list) != list:
+        return load_menu_from_csv(filename, restaurant_menu_list, spicy_scale_map)
+    if cache_filename is None:
+        cache_filename = get_cache_filename(filename)
+
+    image = read_menu_image(cache_filename, signature)
+    if image is not None:
+        dishes, invalid_rows = image
+        extend_menu(restaurant_menu_list, dishes)
+        return invalid_rows
+
+    start = len(restaurant_menu_list)
+    invalid_rows = load_menu_from_csv(filename, restaurant_menu_list, spicy_scale_map)
+    write_menu_image(cache_filename, signature, restaurant_menu_list[start:], invalid_rows)
+    return invalid_rows
@@ -0,0 +1,392 @@
+"""
+Menu partitioned across worker processes, with scatter-gather queries.
+
+A scan of `restaurant_menu_list` (vegetarian listing, expense rating, search by name) runs on one
+core. `PartitionedMenu` spreads the dishes over a pool of worker processes instead: every dish
+gets a dish id (increasing in menu order), and the hash of the id picks the worker that owns it.
+
+- Queries are scatter-gather: the request is sent to every worker first, the workers scan their
+  partitions in parallel, and the partial results are merged. The expense rating adds up the
+  workers' `(total_cents, count)` pairs; listings are ordered merges (`heapq.merge`) of the
+  workers' sorted partial lists, by dish id for the menu order or by one of the keys of
+  `sorting.SORT_KEYS`.
+- Mutations are routed to the worker that owns the dish: an update or a delete by dish id goes
+  to one worker only, and a bulk load sends each worker its own share of the dishes.
+- `load_csv()` sends the raw rows to the workers, which validate them in parallel with
+  `get_new_menu_dish()`.
+
+Each worker keeps its dishes in a plain list and applies updates with `update_menu_dish()`, so
+the validation rules and error codes are those of functions.py. Changes made inside the workers
+do not emit the change events of functions.py in the main process. An exception raised while a
+worker handles a request is sent back and raised again in the main process; the worker keeps
+serving.
+
+Example:
+    menu = PartitionedMenu(spicy_scale_map, workers=4)
+    menu.load_csv("huge_menu.csv")
+    menu.expense_rating()                                # ("$$", 14.2)
+    menu.list_dishes(vegetarian_only=True, order_by="price", limit=20)
+    menu.update(dish_id, "price", "9.50")
+    menu.close()
+"""
+import csv
+import heapq
+import multiprocessing
+import os
+import threading
+from bisect import bisect_left
+from operator import itemgetter
+
+from functions import get_expense_rating, get_new_menu_dish, total_price_cents, update_menu_dish
+
+
+def partition_of(dish_id, partitions):
+    """
+    Returns the partition that owns a dish id (a multiplicative hash of the id, so consecutive ids
+    are spread over all partitions).
+
+    Args:
+        dish_id (int): The dish id.
+        partitions (int): The number of partitions.
+
+    Returns:
+        int: The partition number, from 0 to `partitions - 1`.
+    """
+    return (((dish_id * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF) >> 32) % partitions
+
+
+def _sort_key(order_by):
+    if order_by is None:
+        return None
+    from sorting import SORT_KEYS
+
+    return SORT_KEYS.get(order_by)
+
+
+class _Descending:
+    """Wraps a sort value so that larger values sort first (for a merge on `(value, dish_id)`)."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+    def __lt__(self, other):
+        return other.value < self.value
+
+
+def _serve(conn, spicy_scale_map):
+    """
+    The loop of a worker process: answers the requests of `PartitionedMenu` on its partition.
+
+    Every answer is an `(ok, result)` pair; if handling a request raises, the pair is `(False, exception)`.
+    """
+    state = {"ids": [], "dishes": []}
+    while True:
+        request = conn.recv()
+        if request[0] == "close":
+            conn.close()
+            return
+        try:
+            answer = (True, _handle(request, state, spicy_scale_map))
+        except Exception as error:
+            answer = (False, error)
+        try:
+            conn.send(answer)
+        except Exception as error:
+            # the exception itself could not be pickled
+            conn.send((False, RuntimeError(repr(error))))
+
+
+def _handle(request, state, spicy_scale_map):
+    """Handles one request of `_serve()` on the partition `state` and returns its result."""
+    ids = state["ids"]
+    dishes = state["dishes"]
+    op = request[0]
+    if op == "extend":
+        new_ids, new_dishes = zip(*request[1]) if request[1] else ((), ())
+        ids.extend(new_ids)
+        dishes.extend(new_dishes)
+        result = len(dishes)
+    elif op == "load_rows":
+        result = []
+        for dish_id, row in request[1]:
+            dish = get_new_menu_dish(row, spicy_scale_map)
+            if isinstance(dish, dict):
+                ids.append(dish_id)
+                dishes.append(dish)
+            else:
+                result.append(dish_id)
+    elif op == "count":
+        result = len(dishes)
+    elif op == "rating":
+        result = (total_price_cents(dishes), len(dishes))
+    elif op == "list":
+        _, vegetarian_only, order_by, descending, limit = request
+        key = _sort_key(order_by) or (lambda dish: None)
+        entries = [(key(dish), dish_id, dish) for dish_id, dish in zip(ids, dishes)
+                   if not vegetarian_only or dish["is_vegetarian"].lower() == "yes"]
+        if order_by is None:
+            if descending:
+                entries.reverse()
+            entries = entries[:limit]
+        elif limit is not None:
+            entries = (heapq.nlargest if descending else heapq.nsmallest)(limit, entries, key=itemgetter(0))
+        else:
+            entries.sort(key=itemgetter(0), reverse=descending)
+        result = entries
+    elif op == "find":
+        name = request[1]
+        result = [(dish_id, dish) for dish_id, dish in zip(ids, dishes) if dish["name"] == name]
+    elif op in ("get", "update", "delete"):
+        dish_id = request[1]
+        i = bisect_left(ids, dish_id)
+        if i == len(ids) or ids[i] != dish_id:
+            result = -1
+        elif op == "get":
+            result = dishes[i]
+        elif op == "update":
+            result = update_menu_dish(dishes, str(i), spicy_scale_map, request[2], request[3])
+        else:
+            del ids[i]
+            result = dishes.pop(i)
+    elif op == "dishes":
+        result = list(zip(ids, dishes))
+    elif op == "clear":
+        result = len(dishes)
+        ids.clear()
+        dishes.clear()
+    else:
+        result = None
+    return result
+
+
+class PartitionedMenu:
+    """
+    A menu hash-partitioned by dish id across worker processes.
+
+    Args:
+        spicy_scale_map (dict): A dictionary mapping integer spiciness levels to string descriptions,
+                                used by the workers to validate dishes and updates.
+        workers (int, optional): The number of worker processes. Defaults to the number of CPUs.
+        dishes (iterable, optional): The initial dishes.
+    """
+
+    def __init__(self, spicy_scale_map, workers=None, dishes=()):
+        self.partitions = max(1, workers or os.cpu_count() or 1)
+        self.next_id = 0
+        self.lock = threading.Lock()
+        self.connections = []
+        self.processes = []
+        for _ in range(self.partitions):
+            parent_conn, child_conn = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=_serve, args=(child_conn, spicy_scale_map), daemon=True)
+            process.start()
+            child_conn.close()
+            self.connections.append(parent_conn)
+            self.processes.append(process)
+        self.extend(dishes)
+
+    def close(self):
+        """Stops the worker processes (workers that already died are only reaped)."""
+        for conn in self.connections:
+            try:
+                conn.send(("close",))
+            except OSError:
+                pass
+            conn.close()
+        for process in self.processes:
+            process.join()
+        self.connections = []
+        self.processes = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    # -- messaging ----------------------------------------------------------------------------
+
+    def _scatter(self, requests):
+        """
+        Sends one request per worker (None skips the worker), then gathers the results in worker order.
+        Every answer is gathered before the first exception raised by a worker is raised again here.
+        """
+        with self.lock:
+            for conn, request in zip(self.connections, requests):
+                if request is not None:
+                    conn.send(request)
+            answers = [conn.recv() if request is not None else (True, None)
+                       for conn, request in zip(self.connections, requests)]
+        for ok, result in answers:
+            if not ok:
+                raise result
+        return [result for _, result in answers]
+
+    def _broadcast(self, request):
+        return self._scatter([request] * self.partitions)
+
+    def _route(self, dish_id, request):
+        conn = self.connections[partition_of(dish_id, self.partitions)]
+        with self.lock:
+            conn.send(request)
+            ok, result = conn.recv()
+        if not ok:
+            raise result
+        return result
+
+    def _split(self, items):
+        shares = [[] for _ in range(self.partitions)]
+        for dish_id, item in items:
+            shares[partition_of(dish_id, self.partitions)].append((dish_id, item))
+        return shares
+
+    # -- mutations ----------------------------------------------------------------------------
+
+    def extend(self, dishes):
+        """
+        Appends dishes to the menu, sending each worker its share in one message.
+
+        Args:
+            dishes (iterable): The dishes (already validated, e.g. by `get_new_menu_dish()`).
+
+        Returns:
+            list: The dish ids given to the dishes, in order.
+        """
+        items = []
+        for dish in dishes:
+            items.append((self.next_id, dish))
+            self.next_id += 1
+        if items:
+            self._scatter([("extend", share) if share else None for share in self._split(items)])
+        return [dish_id for dish_id, _ in items]
+
+    def append(self, dish):
+        """Appends one dish; returns its dish id."""
+        return self.extend([dish])[0]
+
+    def load_csv(self, filename):
+        """
+        Appends the valid dishes of a CSV file, validated by the workers in parallel.
+
+        Args:
+            filename (str): The name of the CSV file. The file must have a '.csv' extension.
+
+        Returns:
+            int:
+                - Returns -1 if the filename does not end with '.csv'.
+                - Returns None if the file does not exist.
+            list:
+                - Returns a list of 1-based indices of the rows that contain invalid data,
+                  as `load_menu_from_csv()` does.
+        """
+        if not filename.endswith('.csv'):
+            return -1
+
+        if not os.path.exists(filename):
+            return None
+
+        base = self.next_id
+        with open(filename, 'r') as f:
+            rows = list(csv.reader(f, delimiter=','))
+        self.next_id += len(rows)
+        invalid_ids = []
+        for share in self._scatter([("load_rows", share) if share else None
+                                    for share in self._split(enumerate(rows, start=base))]):
+            if share:
+                invalid_ids.extend(share)
+        return sorted(dish_id - base + 1 for dish_id in invalid_ids)
+
+    def update(self, dish_id, field_key, field_info):
+        """
+        Updates a field of a dish on the worker that owns it, with the rules of `update_menu_dish()`.
+
+        Args:
+            dish_id (int): The dish id.
+            field_key (str): The field to update.
+            field_info (str): The new value, as typed.
+
+        Returns:
+            dict or int or str: The updated dish; -1 if there is no dish with this id, -2 if the field
+                                does not exist, or the field name if the value is invalid.
+        """
+        return self._route(dish_id, ("update", dish_id, field_key, field_info))
+
+    def delete(self, dish_id):
+        """
+        Deletes a dish on the worker that owns it.
+
+        Returns:
+            dict or int: The deleted dish, or -1 if there is no dish with this id.
+        """
+        return self._route(dish_id, ("delete", dish_id))
+
+    def get(self, dish_id):
+        """Returns the dish with this id, or -1 if there is none."""
+        return self._route(dish_id, ("get", dish_id))
+
+    def clear(self):
+        """Deletes every dish; returns the number of dishes deleted."""
+        return sum(self._broadcast(("clear",)))
+
+    # -- scatter-gather queries ---------------------------------------------------------------
+
+    def __len__(self):
+        return sum(self._broadcast(("count",)))
+
+    def expense_rating(self):
+        """
+        Computes the average price and the expense rating from the workers' partial sums.
+
+        Returns:
+            tuple: `(rating, average_price)`, or `(None, 0.0)` if the menu is empty.
+        """
+        partials = self._broadcast(("rating",))
+        total_cents = sum(total for total, _ in partials)
+        count = sum(count for _, count in partials)
+        if not count:
+            return None, 0.0
+        average = total_cents / (100 * count)
+        return get_expense_rating(average), average
+
+    def list_dishes(self, vegetarian_only=False, order_by=None, descending=False, limit=None):
+        """
+        Lists dishes, merging the workers' sorted partial lists.
+
+        Args:
+            vegetarian_only (bool, optional): Only list vegetarian dishes. Defaults to False.
+            order_by (str, optional): None for the menu order, or a key of `sorting.SORT_KEYS`
+                                      ("price", "calories", "spicy_level", "name").
+            descending (bool, optional): If True, the largest values come first (dishes with equal
+                                         values stay in menu order). Defaults to False.
+            limit (int, optional): The maximum number of dishes; each worker then only sends its
+                                   own first `limit` dishes.
+
+        Returns:
+            list or int: `(dish_id, dish)` pairs, or -1 if `order_by` is not supported.
+        """
+        if order_by is not None and _sort_key(order_by) is None:
+            return -1
+        parts = self._broadcast(("list", vegetarian_only, order_by, descending, limit))
+        if order_by is None:
+            merged = heapq.merge(*parts, key=itemgetter(1), reverse=descending)
+        elif descending:
+            # the largest values first, but dishes with equal values in menu order
+            merged = heapq.merge(*parts, key=lambda entry: (_Descending(entry[0]), entry[1]))
+        else:
+            merged = heapq.merge(*parts, key=itemgetter(0, 1))
+        if limit is not None:
+            merged = (entry for entry, _ in zip(merged, range(limit)))
+        return [(dish_id, dish) for _, dish_id, dish in merged]
+
+    def find(self, name):
+        """Returns the `(dish_id, dish)` pairs of the dishes with exactly this name, in menu order."""
+        return list(heapq.merge(*self._broadcast(("find", name)), key=lambda entry: entry[0]))
+
+    def dishes(self):
+        """Returns every dish, in menu order."""
+        return [dish for _, dish in heapq.merge(*self._broadcast(("dishes",)), key=lambda entry: entry[0])]
@@ -0,0 +1,133 @@
+"""
+Fixed-point price column for exact, fast aggregation.
+
+`PriceColumn` keeps the prices of one menu as integer cents in a compact `array('q')` (8 bytes
+per dish instead of a boxed float per dish) and follows the menu's change events, so the column
+stays in sync with adds, updates, deletes, bulk loads and clears without rebuilding it.
+
+The column also keeps a running total that every change adjusts by the difference in cents,
+so the total, the average and the expense rating are O(1). The total is an exact integer and the
+rating is decided by comparing integer totals, so neither depends on float rounding however many
+dishes the menu has.
+
+Example:
+    column = PriceColumn(restaurant_menu_list)
+    column.total_cents()        # exact total
+    column.expense_rating()     # "$", "$$" or "$$$"
+    column.close()
+"""
+from array import array
+
+from functions import format_price_cents, price_to_cents, subscribe_menu_events, unsubscribe_menu_events
+
+
+def price_cents_array(restaurant_menu_list):
+    """
+    Builds an `array('q')` with the price in cents of every dish of a menu.
+
+    Args:
+        restaurant_menu_list (list): The dishes of the menu.
+
+    Returns:
+        array: The prices in cents, in menu order.
+    """
+    return array('q', [price_to_cents(dish['price']) for dish in restaurant_menu_list])
+
+
+def expense_rating_from_cents(total_cents, count):
+    """
+    Determines the expense rating from an exact total, with integer comparisons only.
+
+    The average price is below 10 exactly when `total_cents < 1000 * count`, and below 20 exactly
+    when `total_cents < 2000 * count`.
+
+    Args:
+        total_cents (int): The sum of the prices in cents.
+        count (int): The number of dishes.
+
+    Returns:
+        str or None: "$", "$$" or "$$$", or None if `count` is 0.
+    """
+    if count == 0:
+        return None
+    if total_cents < 1000 * count:
+        return "$"
+    elif total_cents < 2000 * count:
+        return "$$"
+    return "$$$"
+
+
+class PriceColumn:
+    """
+    The prices of one menu as integer cents, kept in sync through the menu's change events.
+
+    Args:
+        restaurant_menu_list (list): The menu to follow.
+        follow (bool, optional): If False, the column is a one-off snapshot that ignores later changes.
+                                 Defaults to True.
+    """
+
+    def __init__(self, restaurant_menu_list, follow=True):
+        self.menu = restaurant_menu_list
+        self.cents = price_cents_array(restaurant_menu_list)
+        self.total = sum(self.cents)
+        self.following = follow
+        if follow:
+            subscribe_menu_events(self._on_change)
+
+    def __len__(self):
+        return len(self.cents)
+
+    def close(self):
+        """Stops following the menu's changes."""
+        if self.following:
+            unsubscribe_menu_events(self._on_change)
+            self.following = False
+
+    def total_cents(self):
+        """Returns the exact sum of the prices, in cents, in O(1)."""
+        return self.total
+
+    def average_price(self):
+        """Returns the average price (0.0 for an empty menu), divided once from the exact total."""
+        if not self.cents:
+            return 0.0
+        return self.total_cents() / (100 * len(self.cents))
+
+    def expense_rating(self):
+        """Returns "$", "$$" or "$$$" for the menu (None if it is empty), using integer comparisons."""
+        return expense_rating_from_cents(self.total_cents(), len(self.cents))
+
+    def format_total(self):
+        """Returns the total price as a string with two decimals, e.g. "1234.50"."""
+        return format_price_cents(self.total_cents())
+
+    def _on_change(self, change):
+        if change["menu"] is not self.menu:
+            return
+        kind = change["kind"]
+        if kind == "add":
+            cents = price_to_cents(change["dish"]["price"])
+            self.cents.insert(change["index"], cents)
+            self.total += cents
+        elif kind == "update":
+            if change["field"] == "price":
+                cents = price_to_cents(change["new"])
+                self.total += cents - self.cents[change["index"]]
+                self.cents[change["index"]] = cents
+        elif kind == "bulk_update":
+            for idx, _, field, _, new in change["changes"]:
+                if field == "price":
+                    cents = price_to_cents(new)
+                    self.total += cents - self.cents[idx]
+                    self.cents[idx] = cents
+        elif kind == "delete":
+            self.total -= self.cents.pop(change["index"])
+        elif kind == "bulk_load":
+            new_cents = array('q', [price_to_cents(dish["price"]) for dish in change["dishes"]])
+            index = change["index"]
+            self.cents[index:index] = new_cents
+            self.total += sum(new_cents)
+        elif kind == "clear":
+            self.cents = array('q')
+            self.total = 0
@@ -0,0 +1,243 @@
+"""
+Local HTTP/JSON server for reading the restaurant menu.
+
+Endpoints (all GET):
+    /menu                      every dish; filters: ?vegetarian=yes|no, ?spicy=N, ?max_spicy=N
+    /dish/<number>             the dish with the given 1-based number
+    /dish?name=<name>          the dishes with the given name (case-insensitive)
+    /rating                    the average price and the expense rating
+
+Serialized responses are cached per menu version (see `get_menu_version()` in `functions.py`):
+as long as the menu is unchanged, a repeated request is answered from the cache without
+re-serializing. Every successful response carries an ETag made of the server instance, the menu
+version and a hash of the body, and a request for the same resource whose If-None-Match matches
+it gets a 304 Not Modified without a body. Error responses have no ETag and are never answered
+with a 304.
+
+Usage:
+    python server.py --menu menu.csv [--host 127.0.0.1] [--port 8080]
+"""
+import hashlib
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from functions import get_expense_rating, get_menu_version, total_price_cents
+
+SPICY_SCALE_MAP = {
+    1: "Not spicy",
+    2: "Low key spicy",
+    3: "Hot",
+    4: "Diabolical",
+}
+
+
+class ResponseCache:
+    """
+    Keeps the serialized body of each request until the menu version changes.
+
+    Args:
+        max_entries (int, optional): The number of distinct requests kept per version. Defaults to 1024.
+    """
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self.version = None
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key, version):
+        with self.lock:
+            if version != self.version:
+                self.version = version
+                self.entries = {}
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return entry
+
+    def put(self, key, version, entry):
+        with self.lock:
+            if version == self.version and len(self.entries) < self.max_entries:
+                self.entries[key] = entry
+
+
+def filter_dishes(restaurant_menu_list, query):
+    """
+    Applies the /menu query filters to the menu.
+
+    Args:
+        restaurant_menu_list (list): The dishes of the menu.
+        query (dict): The parsed query string (`parse_qs()` output).
+
+    Returns:
+        list or None: The matching dishes, or None if a filter value is invalid.
+    """
+    vegetarian = query.get("vegetarian", [None])[0]
+    spicy = query.get("spicy", [None])[0]
+    max_spicy = query.get("max_spicy", [None])[0]
+
+    if vegetarian is not None:
+        vegetarian = vegetarian.lower()
+        if vegetarian not in ("yes", "no"):
+            return None
+    try:
+        spicy = int(spicy) if spicy is not None else None
+        max_spicy = int(max_spicy) if max_spicy is not None else None
+    except ValueError:
+        return None
+
+    dishes = []
+    for dish in restaurant_menu_list:
+        if vegetarian is not None and dish["is_vegetarian"].lower() != vegetarian:
+            continue
+        if spicy is not None and dish["spicy_level"] != spicy:
+            continue
+        if max_spicy is not None and dish["spicy_level"] > max_spicy:
+            continue
+        dishes.append(dish)
+    return dishes
+
+
+def render(restaurant_menu_list, path, query):
+    """
+    Computes the response of a request.
+
+    Args:
+        restaurant_menu_list (list): The dishes of the menu.
+        path (str): The request path.
+        query (dict): The parsed query string.
+
+    Returns:
+        tuple: `(status, payload)`, where `payload` is JSON-serializable.
+    """
+    if path == "/menu":
+        dishes = filter_dishes(restaurant_menu_list, query)
+        if dishes is None:
+            return 400, {"error": "invalid filter"}
+        return 200, {"count": len(dishes), "dishes": dishes}
+    elif path == "/dish":
+        name = query.get("name", [""])[0].lower()
+        dishes = [dish for dish in restaurant_menu_list if dish["name"].lower() == name]
+        if not dishes:
+            return 404, {"error": "dish not found"}
+        return 200, {"count": len(dishes), "dishes": dishes}
+    elif path.startswith("/dish/"):
+        number = path[len("/dish/"):]
+        if not number.isdigit() or not 1 <= int(number) <= len(restaurant_menu_list):
+            return 404, {"error": "dish not found"}
+        return 200, {"dish": restaurant_menu_list[int(number) - 1]}
+    elif path == "/rating":
+        if not restaurant_menu_list:
+            return 200, {"average_price": 0.0, "rating": None}
+        avg_price = total_price_cents(restaurant_menu_list) / (100 * len(restaurant_menu_list))
+        return 200, {"average_price": avg_price, "rating": get_expense_rating(avg_price)}
+    return 404, {"error": "unknown endpoint"}
+
+
+class MenuRequestHandler(BaseHTTPRequestHandler):
+    """
+    Answers the menu endpoints from `self.server.menu`, using `self.server.cache`.
+    """
+
+    protocol_version = "HTTP/1.1"
+    server_version = "MenuServer/1.0"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        version = get_menu_version()
+        parts = urlsplit(self.path)
+        key = (parts.path, parts.query)
+        entry = self.server.cache.get(key, version)
+        if entry is None:
+            status, payload = render(self.server.menu, parts.path, parse_qs(parts.query))
+            body = json.dumps(payload, default=dict).encode()
+            etag = f'"{self.server.instance_id}-{version}-{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+            entry = (status, body, etag)
+            self.server.cache.put(key, version, entry)
+
+        status, body, etag = entry
+        if status == 200 and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if status == 200:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def make_menu_server(restaurant_menu_list, host="127.0.0.1", port=8080, verbose=False):
+    """
+    Creates (but does not start) a threaded HTTP server for a menu.
+
+    The server reads `restaurant_menu_list` directly, so changes made through `functions.py` are
+    visible on the next request that misses the cache.
+
+    Args:
+        restaurant_menu_list (list): The menu to serve.
+        host (str, optional): The address to listen on. Defaults to "127.0.0.1".
+        port (int, optional): The port to listen on; 0 picks a free port. Defaults to 8080.
+        verbose (bool, optional): If True, every request is logged to stderr. Defaults to False.
+
+    Returns:
+        ThreadingHTTPServer: The server; call `serve_forever()` to start it and `shutdown()` to stop it.
+    """
+    server = ThreadingHTTPServer((host, port), MenuRequestHandler)
+    server.daemon_threads = True
+    server.menu = restaurant_menu_list
+    server.cache = ResponseCache()
+    server.instance_id = os.urandom(4).hex()
+    server.verbose = verbose
+    return server
+
+
+def main(argv=None):
+    import argparse
+
+    from menu_cache import load_menu_cached
+
+    parser = argparse.ArgumentParser(description="Serve a restaurant menu over HTTP.")
+    parser.add_argument("--menu", required=True, metavar="CSV", help="the menu file to serve")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    args = parser.parse_args(argv)
+
+    restaurant_menu_list = []
+    result = load_menu_cached(args.menu, restaurant_menu_list, SPICY_SCALE_MAP)
+    if result == -1 or result is None:
+        print(f"WARNING: |{args.menu}| is an invalid or missing menu file!")
+        return 1
+
+    server = make_menu_server(restaurant_menu_list, args.host, args.port, args.verbose)
+    print(f"Serving {len(restaurant_menu_list)} dishes on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(main())
@@ -0,0 +1,276 @@
+"""
+Recording and replaying interactive sessions of the main loop.
+
+The options of the `while True` loop in main.py (list, add, update, delete, save, ...) read their
+answers with `input()` inside the helpers of functions.py, so their cost depends on what the
+operator types and on the size of the menu. `SessionRecorder` captures a real session: it wraps
+`builtins.input` and writes every main-menu option together with the answers given during that
+option as one JSON line:
+
+    {"option": "U", "inputs": ["2", "price", "13.5", "n"], "menu_size": 1200}
+
+`replay_sessions()` re-runs recorded (`load_session()`) or generated (`synthetic_session()`)
+sessions at full speed against a menu of a chosen size, with one or more simulated operators
+working on the same menu from their own threads. Each operator's answers are fed from a
+thread-local queue and the output of the helpers is discarded, so the report measures the menu
+operations themselves: count, errors and latency percentiles per option.
+
+All operators share one menu list. The options that change it (`MUTATING_OPTIONS`) run one at a
+time under a lock, like edits behind a single write lock, and their latency includes the wait for
+it; the read-only options run concurrently. A dish number recorded for update or delete is
+remapped onto the current menu (modulo its size), because the other operators' adds and deletes
+shift the dishes a recording refers to.
+
+An option that asks for more answers than were recorded (e.g. because the replayed menu is
+smaller) gets an `EOFError` from `input()`, like at the end of real input, and counts as an error.
+
+Example:
+    python main.py --record session.jsonl
+    replay_sessions([load_session("session.jsonl")], menu_size=100000, operators=4)
+"""
+import builtins
+import contextlib
+import json
+import random
+import threading
+import time
+
+from functions import add_dishes_bulk
+
+REPLAY_MIX = {"L": 20, "A": 30, "U": 30, "D": 10, "M": 8, "S": 2}
+MUTATING_OPTIONS = {"A", "U", "D", "R"}
+SPICY_SCALE_MAP = {1: "Not spicy", 2: "Low key spicy", 3: "Hot", 4: "Diabolical"}
+
+_feeds = threading.local()
+_original_input = builtins.input
+
+
+class SessionRecorder:
+    """
+    Records the main-menu options and the answers given to `input()` during each of them.
+
+    Args:
+        filename (str): The JSON lines file the operations are appended to.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.operations = 0
+        self.current = None
+        self._input = None
+
+    def install(self):
+        """Starts capturing the answers given to `input()`."""
+        if self._input is None:
+            self._input = builtins.input
+            builtins.input = self._recording_input
+
+    def uninstall(self):
+        """Restores the original `input()`."""
+        if self._input is not None:
+            builtins.input = self._input
+            self._input = None
+
+    def _recording_input(self, prompt=""):
+        answer = self._input(prompt)
+        if self.current is not None:
+            self.current["inputs"].append(answer)
+        return answer
+
+    def begin_operation(self, option, menu_size):
+        """
+        Starts recording a main-menu option.
+
+        Args:
+            option (str): The option selected in the main menu.
+            menu_size (int): The number of dishes on the menu when the option starts.
+        """
+        self.current = {"option": option, "inputs": [], "menu_size": menu_size}
+
+    def end_operation(self):
+        """Appends the current option and its answers to the session file."""
+        if self.current is None:
+            return
+        with open(self.filename, "a") as f:
+            f.write(json.dumps(self.current) + "\n")
+        self.current = None
+        self.operations += 1
+
+
+def load_session(filename):
+    """
+    Reads a session recorded by `SessionRecorder`.
+
+    Args:
+        filename (str): The JSON lines file of the session.
+
+    Returns:
+        list: The operations, each a dict with "option" and "inputs".
+    """
+    with open(filename, "r") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def synthetic_session(operations, menu_size, seed=0, mix=None, save_filename="replay_session.csv"):
+    """
+    Generates a session of typical operator actions.
+
+    Args:
+        operations (int): The number of main-menu options in the session.
+        menu_size (int): The menu size the dish numbers are chosen for.
+        seed (int, optional): The seed of the random choices. Defaults to 0.
+        mix (dict, optional): The relative weight of each option. Defaults to `REPLAY_MIX`.
+        save_filename (str, optional): The file the save option writes to.
+
+    Returns:
+        list: The operations, in the format of `load_session()`.
+    """
+    rng = random.Random(seed)
+    mix = mix or REPLAY_MIX
+    options = list(mix)
+    weights = [mix[option] for option in options]
+    session = []
+    for i in range(operations):
+        option = rng.choices(options, weights)[0]
+        dish_number = str(rng.randint(1, max(1, menu_size // 2)))
+        if option == "L":
+            inputs = [rng.choice("AVPCSNT")]
+        elif option == "A":
+            inputs = [f"replayed {seed} {i},{rng.randint(50, 1500)},{rng.randint(100, 4000) / 100:.2f},"
+                      f"{rng.choice(['yes', 'no'])},{rng.randint(1, 4)}", "n"]
+        elif option == "U":
+            field, value = rng.choice([("price", f"{rng.randint(100, 4000) / 100:.2f}"),
+                                       ("calories", str(rng.randint(50, 1500))),
+                                       ("spicy_level", str(rng.randint(1, 4))),
+                                       ("is_vegetarian", rng.choice(["yes", "no"]))])
+            inputs = [dish_number, field, value, "n"]
+        elif option == "D":
+            inputs = [dish_number, "n"]
+        elif option == "S":
+            inputs = [save_filename]
+        else:
+            inputs = []
+        session.append({"option": option, "inputs": inputs})
+    return session
+
+
+def _replay_input(prompt=""):
+    answers = getattr(_feeds, "answers", None)
+    if answers is None:
+        return _original_input(prompt)
+    if not answers:
+        raise EOFError("the recorded answers of this option are exhausted")
+    return answers.pop()
+
+
+class _Discard:
+    def write(self, text):
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def _percentile(latencies, q):
+    return latencies[min(len(latencies) - 1, int(len(latencies) * q))]
+
+
+def replay_sessions(sessions, menu_size=1000, operators=1, restaurant_menu_list=None, spicy_scale_map=None):
+    """
+    Replays sessions at full speed and measures the latency of every main-menu option.
+
+    The operators change the shared menu one at a time (see the module docstring), so with several
+    operators the "errors" of an option count the same failures as with one: options whose recorded
+    answers do not fit the replayed menu. Contention shows up in the latencies instead.
+
+    Args:
+        sessions (list): The sessions to replay; operator k replays `sessions[k % len(sessions)]`.
+        menu_size (int, optional): The number of synthetic dishes of the menu. Defaults to 1000.
+        operators (int, optional): The number of simulated operators working concurrently on the
+                                   menu, each in its own thread. Defaults to 1.
+        restaurant_menu_list (list, optional): The menu to replay against instead of a synthetic one.
+        spicy_scale_map (dict, optional): A dictionary mapping integer spiciness levels to string
+                                          descriptions. Defaults to the scale of main.py.
+
+    Returns:
+        dict: "operators", "menu_size" (at the start), "operations", "elapsed" (seconds),
+              "throughput" (operations per second) and "by_option", which maps each option to its
+              "count", "errors", "mean_ms", "p50_ms", "p95_ms", "p99_ms" and "max_ms".
+
+    Helper Functions:
+        - run_menu_option(): Runs one option of the main loop of main.py.
+    """
+    from main import run_menu_option
+
+    spicy_scale_map = spicy_scale_map or SPICY_SCALE_MAP
+    if restaurant_menu_list is None:
+        restaurant_menu_list = []
+        add_dishes_bulk([f"dish {i},{100 + i % 900},{5 + i % 2000 / 100:.2f},{'yes' if i % 3 else 'no'},{1 + i % 4}"
+                         for i in range(menu_size)], restaurant_menu_list, spicy_scale_map)
+    start_size = len(restaurant_menu_list)
+    latencies = {}
+    errors = {}
+    lock = threading.Lock()
+    menu_lock = threading.Lock()
+
+    def run(option, inputs):
+        if option in ("U", "D") and inputs and inputs[0].isdigit() and restaurant_menu_list:
+            inputs = [str((int(inputs[0]) - 1) % len(restaurant_menu_list) + 1)] + inputs[1:]
+        _feeds.answers = list(reversed(inputs))
+        run_menu_option(option, restaurant_menu_list, spicy_scale_map)
+
+    def operate(session):
+        for operation in session:
+            option = operation["option"]
+            failed = False
+            start = time.perf_counter()
+            try:
+                if option in MUTATING_OPTIONS:
+                    with menu_lock:
+                        run(option, operation["inputs"])
+                else:
+                    run(option, operation["inputs"])
+            except Exception:
+                failed = True
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.setdefault(option, []).append(elapsed)
+                errors[option] = errors.get(option, 0) + failed
+
+    global _original_input
+
+    threads = [threading.Thread(target=operate, args=(sessions[k % len(sessions)],)) for k in range(operators)]
+    _original_input = builtins.input
+    builtins.input = _replay_input
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(_Discard()):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+    finally:
+        builtins.input = _original_input
+    elapsed = time.perf_counter() - start
+
+    by_option = {}
+    for option, times in sorted(latencies.items()):
+        times.sort()
+        by_option[option] = {
+            "count": len(times),
+            "errors": errors[option],
+            "mean_ms": sum(times) / len(times) * 1000,
+            "p50_ms": _percentile(times, 0.50) * 1000,
+            "p95_ms": _percentile(times, 0.95) * 1000,
+            "p99_ms": _percentile(times, 0.99) * 1000,
+            "max_ms": times[-1] * 1000,
+        }
+    operations = sum(len(times) for times in latencies.values())
+    return {
+        "operators": operators,
+        "menu_size": start_size,
+        "operations": operations,
+        "elapsed": elapsed,
+        "throughput": operations / elapsed if elapsed else 0.0,
+        "by_option": by_option,
+    }
@@ -0,0 +1,260 @@
+"""
+Sorting and top-N ranking for menu listings.
+
+`MenuSorter` keeps one cached sort permutation per sort key for a menu: a sorted list of
+`(key_value, dish_index)` entries. The permutations follow the menu's change events and are
+maintained incrementally: an add or update re-positions one entry with a binary search, a delete
+removes one entry and renumbers the following dishes, and a bulk load merges the new sorted run
+into the existing one. Nothing is re-sorted from scratch after the first listing.
+
+`top_n()` answers "the N most expensive dishes" from the cached permutation when there is one,
+and otherwise with a heap (`heapq.nlargest` / `nsmallest`) in O(n log N) without sorting the
+whole menu.
+
+Example:
+    sorter = get_menu_sorter(restaurant_menu_list)
+    sorter.sorted_dishes("price", descending=True)
+    sorter.top_n("price", 10)
+"""
+import heapq
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from operator import itemgetter
+
+from functions import price_to_cents, subscribe_menu_events, unsubscribe_menu_events
+
+SORT_KEYS = {
+    "price": lambda dish: price_to_cents(dish["price"]),
+    "calories": lambda dish: dish["calories"],
+    "spicy_level": lambda dish: dish["spicy_level"],
+    "name": lambda dish: dish["name"].casefold(),
+}
+
+# the shared sorters of the most recently used menus; a plain list cannot be referenced weakly, so
+# the registry is bounded instead, and an evicted sorter is closed and lets its menu go
+MAX_SHARED_SORTERS = 8
+
+_sorters = OrderedDict()
+
+
+class MenuSorter:
+    """
+    Cached, incrementally maintained sort permutations of one menu.
+
+    Args:
+        restaurant_menu_list (list): The menu to sort.
+    """
+
+    def __init__(self, restaurant_menu_list):
+        self.menu = restaurant_menu_list
+        self.permutations = {}
+        self.rebuilds = 0
+        self.closed = False
+        subscribe_menu_events(self._on_change)
+
+    def close(self):
+        """Stops following the menu and drops the cached permutations (later calls sort without caching)."""
+        unsubscribe_menu_events(self._on_change)
+        self.permutations = {}
+        self.closed = True
+
+    def permutation(self, key):
+        """
+        Returns the cached permutation for a sort key, building it on first use.
+
+        Args:
+            key (str): One of `SORT_KEYS` ("price", "calories", "spicy_level" or "name").
+
+        Returns:
+            list: `(key_value, dish_index)` entries in ascending order (ties keep menu order).
+
+        Raises:
+            KeyError: If `key` is not a supported sort key.
+        """
+        entries = self.permutations.get(key)
+        if entries is None:
+            key_function = SORT_KEYS[key]
+            entries = sorted((key_function(dish), i) for i, dish in enumerate(self.menu))
+            if self.closed:
+                return entries
+            self.permutations[key] = entries
+            self.rebuilds += 1
+        return entries
+
+    def sorted_indices(self, key, descending=False):
+        """
+        Returns the 0-based dish indices of the menu sorted by a key.
+
+        Args:
+            key (str): The sort key.
+            descending (bool, optional): If True, the largest values come first. Defaults to False.
+
+        Returns:
+            list: The dish indices. Dishes with equal values keep their menu order, in both directions.
+        """
+        entries = self.permutation(key)
+        if descending:
+            return [i for _, i in _descending(entries)]
+        return [i for _, i in entries]
+
+    def sorted_dishes(self, key, descending=False):
+        """Returns the dishes of the menu sorted by a key (see `sorted_indices()`)."""
+        menu = self.menu
+        return [menu[i] for i in self.sorted_indices(key, descending)]
+
+    def top_n(self, key, n, largest=True):
+        """
+        Returns the `n` dishes with the largest (or smallest) values of a key, with their indices.
+
+        The cached permutation is used when it exists; otherwise a heap selects the dishes without
+        sorting (or caching) the whole menu.
+
+        Args:
+            key (str): The sort key.
+            n (int): The number of dishes to return.
+            largest (bool, optional): If True (default), the largest values come first; if False,
+                                      the smallest.
+
+        Returns:
+            list: `(dish_index, dish)` tuples, best first (dishes with equal values in menu order).
+        """
+        if n <= 0:
+            return []
+        entries = self.permutations.get(key)
+        if entries is not None:
+            selected = _descending(entries, n) if largest else entries[:n]
+        else:
+            key_function = SORT_KEYS[key]
+            candidates = ((key_function(dish), i) for i, dish in enumerate(self.menu))
+            if largest:
+                selected = heapq.nlargest(n, candidates, key=itemgetter(0))
+            else:
+                selected = heapq.nsmallest(n, candidates)
+        return [(i, self.menu[i]) for _, i in selected]
+
+    def _on_change(self, change):
+        if change["menu"] is not self.menu or not self.permutations:
+            return
+        kind = change["kind"]
+        if kind == "add":
+            self._insert(change["index"], [change["dish"]])
+        elif kind == "bulk_load":
+            self._insert(change["index"], change["dishes"])
+        elif kind == "update":
+            field = change["field"]
+            idx = change["index"]
+            for key, entries in self.permutations.items():
+                if key != field:
+                    continue
+                key_function = SORT_KEYS[key]
+                old_value = key_function({field: change["old"]})
+                pos = bisect_left(entries, (old_value, idx))
+                if pos < len(entries) and entries[pos] == (old_value, idx):
+                    del entries[pos]
+                    insort(entries, (key_function(change["dish"]), idx))
+                else:
+                    del self.permutations[key]
+                    break
+        elif kind == "bulk_update":
+            # a bulk update can move many dishes: rebuild the affected permutations on next use
+            for field in {field for _, _, field, _, _ in change["changes"]}:
+                self.permutations.pop(field, None)
+        elif kind == "delete":
+            idx = change["index"]
+            dish = change["dish"]
+            for key in list(self.permutations):
+                entries = self.permutations[key]
+                value = SORT_KEYS[key](dish)
+                pos = bisect_left(entries, (value, idx))
+                if pos < len(entries) and entries[pos] == (value, idx):
+                    del entries[pos]
+                    self.permutations[key] = [(v, i - 1 if i > idx else i) for v, i in entries]
+                else:
+                    del self.permutations[key]
+        elif kind == "clear":
+            self.permutations = {key: [] for key in self.permutations}
+
+    def _insert(self, index, dishes):
+        count = len(dishes)
+        at_end = index + count == len(self.menu)
+        for key in list(self.permutations):
+            entries = self.permutations[key]
+            if not at_end:
+                entries = [(v, i + count if i >= index else i) for v, i in entries]
+            key_function = SORT_KEYS[key]
+            new_entries = [(key_function(dish), index + offset) for offset, dish in enumerate(dishes)]
+            if count == 1:
+                insort(entries, new_entries[0])
+            else:
+                new_entries.sort()
+                entries = list(heapq.merge(entries, new_entries))
+            self.permutations[key] = entries
+
+
+def _descending(entries, n=None):
+    """
+    Returns the entries of an ascending permutation from the largest value down, keeping the dishes
+    with equal values in menu order (a plain reversal would list them last dish first).
+
+    Args:
+        entries (list): `(key_value, dish_index)` entries in ascending order.
+        n (int, optional): The number of entries to return. Defaults to all of them.
+
+    Returns:
+        list: The entries, largest value first.
+    """
+    if n is None or n > len(entries):
+        n = len(entries)
+    selected = []
+    end = len(entries)
+    while len(selected) < n:
+        # (value,) sorts before every (value, dish_index) entry: start is the first entry of the run
+        start = bisect_left(entries, (entries[end - 1][0],), 0, end)
+        selected.extend(entries[start:end])
+        end = start
+    return selected[:n]
+
+
+def get_menu_sorter(restaurant_menu_list):
+    """
+    Returns the shared `MenuSorter` of a menu list, creating it on first use.
+
+    Only the sorters of the `MAX_SHARED_SORTERS` most recently used menus are kept: the least
+    recently used one is closed when another menu needs a sorter, so the registry does not keep
+    dropped menus alive or subscribed to the change events. Call this function again instead of
+    keeping the sorter: a closed sorter still answers, but sorts the menu on every call.
+
+    Args:
+        restaurant_menu_list (list): The menu.
+
+    Returns:
+        MenuSorter: The sorter whose permutations are cached for this menu.
+    """
+    key = id(restaurant_menu_list)
+    sorter = _sorters.get(key)
+    if sorter is not None and sorter.menu is restaurant_menu_list:
+        _sorters.move_to_end(key)
+        return sorter
+    if sorter is not None:
+        sorter.close()
+    sorter = MenuSorter(restaurant_menu_list)
+    _sorters[key] = sorter
+    _sorters.move_to_end(key)
+    while len(_sorters) > MAX_SHARED_SORTERS:
+        _, evicted = _sorters.popitem(last=False)
+        evicted.close()
+    return sorter
+
+
+def release_menu_sorter(restaurant_menu_list):
+    """
+    Closes and forgets the shared `MenuSorter` of a menu list.
+
+    Returns:
+        bool: True if the menu had a sorter.
+    """
+    sorter = _sorters.pop(id(restaurant_menu_list), None)
+    if sorter is None:
+        return False
+    sorter.close()
+    return True
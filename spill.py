@@ -0,0 +1,367 @@
+"""
+Memory-bounded menu that spills to disk.
+
+`SpilledMenu` is a drop-in replacement for the `restaurant_menu_list` list with a memory budget.
+Dishes are kept in memory until their estimated size reaches the budget; the dishes after that
+are stored in pages of `page_size` dishes in a local SQLite file, and an LRU cache keeps the most
+recently used pages in memory. Indexing, iteration, `len()`, `append()`, `extend()`, `pop()` and
+`clear()` work across both tiers, so the existing helpers (listing, expense rating, update,
+delete, loading a CSV file) run unchanged on a `SpilledMenu`.
+
+Updates made through `set_dish_field()` (which `update_menu_dish()` uses) mark the dish's page as
+dirty through the menu's change events; dirty pages are written back when they leave the cache or
+on `flush()`. Full scans read the pages that are not cached straight from the file without
+evicting the hot pages.
+
+The spill file may be read from another thread than the one that changes the menu (e.g. by a
+background save iterating the menu); every access to it goes through `db_lock`.
+
+Example:
+    restaurant_menu_list = SpilledMenu(memory_budget=64 * 1024 * 1024)
+    load_menu_from_csv("huge_menu.csv", restaurant_menu_list, spicy_scale_map)
+    restaurant_menu_list.stats()
+"""
+import marshal
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+from collections.abc import MutableSequence
+from itertools import chain, islice
+
+from functions import subscribe_menu_events, unsubscribe_menu_events
+
+
+def estimate_dish_size(dish):
+    """
+    Estimates the memory used by a dish: its container plus its field values, in bytes.
+
+    Args:
+        dish (dict): The dish.
+
+    Returns:
+        int: The estimated size.
+    """
+    return sys.getsizeof(dish) + sum(sys.getsizeof(value) for value in dish.values())
+
+
+class SpilledMenu(MutableSequence):
+    """
+    A list of dishes whose in-memory part is capped, with the rest paged to an SQLite file.
+
+    Args:
+        dishes (iterable, optional): The initial dishes.
+        memory_budget (int, optional): The estimated bytes of dishes kept in memory outside the page
+                                       cache. Defaults to 64 MiB.
+        spill_filename (str, optional): The SQLite file for spilled pages. Defaults to a temporary
+                                        file that is deleted by `close()`.
+        page_size (int, optional): The number of dishes per page. Defaults to 256.
+        cache_pages (int, optional): The number of pages kept in the LRU cache. Defaults to 64.
+    """
+
+    def __init__(self, dishes=(), memory_budget=64 * 1024 * 1024, spill_filename=None, page_size=256,
+                 cache_pages=64):
+        self.memory_budget = memory_budget
+        self.page_size = max(1, page_size)
+        self.cache_pages = max(1, cache_pages)
+        self.head = []
+        self.head_bytes = 0
+        self.pages = []
+        self.spilled = 0
+        self._starts = None
+        self._next_page_id = 1
+        self.cache = OrderedDict()
+        self.dirty = set()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.page_writes = 0
+
+        self.owns_file = spill_filename is None
+        if spill_filename is None:
+            fd, spill_filename = tempfile.mkstemp(suffix=".spill.sqlite")
+            os.close(fd)
+        self.spill_filename = spill_filename
+        self.db_lock = threading.Lock()
+        self.db = sqlite3.connect(spill_filename, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=OFF")
+        self.db.execute("PRAGMA synchronous=OFF")
+        self.db.execute("CREATE TABLE IF NOT EXISTS pages (id INTEGER PRIMARY KEY, dishes BLOB NOT NULL)")
+        self.db.execute("DELETE FROM pages")
+        self.extend(dishes)
+        subscribe_menu_events(self._on_change)
+
+    def close(self):
+        """Stops following the menu's changes, closes the spill file and deletes it if it is temporary."""
+        unsubscribe_menu_events(self._on_change)
+        with self.db_lock:
+            self.db.close()
+        if self.owns_file and os.path.exists(self.spill_filename):
+            os.remove(self.spill_filename)
+
+    def __len__(self):
+        return len(self.head) + self.spilled
+
+    def __iter__(self):
+        yield from self.head
+        for page_id, _ in list(self.pages):
+            dishes = self.cache.get(page_id)
+            if dishes is None:
+                dishes = self._read_page(page_id)
+            yield from dishes
+
+    def __repr__(self):
+        return f"SpilledMenu({len(self.head)} in memory, {self.spilled} spilled in {len(self.pages)} pages)"
+
+    # -- page storage -------------------------------------------------------------------------
+
+    def _read_page(self, page_id):
+        with self.db_lock:
+            row = self.db.execute("SELECT dishes FROM pages WHERE id = ?", (page_id,)).fetchone()
+        return marshal.loads(row[0])
+
+    def _write_pages(self, pages):
+        rows = [(page_id, marshal.dumps([dict(dish) for dish in dishes])) for page_id, dishes in pages]
+        with self.db_lock:
+            self.db.executemany("INSERT OR REPLACE INTO pages (id, dishes) VALUES (?, ?)", rows)
+        self.page_writes += len(pages)
+
+    def _page(self, page_id):
+        dishes = self.cache.get(page_id)
+        if dishes is not None:
+            self.cache.move_to_end(page_id)
+            self.cache_hits += 1
+            return dishes
+        self.cache_misses += 1
+        dishes = self._read_page(page_id)
+        self.cache[page_id] = dishes
+        self._evict()
+        return dishes
+
+    def _evict(self):
+        evicted = []
+        while len(self.cache) > self.cache_pages:
+            page_id, dishes = self.cache.popitem(last=False)
+            if page_id in self.dirty:
+                self.dirty.discard(page_id)
+                evicted.append((page_id, dishes))
+        if evicted:
+            self._write_pages(evicted)
+
+    def _new_page_id(self):
+        page_id = self._next_page_id
+        self._next_page_id += 1
+        return page_id
+
+    def flush(self):
+        """Writes the dirty cached pages back to the spill file."""
+        if self.dirty:
+            self._write_pages([(page_id, self.cache[page_id]) for page_id in self.dirty])
+            self.dirty.clear()
+        with self.db_lock:
+            self.db.commit()
+
+    def _locate(self, k):
+        """Returns the page number and the offset in that page of the k-th spilled dish."""
+        if self._starts is None:
+            starts = []
+            total = 0
+            for _, count in self.pages:
+                starts.append(total)
+                total += count
+            self._starts = starts
+        p = bisect_right(self._starts, k) - 1
+        return p, k - self._starts[p]
+
+    # -- sequence protocol --------------------------------------------------------------------
+
+    def _index(self, i):
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("menu index out of range")
+        return i
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        i = self._index(i)
+        if i < len(self.head):
+            return self.head[i]
+        p, offset = self._locate(i - len(self.head))
+        return self._page(self.pages[p][0])[offset]
+
+    def __setitem__(self, i, dish):
+        if isinstance(i, slice):
+            raise TypeError("SpilledMenu does not support slice assignment")
+        i = self._index(i)
+        if i < len(self.head):
+            self.head_bytes += estimate_dish_size(dish) - estimate_dish_size(self.head[i])
+            self.head[i] = dish
+            return
+        p, offset = self._locate(i - len(self.head))
+        page_id = self.pages[p][0]
+        self._page(page_id)[offset] = dish
+        self.dirty.add(page_id)
+
+    def __delitem__(self, i):
+        if isinstance(i, slice):
+            for j in sorted(range(*i.indices(len(self))), reverse=True):
+                del self[j]
+            return
+        i = self._index(i)
+        if i < len(self.head):
+            self.head_bytes -= estimate_dish_size(self.head.pop(i))
+            return
+        p, offset = self._locate(i - len(self.head))
+        page = self.pages[p]
+        del self._page(page[0])[offset]
+        page[1] -= 1
+        self.spilled -= 1
+        self._starts = None
+        if page[1] == 0:
+            with self.db_lock:
+                self.db.execute("DELETE FROM pages WHERE id = ?", (page[0],))
+            self.cache.pop(page[0], None)
+            self.dirty.discard(page[0])
+            del self.pages[p]
+        else:
+            self.dirty.add(page[0])
+
+    def insert(self, i, dish):
+        n = len(self)
+        i = max(0, min(n, i + n if i < 0 else i))
+        if i < len(self.head) or (i == len(self.head) and not self.pages):
+            self.head.insert(i, dish)
+            self.head_bytes += estimate_dish_size(dish)
+            while self.head_bytes > self.memory_budget and self.head:
+                moved = self.head.pop()
+                self.head_bytes -= estimate_dish_size(moved)
+                self._spill_insert(0, moved)
+        else:
+            self._spill_insert(i - len(self.head), dish)
+
+    def _spill_insert(self, k, dish):
+        self.spilled += 1
+        if not self.pages or (k == self.spilled - 1 and self.pages[-1][1] >= self.page_size):
+            page_id = self._new_page_id()
+            self.pages.append([page_id, 1])
+            self._starts = None
+            self.cache[page_id] = [dish]
+            self.dirty.add(page_id)
+            self._evict()
+            return
+        if k == self.spilled - 1:
+            p, offset = len(self.pages) - 1, self.pages[-1][1]
+        else:
+            p, offset = self._locate(k)
+        page = self.pages[p]
+        dishes = self._page(page[0])
+        dishes.insert(offset, dish)
+        page[1] += 1
+        self._starts = None
+        self.dirty.add(page[0])
+        if page[1] > 2 * self.page_size:
+            page_id = self._new_page_id()
+            second_half = dishes[self.page_size:]
+            del dishes[self.page_size:]
+            page[1] = self.page_size
+            self.pages.insert(p + 1, [page_id, len(second_half)])
+            self.cache[page_id] = second_half
+            self.dirty.add(page_id)
+            self._evict()
+
+    def extend(self, dishes):
+        """Appends many dishes, writing full pages of spilled dishes straight to the spill file."""
+        dishes = iter(dishes)
+        for dish in dishes:
+            size = estimate_dish_size(dish)
+            if self.pages or self.head_bytes + size > self.memory_budget:
+                self._spill_extend(chain([dish], dishes))
+                return
+            self.head.append(dish)
+            self.head_bytes += size
+
+    def _spill_extend(self, dishes):
+        self._starts = None
+        if self.pages and self.pages[-1][1] < self.page_size:
+            page = self.pages[-1]
+            last = self._page(page[0])
+            room = list(islice(dishes, self.page_size - page[1]))
+            last.extend(room)
+            page[1] += len(room)
+            self.spilled += len(room)
+            self.dirty.add(page[0])
+        batch = []
+        while True:
+            chunk = list(islice(dishes, self.page_size))
+            if not chunk:
+                break
+            page_id = self._new_page_id()
+            self.pages.append([page_id, len(chunk)])
+            self.spilled += len(chunk)
+            batch.append((page_id, chunk))
+            if len(batch) >= self.cache_pages:
+                self._write_pages(batch)
+                batch = []
+        if batch:
+            self._write_pages(batch)
+
+    def clear(self):
+        self.head = []
+        self.head_bytes = 0
+        self.pages = []
+        self.spilled = 0
+        self._starts = None
+        self.cache.clear()
+        self.dirty.clear()
+        with self.db_lock:
+            self.db.execute("DELETE FROM pages")
+
+    def stats(self):
+        """
+        Returns the size of both tiers and the effectiveness of the page cache.
+
+        Returns:
+            dict: "in_memory" and "spilled" dishes, "memory_bytes" (estimated, outside the cache),
+                  "memory_budget", "pages", "cached_pages", "dirty_pages", "cache_hits",
+                  "cache_misses" and "page_writes".
+        """
+        return {
+            "in_memory": len(self.head),
+            "spilled": self.spilled,
+            "memory_bytes": self.head_bytes,
+            "memory_budget": self.memory_budget,
+            "pages": len(self.pages),
+            "cached_pages": len(self.cache),
+            "dirty_pages": len(self.dirty),
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "page_writes": self.page_writes,
+        }
+
+    def _on_change(self, change):
+        if change["menu"] is not self:
+            return
+        if change["kind"] == "update":
+            self._mark_updated(change["index"], change["dish"])
+        elif change["kind"] == "bulk_update":
+            for idx, dish in {idx: dish for idx, dish, _, _, _ in change["changes"]}.items():
+                self._mark_updated(idx, dish)
+
+    def _mark_updated(self, index, dish):
+        # an update changes a dish in place: make sure the change reaches its page. The changed dict
+        # is only the cached one if its page stayed in the cache since it was read; a bulk update
+        # reads many pages before its event, so an evicted page is re-read and the dish stored again
+        k = index - len(self.head)
+        if k >= 0:
+            p, offset = self._locate(k)
+            page_id = self.pages[p][0]
+            page = self.cache.get(page_id)
+            if page is not None and page[offset] is dish:
+                self.dirty.add(page_id)
+            else:
+                self[index] = dish
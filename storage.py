@@ -0,0 +1,222 @@
+"""
+SQLite storage backend for the menu.
+
+`save_menu_to_csv()` rewrites the whole file and `load_menu_from_csv()` re-parses it, so an edit
+made with `update_menu_dish()` or `delete_dish()` is lost unless the whole menu is saved again.
+`SQLiteMenuStore` keeps the menu in a `sqlite3` database instead and follows the menu's change
+events, so every add, update, delete, bulk load and clear made through the usual functions is
+written to the database as a point change, committed at once:
+
+- the database runs in WAL mode, so a commit appends to the log instead of rewriting pages;
+- every statement is a fixed, parameterized statement, which `sqlite3` prepares once and reuses
+  from its statement cache;
+- bulk loads are written with one `executemany()` inside a single transaction;
+- name, price and vegetarian columns are indexed, so `find_dishes()` answers filtered queries
+  without scanning the table.
+
+Prices are stored as integer cents. Rows keep the menu order through their ascending ids.
+
+Example:
+    store = SQLiteMenuStore("menu.db")
+    store.attach(restaurant_menu_list)      # load the stored menu, or store the current one
+    update_menu_dish(restaurant_menu_list, '1', spicy_scale_map, 'price', '9.5', start_idx=1)
+    store.find_dishes(vegetarian=True, max_price=10)
+"""
+import sqlite3
+
+from functions import clear_menu, extend_menu, price_to_cents, subscribe_menu_events, unsubscribe_menu_events
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS dishes (id INTEGER PRIMARY KEY, name TEXT NOT NULL, calories INTEGER NOT NULL, "
+    "price_cents INTEGER NOT NULL, is_vegetarian TEXT NOT NULL, spicy_level INTEGER NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS dishes_name ON dishes (name)",
+    "CREATE INDEX IF NOT EXISTS dishes_price ON dishes (price_cents)",
+    "CREATE INDEX IF NOT EXISTS dishes_vegetarian ON dishes (is_vegetarian COLLATE NOCASE)",
+)
+_COLUMNS = "id, name, calories, price_cents, is_vegetarian, spicy_level"
+_INSERT = "INSERT INTO dishes (name, calories, price_cents, is_vegetarian, spicy_level) VALUES (?, ?, ?, ?, ?)"
+_DELETE = "DELETE FROM dishes WHERE id = ?"
+_DELETE_ALL = "DELETE FROM dishes"
+_UPDATE = {
+    "name": "UPDATE dishes SET name = ? WHERE id = ?",
+    "calories": "UPDATE dishes SET calories = ? WHERE id = ?",
+    "price": "UPDATE dishes SET price_cents = ? WHERE id = ?",
+    "is_vegetarian": "UPDATE dishes SET is_vegetarian = ? WHERE id = ?",
+    "spicy_level": "UPDATE dishes SET spicy_level = ? WHERE id = ?",
+}
+_ORDER_BY = {
+    None: "id",
+    "name": "name, id",
+    "price": "price_cents, id",
+    "calories": "calories, id",
+    "spicy_level": "spicy_level, id",
+}
+
+
+def _row_values(dish):
+    return (dish["name"], int(dish["calories"]), price_to_cents(dish["price"]), dish["is_vegetarian"],
+            int(dish["spicy_level"]))
+
+
+def _row_to_dish(row):
+    return {"name": row[1], "calories": row[2], "price": row[3] / 100, "is_vegetarian": row[4],
+            "spicy_level": row[5]}
+
+
+class SQLiteMenuStore:
+    """
+    A menu stored in an SQLite database, kept in sync with a menu list through change events.
+
+    Args:
+        filename (str): The database file (created if missing).
+        synchronous (str, optional): The SQLite `synchronous` setting. "NORMAL" (default) keeps every
+                                     commit across a crash of the program; "FULL" also across a
+                                     power loss, at the cost of an fsync per commit.
+    """
+
+    def __init__(self, filename, synchronous="NORMAL"):
+        self.filename = filename
+        self.db = sqlite3.connect(filename, cached_statements=64)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(f"PRAGMA synchronous={'FULL' if synchronous == 'FULL' else 'NORMAL'}")
+        with self.db:
+            for statement in _SCHEMA:
+                self.db.execute(statement)
+        self.menu = None
+        self.rowids = []
+        self.writes = 0
+
+    def close(self):
+        """Detaches the store from its menu and closes the database."""
+        self.detach()
+        self.db.close()
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM dishes").fetchone()[0]
+
+    def load_dishes(self):
+        """
+        Reads the stored menu.
+
+        Returns:
+            list: The stored dishes, in menu order.
+        """
+        return [_row_to_dish(row) for row in self.db.execute(f"SELECT {_COLUMNS} FROM dishes ORDER BY id")]
+
+    def attach(self, restaurant_menu_list):
+        """
+        Binds the store to a menu list and starts writing the menu's changes to the database.
+
+        If the database holds dishes, they replace the dishes of the menu; otherwise the current
+        dishes of the menu are stored.
+
+        Args:
+            restaurant_menu_list (list): The menu to keep in sync.
+
+        Returns:
+            int: The number of dishes loaded from the database (0 if the menu was stored instead).
+        """
+        self.detach()
+        rows = self.db.execute(f"SELECT {_COLUMNS} FROM dishes ORDER BY id").fetchall()
+        self.menu = restaurant_menu_list
+        if rows:
+            clear_menu(restaurant_menu_list)
+            extend_menu(restaurant_menu_list, [_row_to_dish(row) for row in rows])
+            self.rowids = [row[0] for row in rows]
+        else:
+            self.rowids = self._insert_many(restaurant_menu_list)
+        subscribe_menu_events(self._on_change)
+        return len(rows)
+
+    def detach(self):
+        """Stops writing the menu's changes to the database."""
+        if self.menu is not None:
+            unsubscribe_menu_events(self._on_change)
+            self.menu = None
+            self.rowids = []
+
+    def _insert_many(self, dishes):
+        with self.db:
+            last = self.db.execute("SELECT COALESCE(MAX(id), 0) FROM dishes").fetchone()[0]
+            self.db.executemany(_INSERT, [_row_values(dish) for dish in dishes])
+            self.writes += 1
+            return [row[0] for row in self.db.execute("SELECT id FROM dishes WHERE id > ? ORDER BY id", (last,))]
+
+    def _rewrite(self):
+        with self.db:
+            self.db.execute(_DELETE_ALL)
+        self.rowids = self._insert_many(self.menu)
+
+    def _on_change(self, change):
+        if change["menu"] is not self.menu:
+            return
+        kind = change["kind"]
+        if kind in ("add", "bulk_load"):
+            dishes = [change["dish"]] if kind == "add" else change["dishes"]
+            if change["index"] != len(self.rowids):
+                self._rewrite()
+            else:
+                self.rowids.extend(self._insert_many(dishes))
+        elif kind == "update":
+            value = change["new"]
+            if change["field"] == "price":
+                value = price_to_cents(value)
+            with self.db:
+                self.db.execute(_UPDATE[change["field"]], (value, self.rowids[change["index"]]))
+            self.writes += 1
+        elif kind == "bulk_update":
+            with self.db:
+                for idx, _, field, _, value in change["changes"]:
+                    if field == "price":
+                        value = price_to_cents(value)
+                    self.db.execute(_UPDATE[field], (value, self.rowids[idx]))
+            self.writes += 1
+        elif kind == "delete":
+            with self.db:
+                self.db.execute(_DELETE, (self.rowids.pop(change["index"]),))
+            self.writes += 1
+        elif kind == "clear":
+            with self.db:
+                self.db.execute(_DELETE_ALL)
+            self.rowids = []
+            self.writes += 1
+
+    def find_dishes(self, name=None, vegetarian=None, min_price=None, max_price=None, order_by=None, limit=None):
+        """
+        Queries the stored menu using the indexes on name, price and vegetarian.
+
+        Args:
+            name (str, optional): Only dishes with exactly this name.
+            vegetarian (bool, optional): Only vegetarian (True) or non-vegetarian (False) dishes.
+            min_price (float, optional): Only dishes that cost at least this much.
+            max_price (float, optional): Only dishes that cost at most this much.
+            order_by (str, optional): None (menu order), "name", "price", "calories" or "spicy_level".
+            limit (int, optional): The maximum number of dishes to return.
+
+        Returns:
+            list or int: The matching dishes, or -1 if `order_by` is not supported.
+        """
+        if order_by not in _ORDER_BY:
+            return -1
+        clauses = []
+        params = []
+        if name is not None:
+            clauses.append("name = ?")
+            params.append(name)
+        if vegetarian is not None:
+            clauses.append("is_vegetarian = ? COLLATE NOCASE")
+            params.append("yes" if vegetarian else "no")
+        if min_price is not None:
+            clauses.append("price_cents >= ?")
+            params.append(price_to_cents(min_price))
+        if max_price is not None:
+            clauses.append("price_cents <= ?")
+            params.append(price_to_cents(max_price))
+        sql = f"SELECT {_COLUMNS} FROM dishes"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += f" ORDER BY {_ORDER_BY[order_by]}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [_row_to_dish(row) for row in self.db.execute(sql, params)]
@@ -0,0 +1,388 @@
+"""
+Differential and property-based test harness for the menu functions.
+
+The harness generates random menus, CSV files (including malformed rows) and operation
+sequences from a seed, runs them through the reference functions in `functions.py` and through
+every registered alternative implementation, and asserts that both produce identical results:
+the same return values (including invalid-row lists and error codes), the same exceptions and
+the same menu afterwards.
+
+An alternative implementation only has to provide the functions it replaces; the others fall
+back to the reference:
+
+    from differential import register_implementation, run_differential
+    register_implementation("fast loader", load_menu_from_csv=fast_load_menu_from_csv)
+    run_differential(seeds=range(50))
+
+Failures raise AssertionError with the seed and the step, so any case can be replayed with
+`run_case(seed)`.
+"""
+import contextlib
+import io
+import os
+import random
+import shutil
+import tempfile
+
+import functions
+
+SPICY_SCALE_MAP = {1: "Not spicy", 2: "Low key spicy", 3: "Hot", 4: "Diabolical"}
+
+OPERATIONS = ("get_new_menu_dish", "add_dishes_bulk", "load_menu_from_csv", "update_menu_dish", "delete_dish",
+              "get_restaurant_expense_rating", "save_menu_to_csv")
+
+FIELDS = ("name", "calories", "price", "is_vegetarian", "spicy_level")
+
+_implementations = {}
+
+
+def reference_implementation():
+    """
+    Returns the reference implementation: the functions of `functions.py`.
+
+    Returns:
+        dict: The operation names mapped to the reference functions.
+    """
+    return {name: getattr(functions, name) for name in OPERATIONS}
+
+
+def register_implementation(label, **overrides):
+    """
+    Registers an alternative implementation to compare against the reference.
+
+    Args:
+        label (str): A name for the implementation, used in failure messages.
+        **overrides: Operation names (see `OPERATIONS`) mapped to the replacement functions.
+
+    Returns:
+        dict: The complete implementation (overrides plus reference functions).
+    """
+    unknown = set(overrides) - set(OPERATIONS)
+    if unknown:
+        raise ValueError(f"unknown operations: {sorted(unknown)}")
+    implementation = reference_implementation()
+    implementation.update(overrides)
+    _implementations[label] = implementation
+    return implementation
+
+
+def unregister_implementation(label):
+    """Removes a registered implementation; returns True if it was registered."""
+    return _implementations.pop(label, None) is not None
+
+
+def registered_implementations():
+    """Returns the registered implementations as a dict of label to implementation."""
+    return dict(_implementations)
+
+
+def random_name(rng):
+    length = rng.choice([rng.randint(3, 25), rng.randint(3, 25), rng.randint(0, 2), 26])
+    return "".join(rng.choice("abcdefghijklmnopqrstuvwxyz ") for _ in range(length))
+
+
+def random_field(rng, field, valid=True):
+    """
+    Generates the string form of one dish field, valid or (often) invalid.
+
+    Args:
+        rng (random.Random): The random generator.
+        field (str): One of `FIELDS`.
+        valid (bool, optional): If False, the value is drawn from a pool of mostly invalid values.
+
+    Returns:
+        str: The field value as it would appear in a CSV row or at the add prompt.
+    """
+    if field == "name":
+        if not valid:
+            return random_name(rng)
+        return "".join(rng.choice("abcdefghij klm") for _ in range(rng.randint(3, 25)))
+    if field == "calories":
+        return str(rng.randint(0, 3000)) if valid else rng.choice(["", "abc", "12.5", " 40", "-7", "1e3", "٣"])
+    if field == "price":
+        if valid:
+            return rng.choice([str(rng.randint(0, 99)), f"{rng.uniform(0, 60):.2f}", f"{rng.uniform(0, 60):.1f}",
+                               f"{rng.randint(0, 9999) / 100}"])
+        return rng.choice(["", "five", "1,5", "nan", "inf", "-3.5", "1e2", " 7.25", "1e30", "-1e30", "1e400",
+                           "1e1000000", "99999999999999999999", "1e-400", "1" * 5000, "0" * 5000 + "1" * 5000,
+                           "0" * 5000 + "12.5"])
+    if field == "is_vegetarian":
+        return rng.choice(["yes", "no", "Yes", "NO"]) if valid else rng.choice(["", "maybe", "y", "1"])
+    if field == "spicy_level":
+        return str(rng.randint(1, 4)) if valid else rng.choice(["0", "5", "", "two", "2.0", " 3"])
+    raise ValueError(field)
+
+
+def random_dish_fields(rng, invalid_rate=0.2):
+    """Generates the five field strings of a dish; each field is invalid with probability `invalid_rate`."""
+    return [random_field(rng, field, rng.random() >= invalid_rate) for field in FIELDS]
+
+
+def random_menu(rng, size):
+    """Generates a menu of `size` valid dishes built with the reference `get_new_menu_dish()`."""
+    menu = []
+    while len(menu) < size:
+        dish = functions.get_new_menu_dish(random_dish_fields(rng, 0.0), SPICY_SCALE_MAP)
+        if type(dish) == dict:
+            menu.append(dish)
+    return menu
+
+
+def random_csv_text(rng, rows):
+    """
+    Generates the text of a menu CSV file with valid and malformed rows.
+
+    Malformed rows include wrong field counts, invalid values, quoted fields with embedded commas
+    or line breaks, non-ASCII names, blank lines, trailing whitespace and "\r\n" or lone "\r"
+    line endings.
+
+    Args:
+        rng (random.Random): The random generator.
+        rows (int): The number of rows.
+
+    Returns:
+        str: The file content.
+    """
+    lines = []
+    for _ in range(rows):
+        kind = rng.random()
+        fields = random_dish_fields(rng, 0.0 if kind < 0.6 else 0.3)
+        if kind < 0.7:
+            line = ",".join(fields)
+        elif kind < 0.76:
+            line = ",".join(fields[:rng.randint(0, 4)])
+        elif kind < 0.82:
+            line = ",".join(fields + ["extra"])
+        elif kind < 0.88:
+            fields[0] = '"' + fields[0][:10] + ', the' + '"'
+            line = ",".join(fields)
+        elif kind < 0.92:
+            line = ""
+        elif kind < 0.94:
+            line = ",".join(fields) + rng.choice([" ", "\t", ","])
+        elif kind < 0.96:
+            fields[0] = '"' + fields[0][:8] + rng.choice(["\n", "\r\n", "\r"]) + 'next"'
+            line = ",".join(fields)
+        elif kind < 0.98:
+            fields[0] = fields[0][:8] + rng.choice(["\u00e9", "\u00f1o", "\u4e2d"])
+            line = ",".join(fields)
+        else:
+            fields[0] = '"' + fields[0].replace("a", '""') + '"'
+            line = ",".join(fields)
+        lines.append(line)
+    separators = [rng.choice(["\n", "\n", "\n", "\r\n", "\r"]) for _ in lines[1:]] + [rng.choice(["", "\n", "\r\n"])]
+    return "".join(line + separator for line, separator in zip(lines, separators))
+
+
+def random_operations(rng, count, directory):
+    """
+    Generates a sequence of operations as `(name, args)` tuples.
+
+    The menu argument of menu operations is not included; the runner passes each implementation
+    its own copy of the menu. CSV files for "load_menu_from_csv" are written to `directory`.
+
+    Args:
+        rng (random.Random): The random generator.
+        count (int): The number of operations.
+        directory (str): A directory for the generated CSV files.
+
+    Returns:
+        list: The operations.
+    """
+    operations = []
+    for step in range(count):
+        name = rng.choice(OPERATIONS)
+        if name == "get_new_menu_dish":
+            fields = random_dish_fields(rng)
+            if rng.random() < 0.1:
+                fields = fields[:rng.randint(0, 6)]
+            args = (fields,)
+        elif name == "add_dishes_bulk":
+            args = ([",".join(random_dish_fields(rng)) for _ in range(rng.randint(0, 20))],)
+        elif name == "load_menu_from_csv":
+            filename = os.path.join(directory, f"step{step}.csv")
+            with open(filename, "w", newline="") as f:
+                f.write(random_csv_text(rng, rng.randint(0, 40)))
+            if rng.random() < 0.05:
+                filename = rng.choice([filename[:-4] + ".txt", os.path.join(directory, "missing.csv")])
+            args = (filename,)
+        elif name == "update_menu_dish":
+            field = rng.choice(FIELDS + ("colour",))
+            idx = rng.choice([str(rng.randint(0, 30)), str(rng.randint(0, 5)), "-1", "x", rng.randint(0, 5)])
+            args = (idx, field, random_field(rng, field if field in FIELDS else "name", rng.random() < 0.7),
+                    rng.choice([0, 1]))
+        elif name == "delete_dish":
+            args = (rng.choice([str(rng.randint(0, 30)), str(rng.randint(0, 5)), "-1", "x", 3]), rng.choice([0, 1]))
+        elif name == "save_menu_to_csv":
+            args = (os.path.join(directory, f"saved{step}" + rng.choice([".csv", ".csv", ".txt"])),)
+        else:
+            args = ()
+        operations.append((name, args))
+    return operations
+
+
+def apply_operation(implementation, menu, name, args):
+    """
+    Runs one operation of an implementation against a menu.
+
+    Exceptions are captured and returned as `("raises", exception_type_name)` so that implementations
+    are also compared on how they fail. Saved files are returned as their content. Results are
+    compared by `repr()`, which also tells 1 from 1.0 (non-finite and out-of-range prices such as
+    "nan" or "1e30" are rejected, so no NaN price reaches a menu).
+
+    Args:
+        implementation (dict): The operation names mapped to functions.
+        menu (list): The menu the operation runs against (modified in place).
+        name (str): The operation name.
+        args (tuple): The operation arguments (see `random_operations()`).
+
+    Returns:
+        The comparable result of the operation.
+    """
+    function = implementation[name]
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            if name == "get_new_menu_dish":
+                return function(args[0], SPICY_SCALE_MAP)
+            elif name == "add_dishes_bulk":
+                return function(args[0], menu, SPICY_SCALE_MAP)
+            elif name == "load_menu_from_csv":
+                return function(args[0], menu, SPICY_SCALE_MAP)
+            elif name == "update_menu_dish":
+                idx, field, value, start_idx = args
+                result = function(menu, idx, SPICY_SCALE_MAP, field, value, start_idx=start_idx)
+                return dict(result) if functions.is_dish(result) else result
+            elif name == "delete_dish":
+                result = function(menu, args[0], args[1])
+                return dict(result) if functions.is_dish(result) else result
+            elif name == "save_menu_to_csv":
+                result = function(menu, args[0])
+                if result is None and os.path.exists(args[0]):
+                    with open(args[0]) as f:
+                        content = f.read()
+                    os.remove(args[0])
+                    return result, content
+                return result
+            else:
+                return function(menu)
+    except Exception as exc:
+        return "raises", type(exc).__name__
+
+
+def normalize_menu(menu):
+    """Converts a menu into plain dicts so implementations using other dish types compare equal."""
+    return [dict(dish) if type(dish) != dict else dish for dish in menu]
+
+
+def run_case(seed, operations=30, menu_size=None, implementations=None):
+    """
+    Runs one random case through the reference and the alternative implementations.
+
+    Args:
+        seed (int): The seed of the case.
+        operations (int, optional): The number of operations. Defaults to 30.
+        menu_size (int, optional): The size of the starting menu. Defaults to a random size up to 50.
+        implementations (dict, optional): The implementations to compare. Defaults to the registered ones.
+
+    Returns:
+        int: The number of compared results.
+    """
+    if implementations is None:
+        implementations = _implementations
+    rng = random.Random(seed)
+    directory = tempfile.mkdtemp(prefix="menu-differential-")
+    try:
+        start_menu = random_menu(rng, menu_size if menu_size is not None else rng.randint(0, 50))
+        ops = random_operations(rng, operations, directory)
+
+        reference = reference_implementation()
+        reference_menu = [dict(dish) for dish in start_menu]
+        reference_results = [apply_operation(reference, reference_menu, name, args) for name, args in ops]
+
+        compared = 0
+        for label, implementation in implementations.items():
+            menu = [dict(dish) for dish in start_menu]
+            for step, (name, args) in enumerate(ops):
+                result = apply_operation(implementation, menu, name, args)
+                expected = reference_results[step]
+                assert repr(result) == repr(expected), (f"{label}: seed {seed}, step {step} {name}{args!r}: "
+                                            f"{result!r} != {expected!r}")
+                compared += 1
+            assert repr(normalize_menu(menu)) == repr(reference_menu), f"{label}: seed {seed}: final menus differ"
+        return compared
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def check_properties(seed):
+    """
+    Checks properties of the reference functions on a random case.
+
+    - A saved menu loads back to the same dishes with no invalid rows.
+    - `load_menu_from_csv()` reports exactly the rows that `get_new_menu_dish()` rejects, and keeps the others.
+    - `add_dishes_bulk()` adds exactly the lines that `get_new_menu_dish()` accepts.
+
+    Args:
+        seed (int): The seed of the case.
+
+    Returns:
+        None
+    """
+    import csv
+
+    rng = random.Random(seed)
+    directory = tempfile.mkdtemp(prefix="menu-properties-")
+    try:
+        menu = random_menu(rng, rng.randint(0, 100))
+        filename = os.path.join(directory, "menu.csv")
+        with contextlib.redirect_stdout(io.StringIO()):
+            functions.save_menu_to_csv(menu, filename)
+            loaded = []
+            assert functions.load_menu_from_csv(filename, loaded, SPICY_SCALE_MAP) == [], f"seed {seed}"
+        assert repr(loaded) == repr(menu), f"seed {seed}: save/load round trip changed the menu"
+
+        with open(filename, "w", newline="") as f:
+            f.write(random_csv_text(rng, rng.randint(0, 100)))
+        with open(filename) as f:
+            rows = list(csv.reader(f))
+        expected = [functions.get_new_menu_dish(row, SPICY_SCALE_MAP) for row in rows]
+        loaded = []
+        invalid_rows = functions.load_menu_from_csv(filename, loaded, SPICY_SCALE_MAP)
+        assert invalid_rows == [i for i, dish in enumerate(expected, start=1) if type(dish) != dict], f"seed {seed}"
+        assert repr(loaded) == repr([dish for dish in expected if type(dish) == dict]), f"seed {seed}"
+
+        lines = [",".join(random_dish_fields(rng)) for _ in range(rng.randint(0, 100))]
+        bulk_menu = []
+        added, invalid_lines = functions.add_dishes_bulk(lines, bulk_menu, SPICY_SCALE_MAP)
+        accepted = [functions.get_new_menu_dish(line.split(","), SPICY_SCALE_MAP) for line in lines]
+        assert repr(bulk_menu) == repr([dish for dish in accepted if type(dish) == dict]), f"seed {seed}"
+        assert added + len(invalid_lines) == len([line for line in lines if line.strip()]), f"seed {seed}"
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def run_differential(seeds=range(20), operations=30, implementations=None):
+    """
+    Runs the property checks and the differential comparison for several seeds.
+
+    Args:
+        seeds (iterable, optional): The seeds to run. Defaults to range(20).
+        operations (int, optional): The number of operations per case. Defaults to 30.
+        implementations (dict, optional): The implementations to compare. Defaults to the registered ones.
+
+    Returns:
+        int: The total number of compared results.
+    """
+    compared = 0
+    for seed in seeds:
+        check_properties(seed)
+        compared += run_case(seed, operations, implementations=implementations)
+    return compared
+
+
+if __name__ == "__main__":
+    import sys
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    register_implementation("reference (self-check)")
+    print(f"compared {run_differential(range(count))} results over {count} seeds")
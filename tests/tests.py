@@ -1,4 +1,31 @@
 from functions import *
+from menu_cache import load_menu_cached
+from events import MenuEventBus, QueueSink
+from history import MenuHistory
+from server import make_menu_server
+from prices import PriceColumn, expense_rating_from_cents
+from dish import Dish, new_dish_record, to_dish_menu
+from sorting import MAX_SHARED_SORTERS, MenuSorter, get_menu_sorter, release_menu_sorter
+from ingest import CheckpointedLoader, get_checkpoint_filename, load_menu_checkpointed
+from bloom import MenuNameFilter, bloom_parameters
+from spill import SpilledMenu, estimate_dish_size
+from storage import SQLiteMenuStore
+from fast_csv import load_menu_from_csv_fast
+from session import SessionRecorder, load_session, replay_sessions, synthetic_session
+import builtins
+from estimate import estimate_expense_rating
+from partition import PartitionedMenu, partition_of
+from combos import MAX_SHARED_OPTIMIZERS, ComboOptimizer, get_combo_optimizer, release_combo_optimizer
+from autosave import AutosaveScheduler
+import cli
+import contextlib
+import io
+import itertools
+import http.client
+import json
+import threading
+import time
+from differential import register_implementation, run_case, run_differential, unregister_implementation
 import os
 
 spicy_scale_map = {1: "Not spicy", 2: "Low key spicy", 3: "Hot", 4: "Diabolical"}
@@ -37,6 +64,7 @@ assert not is_valid_is_vegetarian("maybe")
 assert is_valid_price("5.9")
 assert is_valid_price("10.15")
 assert not is_valid_price("five")
+assert not is_valid_price("1" * 5000) and not is_valid_price("0" * 5000 + "1" * 5000)
 
 # is_valid_calories
 assert is_valid_calories("100")
@@ -55,6 +83,14 @@ assert get_new_menu_dish(["burrito", "five", "12.90", "yes", "2"], spicy_scale_m
 assert print_dish({"name": "burrito", "calories": 500, "price": 12.90, "is_vegetarian": "yes", "spicy_level": 2},
                   spicy_scale_map) is None
 
+# add_dishes_bulk
+bulk_menu = [get_new_menu_dish_1]
+assert add_dishes_bulk(["taco,300,5.5,yes,1\n", "bad\n", "\n", "soup,100,4,no,9"], bulk_menu,
+                       spicy_scale_map) == (1, [2, 4])
+assert len(bulk_menu) == 2
+assert bulk_menu[1]["name"] == "taco"
+assert add_dishes_bulk([], bulk_menu, spicy_scale_map) == (0, [])
+
 # is_valid_index
 assert is_valid_index([1, 2, 3], "2")
 assert not is_valid_index([1, 2, 3], "4")
@@ -87,4 +123,715 @@ assert get_restaurant_expense_rating(menu1) == 8.656666666666666
 menu2 = [{'dish': 'Spaghetti', 'price': 15.99}, {'dish': 'Steak', 'price': 25.99}, {'dish': 'Wine', 'price': 18.99}]
 assert get_restaurant_expense_rating(menu2) == 20.323333333333334
 menu3 = [{'dish': 'Noodles', 'price': 12.99}, {'dish': 'Fries', 'price': 2.99}, {'dish': 'Bread', 'price': 4.99}]
-assert get_restaurant_expense_rating(menu3) == 6.989999999999999
+assert get_restaurant_expense_rating(menu3) == 6.99
+
+# get_expense_rating
+assert get_expense_rating(9.99) == "$"
+assert get_expense_rating(10) == "$$"
+assert get_expense_rating(20) == "$$$"
+
+# save/load round trip
+save_menu_to_csv([get_new_menu_dish_1], 'test_round_trip.csv')
+round_trip_menu = []
+assert load_menu_from_csv('test_round_trip.csv', round_trip_menu, spicy_scale_map) == []
+assert round_trip_menu == [get_new_menu_dish_1]
+os.remove('test_round_trip.csv')
+
+# load_menu_cached
+save_menu_to_csv([get_new_menu_dish_1], 'test_cached.csv')
+cached_menu = []
+assert load_menu_cached('test_cached.csv', cached_menu, spicy_scale_map) == []
+assert os.path.exists('test_cached.csv.cache')
+assert load_menu_cached('test_cached.csv', cached_menu, spicy_scale_map) == []
+assert cached_menu == [get_new_menu_dish_1, get_new_menu_dish_1]
+assert load_menu_cached('test_cached.csv', [], spicy_scale_map, check='bogus') == -2
+assert load_menu_cached('test_cached.txt', [], spicy_scale_map) == -1
+assert load_menu_cached('missing.csv', [], spicy_scale_map) is None
+os.remove('test_cached.csv')
+os.remove('test_cached.csv.cache')
+
+# menu change events
+seen_changes = []
+subscribe_menu_events(seen_changes.append)
+events_menu = []
+version_before = get_menu_version()
+add_dishes_bulk(["taco,300,5.5,yes,1", "soup,100,4,no,2"], events_menu, spicy_scale_map)
+update_menu_dish(events_menu, '0', spicy_scale_map, 'name', 'tacos')
+delete_dish(events_menu, '1')
+clear_menu(events_menu)
+assert unsubscribe_menu_events(seen_changes.append)
+assert not unsubscribe_menu_events(seen_changes.append)
+assert [change["kind"] for change in seen_changes] == ["bulk_load", "update", "delete", "clear"]
+assert get_menu_version() == version_before + 4
+assert (seen_changes[1]["field"], seen_changes[1]["old"], seen_changes[1]["new"]) == ("name", "taco", "tacos")
+assert seen_changes[2]["index"] == 1 and seen_changes[2]["dish"]["name"] == "soup"
+assert events_menu == []
+
+bus = MenuEventBus(menu=events_menu)
+queue_sink = bus.add_sink(QueueSink())
+add_dishes_bulk(["taco,300,5.5,yes,1"], events_menu, spicy_scale_map)
+add_dishes_bulk(["taco,300,5.5,yes,1"], [], spicy_scale_map)
+bus.close()
+assert bus.stats()["sinks"][0]["delivered"] == 1
+assert queue_sink.events.get_nowait().dishes[0]["name"] == "taco"
+
+class FailingSink:
+    def write_batch(self, events):
+        raise OSError("sink is down")
+
+    def close(self):
+        pass
+
+bus = MenuEventBus(menu=events_menu, batch_size=1, max_delay=0, queue_size=1)
+bus.add_sink(FailingSink())
+queue_sink = bus.add_sink(QueueSink())
+for events_name in ["soup", "rice", "stew", "cake"]:
+    add_dishes_bulk([f"{events_name},100,2.5,yes,1"], events_menu, spicy_scale_map)
+bus.close()
+assert bus.stats()["sinks"][0]["failed_batches"] == 4 and bus.stats()["sinks"][0]["last_error"] == "sink is down"
+assert bus.stats()["sinks"][1]["delivered"] == 4 and queue_sink.events.qsize() == 4
+
+# MenuHistory
+history_menu = []
+add_dishes_bulk(["taco,300,5.5,yes,1", "soup,100,4,no,2"], history_menu, spicy_scale_map)
+history = MenuHistory(history_menu)
+update_menu_dish(history_menu, '1', spicy_scale_map, 'price', '4.5')
+delete_dish(history_menu, '0')
+clear_menu(history_menu)
+assert history.head == 3
+assert [dish["name"] for dish in history.as_of(0)] == ["taco", "soup"]
+assert history.as_of(1)[1]["price"] == 4.5
+assert history.as_of(3) == []
+assert history.size(2) == 1
+assert history.dish_at(2, 0)["name"] == "soup"
+assert history.as_of(timestamp=0) is None
+history_diff = history.diff(0, 2)
+assert [dish["name"] for dish in history_diff["removed"]] == ["taco"]
+assert history_diff["changed"][0][1]["price"] == 4.5
+assert history.rollback_menu(1) == 4
+assert history_menu == history.as_of(1)
+assert history.diff(1, 4) == {"added": [], "removed": [], "changed": []}
+assert history.rollback(99) is None
+history.close()
+
+# menu server
+server_menu = []
+add_dishes_bulk(["taco,300,5.5,yes,1", "soup,100,14.5,no,3"], server_menu, spicy_scale_map)
+menu_server = make_menu_server(server_menu, port=0)
+threading.Thread(target=menu_server.serve_forever, daemon=True).start()
+server_conn = http.client.HTTPConnection(*menu_server.server_address)
+server_conn.request("GET", "/menu?vegetarian=yes")
+server_response = server_conn.getresponse()
+assert server_response.status == 200
+assert json.loads(server_response.read())["dishes"][0]["name"] == "taco"
+server_etag = server_response.getheader("ETag")
+server_conn.request("GET", "/menu?vegetarian=yes", headers={"If-None-Match": server_etag})
+server_response = server_conn.getresponse()
+server_response.read()
+assert server_response.status == 304
+for server_path in ["/rating", "/dish/99", "/menu"]:
+    server_conn.request("GET", server_path, headers={"If-None-Match": server_etag})
+    server_response = server_conn.getresponse()
+    server_response.read()
+    assert server_response.status != 304
+server_conn.request("GET", "/rating")
+assert json.loads(server_conn.getresponse().read()) == {"average_price": 10.0, "rating": "$$"}
+server_conn.request("GET", "/dish/3")
+server_response = server_conn.getresponse()
+server_response.read()
+assert server_response.status == 404
+delete_dish(server_menu, '0')
+server_conn.request("GET", "/menu?vegetarian=yes", headers={"If-None-Match": server_etag})
+server_response = server_conn.getresponse()
+assert server_response.status == 200
+assert json.loads(server_response.read())["count"] == 0
+server_conn.close()
+menu_server.shutdown()
+menu_server.server_close()
+
+# differential harness
+assert get_new_menu_dish(["burrito", "500", "five", "yes", "2"], spicy_scale_map) == ('price', 'five')
+assert run_differential(range(10), implementations={"reference": register_implementation("reference")}) == 300
+assert run_case(1234, operations=40, menu_size=2000) == 40
+unregister_implementation("reference")
+
+
+def off_by_one_delete_dish(in_list, idx, start_idx=0):
+    return delete_dish(in_list, idx, start_idx + 1) if in_list else 0
+
+
+register_implementation("off by one", delete_dish=off_by_one_delete_dish)
+try:
+    run_differential(range(5))
+    detected = False
+except AssertionError:
+    detected = True
+assert detected
+assert unregister_implementation("off by one")
+
+# integer cents
+assert parse_price_cents("12.9") == 1290
+assert parse_price_cents("12.905") == 1291
+assert parse_price_cents("-0.5") == -50
+assert parse_price_cents("1e2") == 10000
+assert parse_price_cents("nan") is None
+assert parse_price_cents("five") is None
+assert not is_valid_price("inf")
+assert parse_price_cents("1e30") is None and not is_valid_price("-1e1000000") and not is_valid_price("1e30")
+assert parse_price_cents("9999999999999.99") == MAX_PRICE_CENTS - 1 and parse_price_cents("10000000000000") is None
+assert parse_price_cents("1" * 5000) is None and parse_price_cents("-" + "9" * 5000 + ".5") is None
+assert parse_price_cents("0" * 5000 + "1.50") == 150 and parse_price_cents("0" * 5000) == 0
+assert get_new_menu_dish(["taco", "1", "1" * 5000, "yes", "1"], spicy_scale_map) == ("price", "1" * 5000)
+assert get_new_menu_dish(["taco", "1", "1e30", "yes", "1"], spicy_scale_map) == ("price", "1e30")
+with open("huge_price_test.csv", "w") as f:
+    f.write("taco,1,1e30,yes,1\nsoup,200,99999999999999,yes,1\nsalad,150,6.00,yes,1\n")
+assert load_menu_from_csv("huge_price_test.csv", [], spicy_scale_map) == [1, 2]
+assert load_menu_from_csv_fast("huge_price_test.csv", [], spicy_scale_map) == [1, 2]
+os.remove("huge_price_test.csv")
+assert format_price_cents(1290) == "12.90"
+assert format_price_cents(-5) == "-0.05"
+assert price_to_cents(12.9) == 1290
+assert price_to_cents("3.10") == 310
+assert price_to_cents(7) == 700
+assert update_menu_dish([{'price': 1.0}], '0', spicy_scale_map, 'price', '4.25') == {'price': 4.25}
+assert get_restaurant_expense_rating([{'price': 0.1}] * 10) == 0.1
+assert get_restaurant_expense_rating([{'price': '19.9'}, {'price': 0.1}]) == 10.0
+assert total_price_cents([{'price': 0.1}] * 10) == 100 and total_price_cents([]) == 0
+assert total_price_cents([{'price': '19.9'}, {'price': 0.1}]) == 2000
+assert total_price_cents([{'price': -1.5}, {'price': 2.25}]) == 75
+assert total_price_cents([{'price': 9999999999999.99}] * 1000) == 999999999999999000
+assert expense_rating_from_cents(999, 1) == "$"
+assert expense_rating_from_cents(2000, 2) == "$$"
+assert expense_rating_from_cents(0, 0) is None
+
+price_menu = []
+add_dishes_bulk(["taco,300,5.5,yes,1", "soup,100,14.5,no,3"], price_menu, spicy_scale_map)
+price_column = PriceColumn(price_menu)
+update_menu_dish(price_menu, '0', spicy_scale_map, 'price', '6.75')
+delete_dish(price_menu, '1')
+add_dishes_bulk(["pie,300,0.10,yes,1"], price_menu, spicy_scale_map)
+assert list(price_column.cents) == [675, 10]
+assert price_column.total_cents() == 685
+assert price_column.format_total() == "6.85"
+assert price_column.expense_rating() == "$"
+clear_menu(price_menu)
+assert price_column.total_cents() == 0 and price_column.expense_rating() is None
+price_column.close()
+
+# Dish
+record = new_dish_record(["burrito", "500", "12.90", "yes", "2"], spicy_scale_map)
+assert type(record) == Dish
+assert record == get_new_menu_dish_1
+assert record.price_cents == 1290 and record.price == 12.9 and record["price"] == 12.9
+assert new_dish_record(["a", "500", "12.90", "yes", "2"], spicy_scale_map) == ('name', 'a')
+assert dict(record) == get_new_menu_dish_1
+assert "calories" in record and "colour" not in record
+assert is_dish(record) and is_dish({}) and not is_dish(-1)
+record_menu = to_dish_menu([dict(get_new_menu_dish_1), dict(get_new_menu_dish_1)])
+assert all(type(dish) == Dish for dish in record_menu)
+assert update_menu_dish(record_menu, '1', spicy_scale_map, 'calories', '350', start_idx=1).calories == 350
+assert update_menu_dish(record_menu, '1', spicy_scale_map, 'colour', 'red', start_idx=1) == -2
+assert update_menu_dish([{'calories': 1}], '0', spicy_scale_map, 'calories', '200') == {'calories': 200}
+assert delete_dish(record_menu, '1', 1).calories == 350
+assert get_restaurant_expense_rating(record_menu) == 12.9
+assert record_menu[0].__slots__ and not hasattr(record_menu[0], '__dict__')
+
+
+def record_add_dishes_bulk(dish_lines, restaurant_menu_list, spicy_scale_map):
+    added, invalid_lines = add_dishes_bulk(dish_lines, restaurant_menu_list, spicy_scale_map)
+    to_dish_menu(restaurant_menu_list)
+    return added, invalid_lines
+
+
+assert run_differential(range(10), implementations={
+    "Dish records": register_implementation("Dish records", add_dishes_bulk=record_add_dishes_bulk)}) == 300
+unregister_implementation("Dish records")
+
+# MenuSorter
+sort_menu = []
+add_dishes_bulk(["tacos,300,5.50,yes,3", "burger,900,12.00,no,1", "curry,600,9.25,no,4"], sort_menu, spicy_scale_map)
+sorter = MenuSorter(sort_menu)
+assert sorter.top_n("price", 2) == [(1, sort_menu[1]), (2, sort_menu[2])]
+assert sorter.permutations == {}
+assert sorter.sorted_indices("price") == [0, 2, 1]
+assert sorter.sorted_indices("name", descending=True) == [0, 2, 1]
+assert [dish["name"] for dish in sorter.sorted_dishes("spicy_level")] == ["burger", "tacos", "curry"]
+update_menu_dish(sort_menu, '0', spicy_scale_map, 'price', '20')
+add_dishes_bulk(["apple pie,250,3.00,yes,1"], sort_menu, spicy_scale_map)
+delete_dish(sort_menu, '1')
+assert sorter.sorted_indices("price") == [2, 1, 0]
+assert sorter.sorted_indices("name") == [2, 1, 0]
+assert sorter.top_n("price", 1, largest=False) == [(2, sort_menu[2])]
+add_dishes_bulk(["zucchini,100,1.00,yes,1", "bagel,300,2.50,yes,1"], sort_menu, spicy_scale_map)
+assert sorter.sorted_indices("price") == [3, 4, 2, 1, 0]
+assert sorter.rebuilds == 3
+assert sorter.sorted_indices("price") == sorted(range(5), key=lambda i: sort_menu[i]["price"])
+clear_menu(sort_menu)
+assert sorter.sorted_indices("calories") == []
+sorter.close()
+tie_menu = []
+add_dishes_bulk(["soup,200,4.00,yes,1", "stew,400,9.00,no,2", "salad,150,4.00,yes,1", "chili,500,9.00,no,3",
+                 "bread,300,4.00,yes,1"], tie_menu, spicy_scale_map)
+tie_sorter = MenuSorter(tie_menu)
+assert tie_sorter.top_n("price", 3) == [(1, tie_menu[1]), (3, tie_menu[3]), (0, tie_menu[0])]
+assert tie_sorter.sorted_indices("price", descending=True) == [1, 3, 0, 2, 4]
+assert tie_sorter.top_n("price", 3) == [(1, tie_menu[1]), (3, tie_menu[3]), (0, tie_menu[0])]
+assert tie_sorter.sorted_indices("spicy_level", descending=True) == [3, 1, 0, 2, 4]
+tie_sorter.close()
+assert get_menu_sorter(sort_menu) is get_menu_sorter(sort_menu)
+assert release_menu_sorter(sort_menu) and not release_menu_sorter(sort_menu)
+shared_menu = []
+add_dishes_bulk(["soup,200,4.00,yes,1", "stew,400,9.00,no,2"], shared_menu, spicy_scale_map)
+shared_sorter = get_menu_sorter(shared_menu)
+shared_sorter.permutation("price")
+shared_others = [[] for _ in range(MAX_SHARED_SORTERS)]
+for shared_other in shared_others:
+    get_menu_sorter(shared_other)
+assert shared_sorter.closed and shared_sorter.permutations == {}
+add_dishes_bulk(["bread,300,1.00,yes,1"], shared_menu, spicy_scale_map)
+assert shared_sorter.permutations == {} and shared_sorter.sorted_indices("price") == [2, 0, 1]
+assert shared_sorter.permutations == {} and get_menu_sorter(shared_menu) is not shared_sorter
+for shared_other in shared_others:
+    release_menu_sorter(shared_other)
+release_menu_sorter(shared_menu)
+
+# sync_menu_from_csv
+sync_menu = []
+add_dishes_bulk(["tacos,300,5.50,yes,3", "burger,900,12.00,no,1", "curry,600,9.25,no,4"], sync_menu, spicy_scale_map)
+save_menu_to_csv(sync_menu, "sync_test.csv")
+assert sync_menu_from_csv("sync_test.csv", sync_menu, spicy_scale_map) == \
+    {"inserted": 0, "updated": 0, "deleted": 0, "unchanged": 3, "invalid_rows": []}
+with open("sync_test.csv", "w") as f:
+    f.write("curry,600,9.75,no,4\ntacos,300,5.5,yes,3\nsoup,200,4.00,yes,1\nburger,x,12.00,no,1\n")
+sync_column = PriceColumn(sync_menu)
+assert sync_menu_from_csv("sync_test.csv", sync_menu, spicy_scale_map) == \
+    {"inserted": 1, "updated": 1, "deleted": 0, "unchanged": 1, "invalid_rows": [4]}
+assert [dish["name"] for dish in sync_menu] == ["tacos", "burger", "curry", "soup"]
+assert sync_menu[2]["price"] == 9.75
+with open("sync_test.csv", "w") as f:
+    f.write("soup,200,4.00,yes,1\n")
+assert sync_menu_from_csv("sync_test.csv", sync_menu, spicy_scale_map)["deleted"] == 3
+assert sync_menu == [{"name": "soup", "calories": 200, "price": 4.0, "is_vegetarian": "yes", "spicy_level": 1}]
+assert sync_column.total_cents() == 400
+sync_column.close()
+assert sync_menu_from_csv("sync_test.txt", sync_menu, spicy_scale_map) == -1
+assert sync_menu_from_csv("missing_sync_test.csv", sync_menu, spicy_scale_map) is None
+os.remove("sync_test.csv")
+
+# CheckpointedLoader
+with open("ingest_test.csv", "w") as f:
+    for i in range(40):
+        f.write(f"dish {i},{100 + i},{i % 25}.50,yes,{1 + i % 5}\n")
+    f.write('"two\nlines",300,4.00,no,2\n\nlast,200,3.00,yes,1\n')
+expected_menu = []
+expected_invalid = load_menu_from_csv("ingest_test.csv", expected_menu, spicy_scale_map)
+loader = CheckpointedLoader("ingest_test.csv", spicy_scale_map, checkpoint_every=5, sync=False)
+assert loader.run(max_rows=17) is False and loader.row_number == 17 and loader.checkpoints == 4
+with open(loader.checkpoint_filename, "ab") as f:
+    f.write(b"\x40\x00\x00\x00torn")
+loader = CheckpointedLoader("ingest_test.csv", spicy_scale_map, checkpoint_every=5, sync=False)
+assert loader.resumed_rows == 17 and len(loader.dishes) + len(loader.invalid_rows) == 17
+assert loader.run(max_rows=20) is False and loader.row_number == 37
+ingest_menu = []
+assert load_menu_checkpointed("ingest_test.csv", ingest_menu, spicy_scale_map, checkpoint_every=5) == expected_invalid
+assert ingest_menu == expected_menu and ingest_menu[-2]["name"] == "two\nlines"
+assert not os.path.exists(get_checkpoint_filename("ingest_test.csv"))
+assert load_menu_checkpointed("ingest_test.txt", ingest_menu, spicy_scale_map) == -1
+assert load_menu_checkpointed("missing_ingest_test.csv", ingest_menu, spicy_scale_map) is None
+os.remove("ingest_test.csv")
+
+# MenuNameFilter
+bloom_menu = []
+add_dishes_bulk(["tacos,300,5.50,yes,3", "burger,900,12.00,no,1"], bloom_menu, spicy_scale_map)
+name_filter = MenuNameFilter(bloom_menu, false_positive_rate=0.001)
+assert name_filter.has_dish("tacos") and not name_filter.has_dish("sushi")
+add_dishes_bulk(["sushi,400,15.00,no,1"], bloom_menu, spicy_scale_map)
+update_menu_dish(bloom_menu, '0', spicy_scale_map, 'name', 'nachos')
+delete_dish(bloom_menu, '1')
+assert name_filter.might_contain("sushi") and name_filter.might_contain("nachos")
+assert not name_filter.has_dish("tacos") and not name_filter.has_dish("burger")
+assert name_filter.existing_names(["sushi", "pho", "ramen"]) == {"sushi"}
+bloom_stats = name_filter.stats()
+assert bloom_stats["names"] == 2 and bloom_stats["memory_bytes"] == bloom_stats["slots"]
+assert bloom_stats["expected_false_positive_rate"] < 0.001 and bloom_stats["definite_misses"] >= 3
+add_dishes_bulk([f"dish number {i},100,1.00,no,1" for i in range(1100)], bloom_menu, spicy_scale_map)
+assert name_filter.rebuilds == 1 and name_filter.capacity == 2048
+assert all(name_filter.might_contain(dish["name"]) for dish in bloom_menu)
+clear_menu(bloom_menu)
+assert name_filter.stats()["names"] == 0 and not name_filter.might_contain("sushi")
+name_filter.close()
+assert bloom_parameters(1000, 0.01) == (9586, 7)
+assert bloom_parameters(1000, 0.01, max_bytes=2000) == (2000, 1)
+
+# SpilledMenu
+spill_lines = [f"dish {i},{100 + i},{i % 30}.25,{'yes' if i % 2 else 'no'},{1 + i % 4}" for i in range(60)]
+spill_reference = []
+add_dishes_bulk(spill_lines, spill_reference, spicy_scale_map)
+spill_menu = SpilledMenu(memory_budget=10 * estimate_dish_size(spill_reference[0]), page_size=4, cache_pages=2)
+assert add_dishes_bulk(spill_lines, spill_menu, spicy_scale_map) == (60, [])
+spill_stats = spill_menu.stats()
+assert 5 < spill_stats["in_memory"] < 15 and spill_stats["in_memory"] + spill_stats["spilled"] == 60
+assert spill_stats["memory_bytes"] <= spill_stats["memory_budget"]
+assert list(spill_menu) == spill_reference and spill_menu[-1] == spill_reference[-1]
+assert get_restaurant_expense_rating(spill_menu) == get_restaurant_expense_rating(spill_reference)
+for spill_target in (spill_menu, spill_reference):
+    update_menu_dish(spill_target, '31', spicy_scale_map, 'price', '99.99', start_idx=1)
+    update_menu_dish(spill_target, '2', spicy_scale_map, 'name', 'renamed', start_idx=1)
+    delete_dish(spill_target, '45', start_idx=1)
+    delete_dish(spill_target, '1', start_idx=1)
+    spill_target.insert(20, {"name": "inserted", "calories": 1, "price": 1.0, "is_vegetarian": "no",
+                             "spicy_level": 1})
+    spill_target.append({"name": "appended", "calories": 1, "price": 2.0, "is_vegetarian": "no", "spicy_level": 1})
+    for spill_index in (3, 7, 11, 50):
+        spill_target[spill_index]
+spill_menu.flush()
+assert spill_menu.stats()["cache_misses"] > 0 and spill_menu.stats()["dirty_pages"] == 0
+assert list(spill_menu) == spill_reference and len(spill_menu) == 60
+assert spill_menu[30]["price"] == 99.99 and spill_menu[2:4] == spill_reference[2:4]
+with open("spill_test.csv", "w") as f:
+    f.write("\n".join(spill_lines) + "\n")
+spill_loaded = SpilledMenu(memory_budget=0, page_size=8)
+assert load_menu_from_csv("spill_test.csv", spill_loaded, spicy_scale_map) == []
+assert spill_loaded.stats()["in_memory"] == 0 and spill_loaded.stats()["pages"] == 8
+assert clear_menu(spill_loaded) == 60 and len(spill_loaded) == 0
+assert load_menu_cached("spill_test.csv", spill_loaded, spicy_scale_map) == [] and len(spill_loaded) == 60
+assert spill_loaded.stats()["in_memory"] == 0 and not os.path.exists("spill_test.csv.cache")
+spill_loaded.close()
+spill_menu.close()
+assert not os.path.exists(spill_menu.spill_filename)
+os.remove("spill_test.csv")
+
+# SQLiteMenuStore
+store_menu = []
+add_dishes_bulk(["tacos,300,5.50,Yes,3", "burger,900,12.00,no,1", "curry,600,9.25,no,4"], store_menu, spicy_scale_map)
+menu_store = SQLiteMenuStore("store_test.db")
+assert menu_store.attach(store_menu) == 0 and len(menu_store) == 3
+update_menu_dish(store_menu, '1', spicy_scale_map, 'price', '7.25', start_idx=1)
+delete_dish(store_menu, '2', start_idx=1)
+add_dishes_bulk(["soup,200,4.00,yes,1", "salad,150,6.00,yes,1"], store_menu, spicy_scale_map)
+assert menu_store.load_dishes() == store_menu
+assert [dish["name"] for dish in menu_store.find_dishes(vegetarian=True, order_by="price")] == ["soup", "salad", "tacos"]
+assert menu_store.find_dishes(name="curry", max_price=9.25) == [store_menu[1]]
+assert menu_store.find_dishes(min_price=6, limit=1) == [store_menu[0]]
+assert menu_store.find_dishes(order_by="colour") == -1
+menu_store.close()
+store_reloaded = [{"name": "placeholder"}]
+menu_store = SQLiteMenuStore("store_test.db")
+assert menu_store.attach(store_reloaded) == 4 and store_reloaded == store_menu
+assert menu_store.db.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+clear_menu(store_reloaded)
+assert len(menu_store) == 0
+menu_store.close()
+os.remove("store_test.db")
+
+# load_menu_from_csv_fast
+with open("fast_test.csv", "w", newline="") as f:
+    f.write('tacos,300,5.50,yes,3\r\n"burrito, large",800,9.99,no,2\n"two\nlines",100,1.00,yes,1\n'
+            'burger,900,12,No,1\nab,1,1.00,no,1\n\nsalad,150,.5,yes,1')
+fast_expected = []
+fast_loaded = []
+assert load_menu_from_csv_fast("fast_test.csv", fast_loaded, spicy_scale_map) == \
+    load_menu_from_csv("fast_test.csv", fast_expected, spicy_scale_map) == [5, 6]
+assert fast_loaded == fast_expected and len(fast_loaded) == 5
+assert load_menu_from_csv_fast("fast_test.txt", [], spicy_scale_map) == -1
+assert load_menu_from_csv_fast("missing_fast_test.csv", [], spicy_scale_map) is None
+os.remove("fast_test.csv")
+assert run_differential(range(10), implementations={
+    "fast loader": register_implementation("fast loader", load_menu_from_csv=load_menu_from_csv_fast)}) == 300
+unregister_implementation("fast loader")
+
+# session recording and replay
+session_answers = iter(["2", "price", "7.25", "n"])
+session_input = builtins.input
+builtins.input = lambda prompt="": next(session_answers)
+recorder = SessionRecorder("session_test.jsonl")
+recorder.install()
+recorder.begin_operation("U", 3)
+assert [input("> ") for _ in range(4)] == ["2", "price", "7.25", "n"]
+recorder.end_operation()
+recorder.uninstall()
+builtins.input = session_input
+recorded = load_session("session_test.jsonl")
+assert recorded == [{"option": "U", "inputs": ["2", "price", "7.25", "n"], "menu_size": 3}]
+os.remove("session_test.jsonl")
+replay_menu = []
+add_dishes_bulk(["tacos,300,5.50,Yes,3", "burger,900,12.00,no,1", "curry,600,9.25,no,4"], replay_menu, spicy_scale_map)
+report = replay_sessions([recorded + [{"option": "A", "inputs": ["soup,200,4.00,yes,1", "n"]},
+                                      {"option": "D", "inputs": []}, {"option": "L", "inputs": ["P"]}]],
+                         restaurant_menu_list=replay_menu)
+assert replay_menu[1]["price"] == 7.25 and replay_menu[3]["name"] == "soup"
+assert report["operations"] == 4 and report["by_option"]["D"]["errors"] == 1 and report["by_option"]["U"]["errors"] == 0
+assert builtins.input is session_input
+report = replay_sessions([[{"option": "U", "inputs": ["6", "calories", "111", "n"]}]], restaurant_menu_list=replay_menu)
+assert replay_menu[1]["calories"] == 111 and report["by_option"]["U"]["errors"] == 0
+synthetic = synthetic_session(40, 200, seed=3, save_filename="replay_test.csv")
+assert len(synthetic) == 40 and synthetic == synthetic_session(40, 200, seed=3, save_filename="replay_test.csv")
+synthetic_menu = []
+add_dishes_bulk([f"dish {i},100,5.00,yes,1" for i in range(200)], synthetic_menu, spicy_scale_map)
+report = replay_sessions([synthetic], operators=3, restaurant_menu_list=synthetic_menu)
+assert report["operations"] == 120 and report["menu_size"] == 200
+assert all(stats["errors"] == 0 for stats in report["by_option"].values())
+assert len(synthetic_menu) == 200 + report["by_option"]["A"]["count"] - report["by_option"]["D"]["count"]
+if os.path.exists("replay_test.csv"):
+    os.remove("replay_test.csv")
+
+# estimate_expense_rating
+with open("estimate_test.csv", "w") as f:
+    for i in range(3000):
+        f.write(f"dish {i},{100 + i % 7},{11 + i % 5}.{i % 100:02d},{'yes' if i % 2 else 'no'},{1 + i % 4}\n")
+    f.write("bad row,1,1\n")
+estimate_menu = []
+load_menu_from_csv("estimate_test.csv", estimate_menu, spicy_scale_map)
+estimate_average = get_restaurant_expense_rating(estimate_menu)
+exact_estimate = estimate_expense_rating("estimate_test.csv", spicy_scale_map)
+assert exact_estimate["exact"] and exact_estimate["average_price"] == estimate_average
+assert exact_estimate["rating"] == "$$" and exact_estimate["valid_rows"] == 3000 and exact_estimate["sampled_rows"] == 3001
+sampled_estimate = estimate_expense_rating("estimate_test.csv", spicy_scale_map, rows_per_block=16, exact_bytes=0, seed=7)
+assert not sampled_estimate["exact"] and sampled_estimate["decided"] and sampled_estimate["rating"] == "$$"
+assert sampled_estimate["blocks"] == 30 and sampled_estimate["low"] <= estimate_average <= sampled_estimate["high"]
+assert sampled_estimate == estimate_expense_rating("estimate_test.csv", spicy_scale_map, rows_per_block=16,
+                                                   exact_bytes=0, seed=7)
+capped_estimate = estimate_expense_rating("estimate_test.csv", spicy_scale_map, confidence=0.999999, min_blocks=2,
+                                          max_blocks=3, rows_per_block=1, exact_bytes=0, seed=1)
+assert capped_estimate["blocks"] <= 3
+with open("estimate_test.csv", "w", encoding="utf-8") as f:
+    for i in range(200):
+        f.write(f"{'é' * 13}{i % 10},100,12.50,yes,1\n")
+for estimate_encoding, estimate_valid in [("utf-8", True), ("latin-1", False)]:
+    exact_estimate = estimate_expense_rating("estimate_test.csv", spicy_scale_map, encoding=estimate_encoding)
+    sampled_estimate = estimate_expense_rating("estimate_test.csv", spicy_scale_map, min_blocks=2, max_blocks=2,
+                                               exact_bytes=0, seed=3, encoding=estimate_encoding)
+    assert exact_estimate["valid_rows"] == (200 if estimate_valid else 0)
+    assert (sampled_estimate["valid_rows"] == sampled_estimate["sampled_rows"]) is estimate_valid
+    assert sampled_estimate["valid_rows"] > 0 or not estimate_valid
+os.remove("estimate_test.csv")
+assert estimate_expense_rating("estimate_test.txt", spicy_scale_map) == -1
+assert estimate_expense_rating("estimate_test.csv", spicy_scale_map) is None
+
+# PartitionedMenu
+partition_source = []
+add_dishes_bulk([f"dish {i},{100 + i % 9},{5 + i % 20}.{i % 4 * 25:02d},{'yes' if i % 3 else 'no'},{1 + i % 4}"
+                 for i in range(200)], partition_source, spicy_scale_map)
+assert {partition_of(dish_id, 3) for dish_id in range(30)} == {0, 1, 2}
+with PartitionedMenu(spicy_scale_map, workers=3, dishes=partition_source) as partitioned:
+    assert len(partitioned) == 200 and partitioned.dishes() == partition_source
+    assert partitioned.expense_rating() == ("$$", get_restaurant_expense_rating(partition_source))
+    partition_sorter = MenuSorter(partition_source)
+    assert [dish for _, dish in partitioned.list_dishes(order_by="price")] == partition_sorter.sorted_dishes("price")
+    assert [dish for _, dish in partitioned.list_dishes(order_by="name", descending=True, limit=5)] == \
+        partition_sorter.sorted_dishes("name", descending=True)[:5]
+    partition_by_price = sorted(partition_source, key=lambda dish: price_to_cents(dish["price"]), reverse=True)
+    assert [dish for _, dish in partitioned.list_dishes(order_by="price", descending=True)] == partition_by_price
+    assert [dish for _, dish in partitioned.list_dishes(order_by="price", descending=True, limit=7)] == \
+        partition_by_price[:7] == partition_sorter.sorted_dishes("price", descending=True)[:7]
+    assert [dish_id for dish_id, _ in partitioned.list_dishes(descending=True, limit=3)] == [199, 198, 197]
+    assert [dish for _, dish in partitioned.list_dishes(vegetarian_only=True)] == \
+        [dish for dish in partition_source if dish["is_vegetarian"] == "yes"]
+    assert partitioned.list_dishes(order_by="colour") == -1
+    partition_sorter.close()
+    assert partitioned.update(7, "price", "1.25")["price"] == 1.25
+    assert partitioned.update(7, "price", "free") == "price" and partitioned.update(7, "colour", "red") == -2
+    assert partitioned.update(999, "price", "1") == -1
+    assert partitioned.delete(8)["name"] == "dish 8" and partitioned.get(8) == -1 and len(partitioned) == 199
+    assert partitioned.find("dish 9") == [(9, partition_source[9])]
+    with open("partition_test.csv", "w") as f:
+        f.write("soup,200,4.00,yes,1\nbad,1,1\nsalad,150,6.00,yes,1\n")
+    assert partitioned.load_csv("partition_test.csv") == [2]
+    assert [dish["name"] for dish in partitioned.dishes()[-2:]] == ["soup", "salad"]
+    os.remove("partition_test.csv")
+    assert partitioned.load_csv("partition_test.csv") is None and partitioned.load_csv("partition_test.txt") == -1
+    assert partitioned.clear() == 201 and partitioned.expense_rating() == (None, 0.0)
+    partitioned.extend([{"name": "no price"}, partition_source[0]])
+    try:
+        partitioned.expense_rating()
+        assert False
+    except KeyError:
+        pass
+    assert len(partitioned) == 2 and partitioned.get(partitioned.next_id - 1) == partition_source[0]
+partitioned = PartitionedMenu(spicy_scale_map, workers=2)
+partitioned.processes[0].kill()
+partitioned.processes[0].join()
+partitioned.close()
+
+# ComboOptimizer
+combo_menu = []
+add_dishes_bulk(["tacos,300,5.50,yes,3", "burger,900,12.00,no,1", "curry,600,9.25,yes,4", "soup,200,4.00,yes,1",
+                 "salad,150,6.00,yes,1", "fries,400,3.50,yes,2", "wrap,500,8.75,yes,2", "soup,200,4.00,yes,1"],
+                combo_menu, spicy_scale_map)
+combo_optimizer = get_combo_optimizer(combo_menu)
+assert get_combo_optimizer(combo_menu) is combo_optimizer
+for combo_limits in [(1200, 25, True, 2), (800, 15, False, None), (2000, 40, False, 3), (100, 5, True, None)]:
+    for combo_objective in ["price", "calories", "dishes"]:
+        combo = combo_optimizer.best_combo(*combo_limits, objective=combo_objective)
+        best_value = 0
+        combo_candidates = [dish for dish in combo_menu if (not combo_limits[2] or dish["is_vegetarian"] == "yes")
+                            and (combo_limits[3] is None or dish["spicy_level"] <= combo_limits[3])]
+        for size in range(len(combo_candidates) + 1):
+            for subset in itertools.combinations(combo_candidates, size):
+                cents = sum(price_to_cents(dish["price"]) for dish in subset)
+                calories = sum(dish["calories"] for dish in subset)
+                if cents <= price_to_cents(combo_limits[1]) and calories <= combo_limits[0]:
+                    best_value = max(best_value, {"price": cents, "calories": calories, "dishes": size}[combo_objective])
+        assert combo["optimal"] and best_value == {"price": price_to_cents(combo["total_price"]),
+                                                   "calories": combo["total_calories"],
+                                                   "dishes": len(combo["dishes"])}[combo_objective]
+        assert combo["total_calories"] <= combo_limits[0] and combo["total_price"] <= combo_limits[1]
+builds = combo_optimizer.builds
+combo_optimizer.best_combo(1200, 25, vegetarian_only=True, max_spicy_level=2)
+assert combo_optimizer.builds == builds
+update_menu_dish(combo_menu, '6', spicy_scale_map, 'price', '1.00', start_idx=1)
+assert 5 in combo_optimizer.best_combo(400, 1, objective="dishes")["indices"] and combo_optimizer.builds == builds + 1
+assert combo_optimizer.best_combo(1200, 25, objective="taste") == -1
+assert combo_optimizer.best_combo(10, 0.5)["dishes"] == []
+combo_others = [[] for _ in range(MAX_SHARED_OPTIMIZERS)]
+for combo_other in combo_others:
+    get_combo_optimizer(combo_other)
+assert get_combo_optimizer(combo_menu) is not combo_optimizer
+assert release_combo_optimizer(combo_menu) and not release_combo_optimizer(combo_menu)
+assert not release_combo_optimizer(combo_others[0]) and release_combo_optimizer(combo_others[-1])
+
+# bulk_update_menu
+bulk_menu = []
+add_dishes_bulk(["tacos,300,5.50,yes,3", "burger,900,12.00,no,1", "curry,600,12.90,yes,4", "soup,200,4.00,yes,1"],
+                bulk_menu, spicy_scale_map)
+bulk_events = []
+subscribe_menu_events(bulk_events.append)
+bulk_prices = PriceColumn(bulk_menu)
+bulk_sorter = MenuSorter(bulk_menu)
+bulk_sorter.permutation("price")
+bulk_history = MenuHistory(bulk_menu)
+is_vegetarian_dish = lambda dish: dish["is_vegetarian"] == "yes"
+assert bulk_update_menu(bulk_menu, spicy_scale_map, {"price": lambda dish: dish["price"] * 1.05},
+                        where=is_vegetarian_dish) == 3
+assert [dish["price"] for dish in bulk_menu] == [5.78, 12.0, 13.55, 4.2] and len(bulk_events) == 1
+assert bulk_events[0]["kind"] == "bulk_update" and bulk_events[0]["count"] == 3
+assert [(idx, field, old, new) for idx, _, field, old, new in bulk_events[0]["changes"]] == \
+    [(0, "price", 5.5, 5.78), (2, "price", 12.9, 13.55), (3, "price", 4.0, 4.2)]
+assert bulk_prices.total_cents() == 3553 and bulk_sorter.sorted_indices("price") == [3, 0, 1, 2]
+assert bulk_history.head == 1 and bulk_history.as_of(1) == bulk_menu
+assert bulk_update_menu(bulk_menu, spicy_scale_map, {"spicy_level": "1", "calories": 300}, where=is_vegetarian_dish) == 3
+assert bulk_update_menu(bulk_menu, spicy_scale_map, {"spicy_level": "1"}) == 0 and len(bulk_events) == 2
+assert bulk_update_menu(bulk_menu, spicy_scale_map, {"name": "stew", "spicy_level": lambda dish: dish["calories"]}) \
+    == "spicy_level"
+assert bulk_update_menu(bulk_menu, spicy_scale_map, {"colour": "red"}) == -2
+assert [dish["name"] for dish in bulk_menu] == ["tacos", "burger", "curry", "soup"] and len(bulk_events) == 2
+assert bulk_update_menu([], spicy_scale_map, {"price": "1"}) == 0
+unsubscribe_menu_events(bulk_events.append)
+bulk_prices.close()
+bulk_sorter.close()
+bulk_history.close()
+bulk_lines = [f"dish {i},{100 + i},{i % 30}.25,{'yes' if i % 2 else 'no'},{1 + i % 4}" for i in range(200)]
+bulk_reference = []
+add_dishes_bulk(bulk_lines, bulk_reference, spicy_scale_map)
+bulk_spilled = SpilledMenu(memory_budget=5 * estimate_dish_size(bulk_reference[0]), page_size=4, cache_pages=2)
+add_dishes_bulk(bulk_lines, bulk_spilled, spicy_scale_map)
+bulk_counts = []
+for bulk_target in (bulk_reference, bulk_spilled):
+    bulk_counts.append(bulk_update_menu(bulk_target, spicy_scale_map, {"calories": lambda dish: dish["calories"] + 1},
+                                        where=lambda dish: dish["spicy_level"] == 2))
+    bulk_counts.append(bulk_update_menu(bulk_target, spicy_scale_map, {"price": "3", "is_vegetarian": "no"},
+                                        where=lambda dish: dish["calories"] % 3 == 0))
+assert bulk_counts[:2] == bulk_counts[2:] and bulk_counts[0] == 50 and bulk_counts[1] > 30
+assert bulk_spilled.stats()["cache_misses"] > 0
+assert list(bulk_spilled) == bulk_reference
+assert [bulk_spilled[i] for i in range(200)] == bulk_reference
+bulk_spilled.flush()
+assert list(bulk_spilled) == bulk_reference
+bulk_spilled.close()
+bulk_store_menu = []
+add_dishes_bulk(bulk_lines[:20], bulk_store_menu, spicy_scale_map)
+bulk_store = SQLiteMenuStore("bulk_store_test.db")
+bulk_store.attach(bulk_store_menu)
+bulk_writes = bulk_store.writes
+assert bulk_update_menu(bulk_store_menu, spicy_scale_map, {"price": lambda dish: dish["price"] * 2, "name": "doubled"},
+                        where=lambda dish: dish["is_vegetarian"] == "yes") == 10
+assert bulk_store.writes == bulk_writes + 1 and bulk_store.load_dishes() == bulk_store_menu
+assert [dish["name"] for dish in bulk_store.find_dishes(vegetarian=True)] == ["doubled"] * 10
+assert bulk_store.find_dishes(min_price=38) == [bulk_store_menu[19]] and bulk_store_menu[19]["price"] == 38.5
+bulk_store.close()
+os.remove("bulk_store_test.db")
+
+# AutosaveScheduler
+autosave_menu = []
+add_dishes_bulk(["tacos,300,5.50,yes,3", "burger,900,12.00,no,1"], autosave_menu, spicy_scale_map)
+autosaver = AutosaveScheduler(autosave_menu, "autosave_test.csv", quiet_period=60)
+for autosave_price in ["6", "6.5", "7"]:
+    update_menu_dish(autosave_menu, '0', spicy_scale_map, 'price', autosave_price)
+add_dishes_bulk(["soup,200,4.00,yes,1"], [], spicy_scale_map)
+assert autosaver.stats()["saves"] == 0 and autosaver.stats()["pending_edits"] == 3
+assert autosaver.close() is True and autosaver.close() is False
+assert autosaver.stats()["saves"] == 1 and autosaver.stats()["coalescing_ratio"] == 3.0
+with open("autosave_test.csv") as f:
+    assert f.read().splitlines() == ["tacos,300,7.00,yes,3", "burger,900,12.00,no,1"]
+autosaver = AutosaveScheduler(autosave_menu, "autosave_test.csv", quiet_period=0.05)
+bulk_update_menu(autosave_menu, spicy_scale_map, {"calories": 100})
+autosave_deadline = time.monotonic() + 10
+while autosaver.stats()["saves"] == 0 and time.monotonic() < autosave_deadline:
+    time.sleep(0.01)
+assert autosaver.stats()["saves"] == 1 and autosaver.stats()["coalescing_ratio"] == 1.0
+assert autosaver.stats()["max_save_ms"] > 0 and autosaver.flush() is False
+autosaver.close()
+assert load_menu_from_csv("autosave_test.csv", [], spicy_scale_map) == []
+os.remove("autosave_test.csv")
+autosave_spilled = SpilledMenu(memory_budget=0, page_size=2)
+add_dishes_bulk(["tacos,300,5.50,yes,3", "burger,900,12.00,no,1", "soup,200,4.00,yes,1"], autosave_spilled,
+                spicy_scale_map)
+autosaver = AutosaveScheduler(autosave_spilled, "autosave_test.csv", quiet_period=0.05)
+update_menu_dish(autosave_spilled, '3', spicy_scale_map, 'price', '4.5', start_idx=1)
+autosave_deadline = time.monotonic() + 10
+while autosaver.stats()["saves"] == 0 and time.monotonic() < autosave_deadline:
+    time.sleep(0.01)
+assert autosaver.stats()["saves"] == 1 and autosaver.stats()["failed_saves"] == 0
+with open("autosave_test.csv") as f:
+    assert f.read().splitlines()[-1] == "soup,200,4.50,yes,1"
+autosaver.close()
+autosave_spilled.close()
+os.remove("autosave_test.csv")
+autosaver = AutosaveScheduler(autosave_menu, os.path.join("no_such_directory", "autosave_test.csv"), quiet_period=0.01)
+update_menu_dish(autosave_menu, '1', spicy_scale_map, 'price', '9', start_idx=1)
+autosave_deadline = time.monotonic() + 10
+while autosaver.stats()["failed_saves"] < 2 and time.monotonic() < autosave_deadline:
+    time.sleep(0.01)
+assert autosaver.stats()["failed_saves"] >= 2 and autosaver.stats()["last_error"] and autosaver.thread.is_alive()
+assert autosaver.close() is None and autosaver.stats()["pending_edits"] == 1
+try:
+    AutosaveScheduler(autosave_menu, "autosave_test.txt")
+    assert False
+except ValueError:
+    pass
+
+# cli pipelines
+save_menu_to_csv([dict(get_new_menu_dish_1)], "cli_test.csv")
+with open("cli_test.ops", "w") as f:
+    f.write("update 1 price 3.50\nadd 'soup,200,4.00,yes,1\n")
+
+
+def run_cli(argv):
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        code = cli.main(argv)
+    return code, json.loads(output.getvalue())
+
+
+cli_code, cli_result = run_cli(["--menu", "cli_test.csv", "run", "cli_test.ops"])
+assert cli_code == 1 and not cli_result["ok"] and len(cli_result["results"]) == 2
+assert cli_result["results"][1]["line"] == 2 and "No closing quotation" in cli_result["results"][1]["error"]
+cli_menu = []
+load_menu_from_csv("cli_test.csv", cli_menu, spicy_scale_map)
+assert cli_menu == [get_new_menu_dish_1]
+cli_code, cli_result = run_cli(["--menu", "cli_test.csv", "run", "no_such_pipeline.ops"])
+assert cli_code == 1 and not cli_result["ok"] and cli_result["error"].startswith("cannot read the pipeline")
+with open("cli_test.csv", "a") as f:
+    f.write("bad row,1\n")
+cli_code, cli_result = run_cli(["--menu", "cli_test.csv", "update", "1", "price", "3.50"])
+assert cli_code == 1 and "invalid rows" in cli_result["error"] and "saved_to" not in cli_result
+with open("cli_test.csv") as f:
+    assert f.read().splitlines()[-1] == "bad row,1"
+cli_code, cli_result = run_cli(["--menu", "cli_test.csv", "--output", "cli_output_test.csv", "update", "1", "price", "3.50"])
+assert cli_code == 0 and cli_result["saved_to"] == "cli_output_test.csv" and cli_result["menu_invalid_rows"] == [2]
+cli_menu = []
+load_menu_from_csv("cli_output_test.csv", cli_menu, spicy_scale_map)
+assert len(cli_menu) == 1 and cli_menu[0]["price"] == 3.5
+os.remove("cli_output_test.csv")
+os.remove("cli_test.ops")
+os.remove("cli_test.csv")